@@ -1,12 +1,21 @@
 # account.py
-from transaction import Transaction
+import threading
+
+from money import ZERO, Money
+from transaction import Transaction, now_micros, to_micros
+from ledger import TransactionLedger
+from account_stats import AccountStats
+from batch import (BatchPlan, DEPOSIT, WITHDRAW, STATUS_OK, STATUS_INVALID_AMOUNT,
+                   STATUS_INSUFFICIENT_FUNDS, STATUS_UNKNOWN_OPERATION, STATUS_ABORTED)
 
 class BankAccount:
-    def __init__(self, account_holder, account_number, balance=0.0):
-        self.account_holder = account_holder
-        self.account_number = account_number
-        self.balance = balance
-        self.transactions = []
+    # Balance effect of each posting type when replaying history
+    CREDIT_TYPES = (Transaction.DEPOSIT, Transaction.TRANSFER_IN)
+    DEBIT_TYPES = (Transaction.WITHDRAWAL, Transaction.TRANSFER_OUT)
+
+    def __init__(self, account_holder, account_number, balance=ZERO, ledger=None):
+        self._setup(account_holder, account_number, ledger)
+        self.balance = balance = Money.of(balance)
         
         # Add initial transaction for account creation
         transaction = Transaction(
@@ -16,80 +25,265 @@ class BankAccount:
             description="Account opened with initial deposit"
         )
         self.transactions.append(transaction)
+        self.stats.record(transaction.transaction_type, balance, balance, transaction.timestamp)
+
+    def _setup(self, account_holder, account_number, ledger=None):
+        self.account_holder = account_holder
+        self.account_number = account_number
+        self.balance = ZERO  # Money; amounts passed in are converted with Money.of
+        # Any ledger with append/len/slicing works, e.g. mapped_ledger.MappedLedger
+        self.transactions = ledger if ledger is not None else TransactionLedger(account_number)
+        self.journal = None  # Optional write-ahead log told about every posting
+        self.stats = AccountStats()  # Running totals, updated on every posting
+        self.index = None  # AccountStore's TransactionIndex, told about every new row
+        # Guards balance and ledger; multi-account operations take locks in
+        # account_number order (see transfer_engine.TransferEngine)
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_postings(cls, account_holder, account_number, transactions):
+        """Rebuild an account by replaying its stored transactions in order"""
+        account = cls.__new__(cls)
+        account._setup(account_holder, account_number)
+        for transaction in transactions:
+            account._apply_posting(transaction)
+        return account
+
+    @classmethod
+    def from_ledger(cls, account_holder, ledger):
+        """Reopen an account over a ledger that already holds its history"""
+        account = cls.__new__(cls)
+        account._setup(account_holder, ledger.account_number, ledger)
+        if getattr(ledger, "stats", None) is not None:
+            account._load_ledger_summary()
+        else:
+            for transaction in ledger:
+                account._apply_balance(transaction)
+        return account
+
+    def _load_ledger_summary(self):
+        """Take balance and stats from a ledger that keeps them (mapped_ledger.MappedLedger)"""
+        self.balance = self.transactions.balance
+        self.stats = self.transactions.stats.copy()
+
+    def __getstate__(self):
+        # The journal and index belong to whoever loaded the account, not to
+        # its data, and locks can't be pickled
+        state = self.__dict__.copy()
+        state["journal"] = None
+        state["index"] = None
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.index = None
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+        if getattr(self.transactions, "on_disk", False):
+            # The reopened file may hold rows posted after this was pickled
+            self._load_ledger_summary()
+
+    def _apply_balance(self, transaction):
+        """Apply a transaction's effect on the balance"""
+        if transaction.transaction_type in self.CREDIT_TYPES:
+            self.balance += transaction.amount
+        elif transaction.transaction_type in self.DEBIT_TYPES:
+            self.balance -= transaction.amount
+        elif transaction.transaction_type == Transaction.ACCOUNT_CREATION:
+            self.balance = transaction.amount
+        self.stats.record(transaction.transaction_type, transaction.amount, self.balance, transaction.timestamp)
+
+    def _apply_posting(self, transaction, log=True):
+        """Apply a transaction's balance effect and append it to the ledger"""
+        self._apply_balance(transaction)
+        position = self.transactions.append(transaction)
+        if self.index is not None:
+            self.index.add_rows(self.account_number, self.transactions, position)
+        if log and self.journal is not None:
+            self.journal.log_posting(self, transaction)
 
     def deposit(self, amount, description="Cash deposit"):
-        if amount <= 0:
-            return False, "Deposit amount must be positive!"
+        amount = Money.of(amount)
+        with self.lock:
+            if amount <= ZERO:
+                return False, "Deposit amount must be positive!"
         
-        self.balance += amount
-        transaction = Transaction(
-            transaction_type=Transaction.DEPOSIT,
-            amount=amount,
-            account_number=self.account_number,
-            description=description
-        )
-        self.transactions.append(transaction)
-        return True, f"Deposited ${amount:.2f} successfully! Transaction ID: {transaction.transaction_id}"
+            transaction = Transaction(
+                transaction_type=Transaction.DEPOSIT,
+                amount=amount,
+                account_number=self.account_number,
+                description=description
+            )
+            self._apply_posting(transaction)
+            return True, f"Deposited ${amount:.2f} successfully! Transaction ID: {transaction.transaction_id}"
 
     def withdraw(self, amount, description="Cash withdrawal", method="ATM"):
-        if amount <= 0:
-            return False, "Withdrawal amount must be positive!"
-        if amount > self.balance:
-            return False, f"Insufficient funds! Available: ${self.balance:.2f}"
+        amount = Money.of(amount)
+        with self.lock:
+            if amount <= ZERO:
+                return False, "Withdrawal amount must be positive!"
+            if amount > self.balance:
+                return False, f"Insufficient funds! Available: ${self.balance:.2f}"
         
-        self.balance -= amount
-        transaction = Transaction(
-            transaction_type=Transaction.WITHDRAWAL,
-            amount=amount,
-            account_number=self.account_number,
-            description=f"{description} ({method})"
-        )
-        self.transactions.append(transaction)
-        return True, f"Withdrew ${amount:.2f} successfully! Transaction ID: {transaction.transaction_id}"
+            transaction = Transaction(
+                transaction_type=Transaction.WITHDRAWAL,
+                amount=amount,
+                account_number=self.account_number,
+                description=f"{description} ({method})"
+            )
+            self._apply_posting(transaction)
+            return True, f"Withdrew ${amount:.2f} successfully! Transaction ID: {transaction.transaction_id}"
 
     def transfer(self, amount, to_account, description="Funds transfer"):
-        """Transfer money to another account"""
-        if amount <= 0:
-            return False, "Transfer amount must be positive!"
-        if amount > self.balance:
-            return False, f"Insufficient funds for transfer! Available: ${self.balance:.2f}"
+        """
+        Debit this account for a transfer to another account
         
-        # Create withdrawal transaction
-        self.balance -= amount
-        withdrawal_transaction = Transaction(
-            transaction_type="TRANSFER_OUT",
-            amount=amount,
-            account_number=self.account_number,
-            description=f"Transfer to {to_account}: {description}"
-        )
-        self.transactions.append(withdrawal_transaction)
+        Only the TRANSFER_OUT leg is written here; use
+        transfer_engine.TransferEngine to move funds between two accounts.
+        """
+        amount = Money.of(amount)
+        with self.lock:
+            if amount <= ZERO:
+                return False, "Transfer amount must be positive!"
+            if amount > self.balance:
+                return False, f"Insufficient funds for transfer! Available: ${self.balance:.2f}"
         
-        return True, f"Transfer of ${amount:.2f} to {to_account} initiated. Transaction ID: {withdrawal_transaction.transaction_id}"
+            # Create withdrawal transaction
+            withdrawal_transaction = Transaction(
+                transaction_type="TRANSFER_OUT",
+                amount=amount,
+                account_number=self.account_number,
+                description=f"Transfer to {to_account}: {description}"
+            )
+            self._apply_posting(withdrawal_transaction)
+        
+            return True, f"Transfer of ${amount:.2f} to {to_account} initiated. Transaction ID: {withdrawal_transaction.transaction_id}"
+
+    def apply_batch(self, operations, atomic=True):
+        """
+        Post many deposits and withdrawals in one pass
+        
+        Args:
+            operations: Sequence of (operation, amount) or (operation, amount, description)
+                tuples, where operation is batch.DEPOSIT or batch.WITHDRAW
+            atomic (bool): All-or-nothing when True, otherwise apply every valid item
+            
+        Returns:
+            list: One batch.STATUS_* code per operation, in input order
+        """
+        with self.lock:
+            plan = self._plan_batch(operations)
+            if atomic and plan.failed:
+                return [STATUS_ABORTED if s == STATUS_OK else s for s in plan.statuses]
+            self._commit_batch(plan)
+            return plan.statuses
+
+    def _plan_batch(self, operations):
+        """Validate a batch against a running balance without changing the account"""
+        plan = BatchPlan(self.balance)
+        for op in operations:
+            operation = op[0]
+            try:
+                amount = Money.of(op[1])
+                valid_amount = amount > ZERO
+            except (TypeError, ValueError):
+                valid_amount = False
+            if operation != DEPOSIT and operation != WITHDRAW:
+                status = STATUS_UNKNOWN_OPERATION
+            elif not valid_amount:
+                status = STATUS_INVALID_AMOUNT
+            elif operation == WITHDRAW and amount > plan.balance:
+                status = STATUS_INSUFFICIENT_FUNDS
+            else:
+                status = STATUS_OK
+            plan.statuses.append(status)
+            if status != STATUS_OK:
+                plan.failed = True
+                continue
+
+            if operation == DEPOSIT:
+                plan.balance += amount
+                transaction_type = Transaction.DEPOSIT
+                description = op[2] if len(op) > 2 else "Batch deposit"
+            else:
+                plan.balance -= amount
+                transaction_type = Transaction.WITHDRAWAL
+                description = op[2] if len(op) > 2 else "Batch withdrawal"
+            plan.postings.append((transaction_type, amount, description))
+        return plan
+
+    def _commit_batch(self, plan):
+        """Apply a planned batch: one balance update and a bulk ledger append"""
+        if not plan.postings:
+            return
+        timestamp = now_micros()
+        self.stats.record_batch(plan.postings, self.balance, timestamp)
+        self.balance = plan.balance
+        first = self.transactions.append_batch(plan.postings, timestamp)
+        if self.index is not None:
+            self.index.add_rows(self.account_number, self.transactions, first)
+        if self.journal is not None:
+            self.journal.log_postings(self, self.transactions[first:])
 
     def get_balance(self):
         return self.balance
 
-    def get_transaction_history(self, limit=None):
-        """Get transaction history, optionally limited to recent N transactions"""
+    def get_transaction_history(self, limit=None, offset=None):
+        """
+        Get transaction history, optionally limited to recent N transactions
+
+        With offset, return one page instead: up to limit transactions
+        starting offset rows after the oldest, so only that page is read.
+        """
+        if offset is not None:
+            return self.transactions[offset:offset + limit if limit else None]
         if limit and limit > 0:
             return self.transactions[-limit:]
         return self.transactions.copy()
 
+    def get_transaction_count(self):
+        return len(self.transactions)
+
+    def get_transactions_between(self, start, end):
+        """
+        Get transactions posted in [start, end)
+
+        Args:
+            start, end: datetime, float seconds or int microseconds since the epoch
+
+        Binary search over the time-ordered ledger, so the cost is
+        O(log n + k) for k matching transactions.
+        """
+        first = self.transactions.position_of_time(to_micros(start))
+        last = self.transactions.position_of_time(to_micros(end))
+        return self.transactions[first:max(first, last)]
+
+    def get_transactions_since(self, since):
+        """Get transactions posted at or after since (datetime, float seconds or int microseconds)"""
+        return self.transactions[self.transactions.position_of_time(to_micros(since)):]
+
     def get_account_info(self):
         return {
             "holder": self.account_holder,
             "account_number": self.account_number,
             "balance": self.balance,
-            "total_transactions": len(self.transactions),
+            "total_transactions": self.stats.total_transactions,
+            "stats": self.stats.to_dict(),
             "transactions": [str(t) for t in self.transactions[-10:]]  # Last 10 transactions
         }
+
+    def rebuild_stats(self):
+        """Recompute the running aggregates from the full transaction history"""
+        return AccountStats.from_transactions(self.transactions)
+
+    def verify_stats(self):
+        """True if the running aggregates match a rebuild from the ledger"""
+        return self.stats == self.rebuild_stats()
     
     def get_mini_statement(self, count=5):
         """Get mini statement with recent transactions"""
         recent = self.transactions[-count:] if len(self.transactions) >= count else self.transactions
-        statement = f"Mini Statement for {self.account_number}\n"
-        statement += "=" * 50 + "\n"
-        for t in recent:
-            statement += f"{t.date} | {t.transaction_type:15} | ${t.amount:8.2f} | {t.description}\n"
-        statement += f"\nCurrent Balance: ${self.balance:.2f}"
-        return statement
\ No newline at end of file
+        lines = [f"Mini Statement for {self.account_number}", "=" * 50]
+        lines.extend(f"{t.date} | {t.transaction_type:15} | ${t.amount:8.2f} | {t.description}" for t in recent)
+        lines.append(f"\nCurrent Balance: ${self.balance:.2f}")
+        return "\n".join(lines)
\ No newline at end of file
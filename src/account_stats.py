@@ -0,0 +1,125 @@
+"""
+Account Stats Module
+Running per-account aggregates kept up to date on every posting
+"""
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from money import ZERO, Money
+from transaction import Transaction
+
+
+class AccountStats:
+    """
+    Totals, counts and balance range of one account's history.
+
+    BankAccount records every posting here as it is applied, so summaries
+    cost O(1) instead of a scan of the ledger.  from_transactions() rebuilds
+    the same figures from history, which is how they are verified.
+    """
+
+    __slots__ = ("total_deposits", "total_withdrawals", "total_transfers_in", "total_transfers_out",
+                 "counts", "min_balance", "max_balance", "last_activity")
+
+    def __init__(self):
+        self.total_deposits = ZERO
+        self.total_withdrawals = ZERO
+        self.total_transfers_in = ZERO
+        self.total_transfers_out = ZERO
+        self.counts: Dict[str, int] = {}
+        self.min_balance: Optional[Money] = None
+        self.max_balance: Optional[Money] = None
+        self.last_activity: Optional[int] = None  # Microsecond timestamp of the latest posting
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]) -> "AccountStats":
+        """Rebuild the aggregates by replaying a transaction history"""
+        stats = cls()
+        balance = ZERO
+        for t in transactions:
+            balance = stats.post(t.transaction_type, t.amount, balance, t.timestamp)
+        return stats
+
+    # ---------------- UPDATING ----------------
+    def post(self, transaction_type: str, amount: Money, balance: Money, timestamp: int) -> Money:
+        """Account for one posting made on top of balance; returns the balance after it"""
+        if transaction_type in (Transaction.DEPOSIT, Transaction.TRANSFER_IN):
+            balance += amount
+        elif transaction_type in (Transaction.WITHDRAWAL, Transaction.TRANSFER_OUT):
+            balance -= amount
+        elif transaction_type == Transaction.ACCOUNT_CREATION:
+            balance = amount
+        self.record(transaction_type, amount, balance, timestamp)
+        return balance
+
+    def record(self, transaction_type: str, amount: Money, balance: Money, timestamp: int) -> None:
+        """
+        Account for one posting
+
+        Args:
+            transaction_type (str): Transaction type of the posting
+            amount (Money): Posted amount
+            balance (Money): Account balance after the posting
+            timestamp (int): When it was posted, in microseconds
+        """
+        if transaction_type == Transaction.DEPOSIT:
+            self.total_deposits += amount
+        elif transaction_type == Transaction.WITHDRAWAL:
+            self.total_withdrawals += amount
+        elif transaction_type == Transaction.TRANSFER_IN:
+            self.total_transfers_in += amount
+        elif transaction_type == Transaction.TRANSFER_OUT:
+            self.total_transfers_out += amount
+        self.counts[transaction_type] = self.counts.get(transaction_type, 0) + 1
+        # Compared on cents: this runs for every posting, and int comparisons skip Money's dunders
+        if self.min_balance is None or balance.cents < self.min_balance.cents:
+            self.min_balance = balance
+        if self.max_balance is None or balance.cents > self.max_balance.cents:
+            self.max_balance = balance
+        self.last_activity = timestamp
+
+    def record_batch(self, postings: Sequence[Tuple[str, Money, str]], balance: Money, timestamp: int) -> None:
+        """
+        Account for batch postings (see batch.BatchPlan) applied in order
+
+        Args:
+            postings: (transaction_type, amount, description) rows
+            balance (Money): Balance before the first posting
+            timestamp (int): Posting time in microseconds shared by every row
+        """
+        for transaction_type, amount, _description in postings:
+            if transaction_type == Transaction.DEPOSIT:
+                balance += amount
+            else:
+                balance -= amount
+            self.record(transaction_type, amount, balance, timestamp)
+
+    # ---------------- READING ----------------
+    def copy(self) -> "AccountStats":
+        stats = AccountStats()
+        for name in self.__slots__:
+            setattr(stats, name, getattr(self, name))
+        stats.counts = dict(self.counts)
+        return stats
+
+    @property
+    def total_transactions(self) -> int:
+        return sum(self.counts.values())
+
+    def to_dict(self) -> Dict:
+        return {
+            "total_deposits": self.total_deposits,
+            "total_withdrawals": self.total_withdrawals,
+            "total_transfers_in": self.total_transfers_in,
+            "total_transfers_out": self.total_transfers_out,
+            "counts": dict(self.counts),
+            "total_transactions": self.total_transactions,
+            "min_balance": self.min_balance,
+            "max_balance": self.max_balance,
+            "last_activity": self.last_activity,
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AccountStats):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
@@ -0,0 +1,310 @@
+"""
+Account Store Module
+Owns every BankAccount and resolves account numbers in O(1)
+"""
+
+import os
+import pickle
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from account import BankAccount
+from id_generator import parse_id
+from transaction import Transaction
+
+
+class AccountBackend:
+    """
+    Backing store interface used by AccountStore.
+
+    The base class keeps nothing, so an AccountStore built with it is purely
+    in-memory.  Subclasses persist accounts somewhere durable.
+    """
+
+    def load(self, account_number: str) -> Optional[BankAccount]:
+        """Load an account, or None if the backend does not have it"""
+        return None
+
+    def save(self, account: BankAccount) -> None:
+        """Persist the current state of an account"""
+
+    def delete(self, account_number: str) -> None:
+        """Forget an account"""
+
+    def account_numbers(self) -> Iterable[str]:
+        """All account numbers the backend knows about"""
+        return ()
+
+
+class PickleBackend(AccountBackend):
+    """Stores each account as a pickle file inside a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, account_number: str) -> str:
+        return os.path.join(self.directory, f"{account_number}.pkl")
+
+    def load(self, account_number: str) -> Optional[BankAccount]:
+        try:
+            with open(self._path(account_number), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, account: BankAccount) -> None:
+        # Write to a temp file first so a crash never leaves a torn pickle
+        path = self._path(account.account_number)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(account, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def delete(self, account_number: str) -> None:
+        try:
+            os.remove(self._path(account_number))
+        except FileNotFoundError:
+            pass
+
+    def account_numbers(self) -> Iterable[str]:
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                yield name[:-4]
+
+
+class TransactionIndex:
+    """
+    Finds the account and row of any transaction id held by an AccountStore.
+
+    Only the account is recorded per posting: a sorted id column and a
+    parallel column of account codes, 12 bytes a row, searched by binary
+    search.  The row is then found by the ledger itself (find_id), whose
+    ids are time-ordered like its rows.  New rows go to unsorted pending
+    columns that are merged in by the next locate() or once they reach an
+    eighth of the sorted ones; since ids are time-ordered, a merge usually
+    only appends.
+
+    Ledgers kept on disk (MappedLedger) are not copied into the columns;
+    locate() asks each of them after the columns miss.  Rows of removed
+    accounts are skipped and dropped once they make up half the columns.
+    """
+
+    _MERGE_MIN = 4096  # Pending rows always allowed before a merge
+
+    def __init__(self):
+        self._ids = array('q')  # Sorted
+        self._codes = array('I')  # Account code of each id
+        self._new_ids = array('q')  # Pending, unsorted
+        self._new_codes = array('I')
+        self._ledgers: List[Optional[object]] = []  # code -> ledger, None once removed
+        self._account_codes: Dict[str, int] = {}
+        self._on_disk: Dict[str, object] = {}  # account number -> ledger searched in place
+        self._removed_rows = 0
+        self._lock = threading.Lock()
+
+    def add_rows(self, account_number: str, ledger, start: int = 0) -> None:
+        """Index rows [start, end) of an account's ledger"""
+        if getattr(ledger, "on_disk", False):
+            self._on_disk[account_number] = ledger
+            return
+        with self._lock:
+            code = self._account_codes.get(account_number)
+            if code is None or self._ledgers[code] is not ledger:
+                code = self._account_codes[account_number] = len(self._ledgers)
+                self._ledgers.append(ledger)
+            count = len(ledger) - start
+            self._new_ids.extend(ledger.keys(start))
+            self._new_codes.extend(array('I', [code]) * count)
+            if len(self._new_ids) >= max(self._MERGE_MIN, len(self._ids) >> 3):
+                self._merge()
+
+    def remove_rows(self, ledger) -> None:
+        """Forget every row of a ledger"""
+        with self._lock:
+            if self._on_disk.get(ledger.account_number) is ledger:
+                del self._on_disk[ledger.account_number]
+                return
+            code = self._account_codes.get(ledger.account_number)
+            if code is None or self._ledgers[code] is not ledger:
+                return
+            del self._account_codes[ledger.account_number]
+            self._ledgers[code] = None
+            self._removed_rows += len(ledger)
+            if self._removed_rows * 2 > len(self._ids) + len(self._new_ids):
+                self._merge()
+
+    def _merge(self) -> None:
+        """Move the pending rows into the sorted columns; caller holds _lock"""
+        ledgers = self._ledgers
+        if self._removed_rows:
+            # Rebuild everything without the removed accounts' rows
+            live = [(i, c) for i, c in zip(self._ids, self._codes) if ledgers[c] is not None]
+            live += [(i, c) for i, c in zip(self._new_ids, self._new_codes) if ledgers[c] is not None]
+            live.sort()
+            self._ids, self._codes = array('q', [i for i, _c in live]), array('I', [c for _i, c in live])
+            self._removed_rows = 0
+        elif self._new_ids:
+            new = sorted(zip(self._new_ids, self._new_codes))
+            # Usually all new ids are later than every sorted one and this is an append
+            cut = bisect_left(self._ids, new[0][0])
+            if cut < len(self._ids):
+                new = sorted(zip(self._ids[cut:], self._codes[cut:])) + new
+                new.sort()
+                del self._ids[cut:]
+                del self._codes[cut:]
+            self._ids.extend([i for i, _c in new])
+            self._codes.extend([c for _i, c in new])
+        self._new_ids = array('q')
+        self._new_codes = array('I')
+
+    def locate(self, transaction_id: Union[int, str]) -> Optional[Tuple[str, int]]:
+        """(account number, row) of a transaction id, as an int or as shown on receipts"""
+        if isinstance(transaction_id, str):
+            transaction_id = parse_id(transaction_id)
+            if transaction_id is None:
+                return None
+        ledger = None
+        with self._lock:
+            if self._new_ids:
+                self._merge()
+            ids = self._ids
+            i = bisect_left(ids, transaction_id)
+            while i < len(ids) and ids[i] == transaction_id and ledger is None:
+                ledger = self._ledgers[self._codes[i]]
+                i += 1
+            on_disk = list(self._on_disk.values())
+        if ledger is not None:
+            row = ledger.find_id(transaction_id)
+            if row is not None:
+                return ledger.account_number, row
+        for ledger in on_disk:
+            row = ledger.find_id(transaction_id)
+            if row is not None:
+                return ledger.account_number, row
+        return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            indexed = len(self._ids) + len(self._new_ids) - self._removed_rows
+            return indexed + sum(len(ledger) for ledger in self._on_disk.values())
+
+
+class AccountStore:
+    """Registry of live BankAccount objects keyed by account number"""
+
+    def __init__(self, backend: Optional[AccountBackend] = None):
+        """
+        Initialize the store
+
+        Args:
+            backend (AccountBackend): Where accounts are persisted (optional).
+                Defaults to a memory-only backend.
+        """
+        self.backend: AccountBackend = backend or AccountBackend()
+        self._accounts: Dict[str, BankAccount] = {}  # account_number -> BankAccount
+        self.journal = None  # Optional write-ahead log, handed to every live account
+        self.id_allocator = None  # Optional id_allocator.IdAllocator told about numbers in use
+        self.transaction_index = TransactionIndex()
+
+    def add_account(self, account: BankAccount) -> bool:
+        """Register a new account; fails if the number is already taken"""
+        if self.has_account(account.account_number):
+            return False
+        self._accounts[account.account_number] = account
+        if self.journal is not None:
+            self.journal.log_open_account(account)
+        account.journal = self.journal
+        self._attach_index(account)
+        self.backend.save(account)
+        if self.id_allocator is not None:
+            self.id_allocator.observe(account.account_number)
+        return True
+
+    def _attach_index(self, account: BankAccount) -> None:
+        self.transaction_index.add_rows(account.account_number, account.transactions)
+        account.index = self.transaction_index
+
+    def open_account(self, account_holder: str, account_number: str,
+                     balance: float = 0.0) -> Optional[BankAccount]:
+        """Create and register an account, or return None if the number is taken"""
+        if self.has_account(account_number):
+            return None
+        account = BankAccount(account_holder, account_number, balance)
+        self.add_account(account)
+        return account
+
+    def get_account(self, account_number: str) -> Optional[BankAccount]:
+        """Get account by number, loading it from the backend on first use"""
+        account = self._accounts.get(account_number)
+        if account is None:
+            account = self.backend.load(account_number)
+            if account is not None:
+                account.journal = self.journal
+                self._attach_index(account)
+                self._accounts[account_number] = account
+        return account
+
+    def has_account(self, account_number: str) -> bool:
+        """Check whether an account number is in use"""
+        return self.get_account(account_number) is not None
+
+    def save_account(self, account: BankAccount) -> None:
+        """Push an account's latest state to the backend"""
+        self._accounts[account.account_number] = account
+        self.backend.save(account)
+
+    def remove_account(self, account_number: str) -> bool:
+        """Remove account by number"""
+        if not self.has_account(account_number):
+            return False
+        account = self._accounts.pop(account_number)
+        account.journal = None
+        self.transaction_index.remove_rows(account.transactions)
+        account.index = None
+        if self.journal is not None:
+            self.journal.log_close_account(account_number)
+        self.backend.delete(account_number)
+        if self.id_allocator is not None:
+            self.id_allocator.release(account_number)
+        return True
+
+    def find_transaction(self, transaction_id: Union[int, str]) -> Optional[Transaction]:
+        """Look up any transaction by the id on its receipt, in O(1)"""
+        location = self.transaction_index.locate(transaction_id)
+        if location is None:
+            return None
+        account_number, row = location
+        return self._accounts[account_number].transactions[row]
+
+    def attach_journal(self, journal) -> None:
+        """Start logging mutations of every account held by the store"""
+        self.journal = journal
+        for account in self._accounts.values():
+            account.journal = journal
+
+    def attach_id_allocator(self, allocator) -> None:
+        """Draw on allocator for new account numbers, releasing them when accounts close"""
+        self.id_allocator = allocator
+        for account_number in set(self._accounts) | set(self.backend.account_numbers()):
+            allocator.observe(account_number)
+
+    def get_all_accounts(self) -> List[BankAccount]:
+        """Get all accounts currently held in memory"""
+        return list(self._accounts.values())
+
+    def load_all(self) -> int:
+        """Pull every account the backend knows into memory; returns the count loaded"""
+        loaded = 0
+        for account_number in self.backend.account_numbers():
+            if account_number not in self._accounts and self.get_account(account_number):
+                loaded += 1
+        return loaded
+
+    def __contains__(self, account_number: str) -> bool:
+        return self.has_account(account_number)
+
+    def __len__(self) -> int:
+        return len(self._accounts)
@@ -0,0 +1,107 @@
+"""
+Batch Module
+Bulk posting of deposits and withdrawals across one or many accounts
+"""
+
+from contextlib import ExitStack
+from typing import Dict, List, Sequence
+
+# Operations
+DEPOSIT = "deposit"
+WITHDRAW = "withdraw"
+OPERATIONS = (DEPOSIT, WITHDRAW)
+
+# Per-item status codes returned instead of formatted messages
+STATUS_OK = 0
+STATUS_INVALID_AMOUNT = 1
+STATUS_INSUFFICIENT_FUNDS = 2
+STATUS_UNKNOWN_OPERATION = 3
+STATUS_UNKNOWN_ACCOUNT = 4
+STATUS_ABORTED = 5  # Valid, but skipped because an all-or-nothing batch failed
+
+STATUS_MESSAGES = {
+    STATUS_OK: "Applied",
+    STATUS_INVALID_AMOUNT: "Amount must be positive",
+    STATUS_INSUFFICIENT_FUNDS: "Insufficient funds",
+    STATUS_UNKNOWN_OPERATION: f"Operation must be one of: {', '.join(OPERATIONS)}",
+    STATUS_UNKNOWN_ACCOUNT: "Account not found",
+    STATUS_ABORTED: "Not applied, batch rolled back",
+}
+
+
+class BatchPlan:
+    """One account's validated share of a batch, ready to commit"""
+
+    __slots__ = ("statuses", "postings", "balance", "failed")
+
+    def __init__(self, balance):
+        self.statuses: List[int] = []
+        self.postings: List = []  # (transaction_type, amount, description) rows to append
+        self.balance = balance    # Balance after every OK item is applied
+        self.failed = False
+
+
+class BatchEngine:
+    """
+    Applies a batch of postings that may touch many accounts.
+
+    Operations are (account_number, operation, amount) or
+    (account_number, operation, amount, description) tuples.  Every account's
+    share of the batch is planned (validated and balance-checked) before
+    anything is applied, so an all-or-nothing batch either commits on every
+    account or on none.
+    """
+
+    def __init__(self, account_store):
+        """
+        Initialize the engine
+
+        Args:
+            account_store (AccountStore): Where account numbers are resolved
+        """
+        self.account_store = account_store
+
+    def apply(self, operations: Sequence, atomic: bool = True) -> List[int]:
+        """
+        Apply a cross-account batch
+
+        Args:
+            operations: Sequence of (account_number, operation, amount[, description])
+            atomic (bool): All-or-nothing when True, otherwise apply every valid item
+
+        Returns:
+            list: One status code per operation, in input order
+        """
+        statuses = [STATUS_OK] * len(operations)
+        groups: Dict[str, List[int]] = {}
+        for i, op in enumerate(operations):
+            groups.setdefault(op[0], []).append(i)
+
+        accounts = []
+        failed = False
+        for account_number, positions in groups.items():
+            account = self.account_store.get_account(account_number)
+            if account is None:
+                for i in positions:
+                    statuses[i] = STATUS_UNKNOWN_ACCOUNT
+                failed = True
+            else:
+                accounts.append((account, positions))
+
+        with ExitStack() as locks:
+            # Same lock order as TransferEngine, so the two never deadlock
+            for account, _positions in sorted(accounts, key=lambda item: item[0].account_number):
+                locks.enter_context(account.lock)
+            plans = []
+            for account, positions in accounts:
+                plan = account._plan_batch([operations[i][1:] for i in positions])
+                for i, status in zip(positions, plan.statuses):
+                    statuses[i] = status
+                failed = failed or plan.failed
+                plans.append((account, plan))
+
+            if atomic and failed:
+                return [STATUS_ABORTED if s == STATUS_OK else s for s in statuses]
+            for account, plan in plans:
+                account._commit_batch(plan)
+        return statuses
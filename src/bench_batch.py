@@ -0,0 +1,50 @@
+"""
+Batch Posting Benchmark
+Compares per-call deposit() with BankAccount.apply_batch and BatchEngine
+
+Usage: python bench_batch.py [--ops 100000] [--accounts 1000]
+"""
+
+import argparse
+import time
+
+from account_store import AccountStore
+from batch import DEPOSIT, BatchEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch posting benchmark")
+    parser.add_argument("--ops", type=int, default=100_000, help="credits to post")
+    parser.add_argument("--accounts", type=int, default=1_000, help="accounts for the cross-account run")
+    args = parser.parse_args()
+
+    store = AccountStore()
+    single = store.open_account("Payroll", "ACC001", 0.0)
+    start = time.perf_counter()
+    for _ in range(args.ops):
+        single.deposit(1500.0, "Salary")
+    per_call = time.perf_counter() - start
+
+    batched = store.open_account("Payroll", "ACC002", 0.0)
+    start = time.perf_counter()
+    batched.apply_batch([(DEPOSIT, 1500.0, "Salary")] * args.ops)
+    one_account = time.perf_counter() - start
+
+    numbers = [f"ACC{i:07d}" for i in range(args.accounts)]
+    for number in numbers:
+        store.open_account("Employee", number, 0.0)
+    operations = [(numbers[i % args.accounts], DEPOSIT, 1500.0, "Salary") for i in range(args.ops)]
+    start = time.perf_counter()
+    BatchEngine(store).apply(operations)
+    cross_account = time.perf_counter() - start
+
+    print(f"{'Method':<28} {'Seconds':>9} {'Postings/sec':>14}")
+    print("-" * 53)
+    for name, elapsed in (("deposit() per call", per_call),
+                          ("apply_batch (1 account)", one_account),
+                          (f"BatchEngine ({args.accounts:,} accounts)", cross_account)):
+        print(f"{name:<28} {elapsed:>9.2f} {args.ops / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
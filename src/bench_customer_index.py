@@ -0,0 +1,94 @@
+"""
+Customer Lookup Benchmark
+Compares linear scans with the CustomerManager account/email indexes
+
+For each population size it reports the cost of one scan lookup, one
+indexed lookup, and how many lookups it takes for the index to pay back
+the extra work done while registering customers.
+
+Usage: python bench_customer_index.py [--max-customers 1000000]
+"""
+
+import argparse
+import time
+
+from customer import Customer, CustomerManager
+
+
+def scan_by_account(manager: CustomerManager, account_number: str):
+    """The lookup CustomerManager used before it kept indexes"""
+    for customer in manager.customers.values():
+        if account_number in customer.accounts:
+            return customer
+    return None
+
+
+def scan_by_email(manager: CustomerManager, email: str):
+    for customer in manager.customers.values():
+        if customer.email == email:
+            return customer
+    return None
+
+
+def build_manager(size: int, indexed: bool) -> CustomerManager:
+    manager = CustomerManager()
+    for i in range(1, size + 1):
+        customer = Customer(f"CUST{i:07d}", f"Customer {i}", f"user{i}@example.com", "5550000000")
+        customer.add_account(f"ACC{i:07d}")
+        if indexed:
+            manager.add_customer(customer)
+        else:
+            # Plain dict insert: what add_customer cost without index upkeep
+            manager.customers[customer.customer_id] = customer
+    return manager
+
+
+def time_lookups(lookup, manager, keys, repeat: int) -> float:
+    """Average seconds per lookup"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for key in keys:
+            lookup(manager, key)
+    return (time.perf_counter() - start) / (repeat * len(keys))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan vs index customer lookup benchmark")
+    parser.add_argument("--max-customers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    sizes = []
+    size = 10
+    while size <= args.max_customers:
+        sizes.append(size)
+        size *= 10
+
+    print(f"{'Customers':>10} {'Scan (us)':>12} {'Index (us)':>12} {'Speedup':>10} {'Build extra (ms)':>17} {'Pays back after':>16}")
+    print("-" * 83)
+    for size in sizes:
+        start = time.perf_counter()
+        plain = build_manager(size, indexed=False)
+        plain_build = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed = build_manager(size, indexed=True)
+        index_build = time.perf_counter() - start
+
+        # Probe the middle of the population and a miss; scans get fewer
+        # repeats on big populations so the run stays short
+        keys = [f"ACC{size // 2:07d}", "ACC_MISSING"]
+        email_keys = [f"user{size // 2}@example.com", "missing@example.com"]
+        scan_repeat = max(1, 100_000 // size)
+        scan = (time_lookups(scan_by_account, plain, keys, scan_repeat)
+                + time_lookups(scan_by_email, plain, email_keys, scan_repeat)) / 2
+        index = (time_lookups(lambda m, k: m.find_customer_by_account(k), indexed, keys, 10_000)
+                 + time_lookups(lambda m, k: m.find_customer_by_email(k), indexed, email_keys, 10_000)) / 2
+
+        extra = max(index_build - plain_build, 0.0)
+        saved = scan - index
+        payback = f"{extra / saved:,.0f} lookups" if saved > 0 else "never"
+        print(f"{size:>10,} {scan * 1e6:>12.2f} {index * 1e6:>12.3f} {scan / index:>9.0f}x "
+              f"{extra * 1e3:>17.1f} {payback:>16}")
+
+
+if __name__ == "__main__":
+    main()
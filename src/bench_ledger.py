@@ -0,0 +1,72 @@
+"""
+Ledger Memory Benchmark
+Compares a list of Transaction objects with the columnar TransactionLedger
+
+Usage: python bench_ledger.py [--count 1000000]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from ledger import TransactionLedger
+from transaction import Transaction
+
+DESCRIPTIONS = ["Cash deposit", "Cash withdrawal (ATM)", "Salary", "Rent", "Groceries"]
+TYPES = [Transaction.DEPOSIT, Transaction.WITHDRAWAL]
+
+
+def _make_transaction(i: int) -> Transaction:
+    return Transaction(
+        transaction_type=TYPES[i % len(TYPES)],
+        amount=(i % 5000) + 0.25,
+        account_number="ACC001",
+        description=DESCRIPTIONS[i % len(DESCRIPTIONS)],
+    )
+
+
+def measure(build, count: int):
+    """Return (bytes retained, seconds) for building a container of count rows"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build(count)
+    elapsed = time.perf_counter() - start
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    gc.collect()
+    return current, elapsed
+
+
+def build_list(count: int):
+    return [_make_transaction(i) for i in range(count)]
+
+
+def build_ledger(count: int):
+    ledger = TransactionLedger("ACC001")
+    for i in range(count):
+        ledger.append(_make_transaction(i))
+    return ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transaction storage memory benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000, help="number of transactions")
+    args = parser.parse_args()
+
+    print(f"Storing {args.count:,} transactions")
+    print(f"{'Layout':<22} {'Memory (MB)':>12} {'Bytes/txn':>10} {'Build (s)':>10}")
+    print("-" * 58)
+    results = {}
+    for name, build in (("list[Transaction]", build_list), ("TransactionLedger", build_ledger)):
+        used, elapsed = measure(build, args.count)
+        results[name] = used
+        print(f"{name:<22} {used / 1e6:>12.1f} {used / args.count:>10.1f} {elapsed:>10.2f}")
+    ratio = results["list[Transaction]"] / max(results["TransactionLedger"], 1)
+    print(f"\nTransactionLedger uses {ratio:.1f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Metrics Overhead Benchmark
+Times deposit() and validate_amount() before metrics are enabled, while
+enabled, and after disable(), to show that disabled metrics cost nothing
+
+Usage: python bench_metrics.py [--ops 200000] [--prometheus metrics.prom]
+"""
+
+import argparse
+import time
+
+import metrics
+from account_store import AccountStore
+from validation import Validation
+
+
+def per_call(ops: int) -> tuple:
+    """Microseconds per deposit() and per validate_amount()"""
+    account = AccountStore().open_account("Metrics", "ACC001", 0.0)
+    start = time.perf_counter()
+    for _ in range(ops):
+        account.deposit(10.0, "Salary")
+    deposit = (time.perf_counter() - start) / ops * 1e6
+    start = time.perf_counter()
+    for _ in range(ops):
+        Validation.validate_amount("125.50")
+    validate = (time.perf_counter() - start) / ops * 1e6
+    return deposit, validate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--prometheus", help="also write the collected metrics to this file")
+    args = parser.parse_args()
+
+    rows = [("never enabled", per_call(args.ops))]
+    metrics.enable()
+    rows.append(("enabled", per_call(args.ops)))
+    collected = metrics.snapshot()
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+    metrics.disable()
+    rows.append(("disabled again", per_call(args.ops)))
+
+    print(f"{'Metrics':<16} {'deposit (us)':>13} {'validate_amount (us)':>21}")
+    print("-" * 52)
+    for name, (deposit, validate) in rows:
+        print(f"{name:<16} {deposit:>13.3f} {validate:>21.3f}")
+    for name in ("account.deposit", "validation.validate_amount"):
+        s = collected[name]
+        print(f"\n{name}: {s['calls']:,} calls, p50 {s['p50_us']:.2f} us, p99 {s['p99_us']:.2f} us, "
+              f"max {s['max_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Customer Name Search Benchmark
+Times exact, prefix and typo-tolerant name lookups through CustomerManager
+against a linear scan of the customers
+
+Usage: python bench_name_index.py [--customers 1000000]
+"""
+
+import argparse
+import random
+import time
+
+from customer import Customer, CustomerManager
+from name_index import normalize
+from synthetic import make_names
+
+
+def typo(name: str, rng: random.Random) -> str:
+    """Swap two adjacent letters of the last word"""
+    first, last = name.split(" ", 1)
+    i = rng.randrange(len(last) - 1)
+    return f"{first} {last[:i]}{last[i + 1]}{last[i]}{last[i + 2:]}"
+
+
+def per_call(fn, queries) -> float:
+    """Average microseconds per call"""
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Customer name search benchmark")
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    args = parser.parse_args()
+
+    names = make_names(args.customers)
+    manager = CustomerManager()
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        manager.add_customer(Customer(f"CUST{i:07d}", name, f"user{i}@example.com", "5550000000"))
+    manager.search_customers("")  # Merge the pending keys before timing lookups
+    build = time.perf_counter() - start
+
+    rng = random.Random(11)
+    targets = [rng.choice(names) for _ in range(args.queries)]
+    prefixes = [name[:rng.randint(3, len(name))] for name in targets]
+    typos = [typo(name, rng) for name in targets]
+    scan = lambda query: [c for c in manager.customers.values() if normalize(c.name) == normalize(query)]
+
+    print(f"{args.customers:,} customers indexed in {build:.1f}s\n")
+    print(f"{'Lookup':<28} {'us/call':>10}")
+    print("-" * 39)
+    print(f"{'exact (index)':<28} {per_call(manager.find_customers_by_name, targets):>10.1f}")
+    print(f"{'exact (scan)':<28} {per_call(scan, targets[:3]):>10.1f}")
+    print(f"{'prefix, limit 20':<28} {per_call(manager.search_customers, prefixes):>10.1f}")
+    print(f"{'fuzzy, 1 typo':<28} {per_call(manager.search_customers_fuzzy, typos):>10.1f}")
+    found = sum(any(c.name == name for _, c in manager.search_customers_fuzzy(query, limit=100))
+                for name, query in zip(targets, typos))
+    print(f"\nFuzzy lookups returning the intended name: {found}/{len(typos)}")
+
+    renamed = manager.get_customer("CUST0000000")
+    start = time.perf_counter()
+    renamed.update_info(name="Zz Renamed")
+    manager.search_customers("zz")
+    print(f"Rename + next prefix lookup: {(time.perf_counter() - start) * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Sharding Benchmark
+Posting throughput of ShardRouter as the number of shard processes grows
+
+Usage: python bench_sharding.py [--ops 400000] [--accounts 10000] [--max-shards 4]
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import DEPOSIT, STATUS_OK, WITHDRAW
+from sharding import ShardRouter
+
+
+def run(shards: int, accounts: int, ops: int, batch_size: int, transfers: int):
+    numbers = [f"ACC{i:07d}" for i in range(accounts)]
+    rng = random.Random(42)
+    operations = [(rng.choice(numbers), DEPOSIT if rng.random() < 0.6 else WITHDRAW, 10.0, "Bench")
+                  for _ in range(ops)]
+    batches = [operations[i:i + batch_size] for i in range(0, ops, batch_size)]
+    pairs = [tuple(rng.sample(numbers, 2)) for _ in range(transfers)]
+
+    with ShardRouter(shards) as router:
+        with ThreadPoolExecutor(16) as pool:
+            list(pool.map(lambda n: router.open_account("Bench", n, 1_000.0), numbers))
+
+            start = time.perf_counter()
+            applied = sum(s == STATUS_OK for statuses in pool.map(
+                lambda b: router.apply_batch(b, atomic=False), batches) for s in statuses)
+            posting_seconds = time.perf_counter() - start
+
+            before = sum(s["total_balance"] for s in router.get_shard_stats())
+            start = time.perf_counter()
+            list(pool.map(lambda p: router.transfer(p[0], p[1], 1.0), pairs))
+            transfer_seconds = time.perf_counter() - start
+            after = sum(s["total_balance"] for s in router.get_shard_stats())
+
+    if before != after:
+        raise SystemExit(f"Transfers changed the total balance: {before:.2f} -> {after:.2f}")
+    return applied, posting_seconds, transfer_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded ledger benchmark")
+    parser.add_argument("--ops", type=int, default=400_000, help="postings to apply")
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=5_000, help="postings per apply_batch call")
+    parser.add_argument("--transfers", type=int, default=5_000, help="transfers to run")
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'Shards':>6} {'Postings/sec':>14} {'Speedup':>8} {'Transfers/sec':>14}")
+    print("-" * 45)
+    baseline = None
+    shards = 1
+    while shards <= args.max_shards:
+        _applied, posting_seconds, transfer_seconds = run(
+            shards, args.accounts, args.ops, args.batch_size, args.transfers)
+        rate = args.ops / posting_seconds
+        baseline = baseline or rate
+        print(f"{shards:>6} {rate:>14,.0f} {rate / baseline:>7.2f}x {args.transfers / transfer_seconds:>14,.0f}")
+        shards *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Statement Export Benchmark
+Measures streamed statement lines per minute for each format, single-account
+and bulk over every customer's accounts
+
+Usage: python bench_statement.py [--rows 200000] [--customers 50] [--workers 0]
+"""
+
+import argparse
+import io
+import tempfile
+import time
+import tracemalloc
+
+from account_store import AccountStore
+from batch import DEPOSIT, WITHDRAW
+from customer import Customer, CustomerManager
+from statement import FORMATS, export_all, write_statement
+
+
+class _Discard:
+    """Binary sink that drops what it is given"""
+
+    def write(self, data):
+        return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statement export benchmark")
+    parser.add_argument("--rows", type=int, default=200_000, help="postings in the single-account history")
+    parser.add_argument("--customers", type=int, default=50, help="customers for the bulk run")
+    parser.add_argument("--workers", type=int, default=0, help="export processes for the bulk run")
+    args = parser.parse_args()
+
+    store = AccountStore()
+    account = store.open_account("Statement", "ACC001", 0.0)
+    account.apply_batch([(DEPOSIT, 100.0, "Salary") if i % 3 != 2 else (WITHDRAW, 40.0, "Groceries")
+                         for i in range(args.rows)])
+
+    print(f"{'Format':<8} {'Seconds':>9} {'Lines/min':>14} {'Peak MB':>9}")
+    print("-" * 43)
+    for fmt in FORMATS:
+        start = time.perf_counter()
+        write_statement(account, io.BytesIO(), fmt)
+        elapsed = time.perf_counter() - start
+        # Second pass under tracemalloc, into a sink that keeps nothing
+        tracemalloc.start()
+        write_statement(account, _Discard(), fmt)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{fmt:<8} {elapsed:>9.2f} {args.rows / elapsed * 60:>14,.0f} {peak / 1e6:>9.1f}")
+
+    manager = CustomerManager()
+    per_account = max(1, args.rows // args.customers)
+    for i in range(args.customers):
+        customer = Customer(f"CUST{i:05d}", f"Customer {i}", f"c{i}@example.com", "555-0100")
+        manager.add_customer(customer)
+        number = f"ACC{i + 2:07d}"
+        store.open_account(customer.name, number, 0.0).apply_batch([(DEPOSIT, 25.0, "Salary")] * per_account)
+        customer.add_account(number)
+    with tempfile.TemporaryDirectory() as directory:
+        stats = export_all(manager, store, directory, workers=args.workers)
+    print(f"\nBulk: {stats['statements']} statements, {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec'] * 60:,.0f} lines/min, {args.workers} workers)")
+
+
+if __name__ == "__main__":
+    main()
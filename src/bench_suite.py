@@ -0,0 +1,225 @@
+"""
+Benchmark Suite
+Times the hot paths over synthetic populations and writes the results as JSON
+
+Every benchmark calls its operation in rounds, sized so that each round
+takes a measurable time, and reports the best and median microseconds per
+call.  Populations come from synthetic.build_population, so two versions
+of the code are timed against the same data.  --compare lists the
+benchmarks that got slower than a saved run and exits with status 1 if
+any did.
+
+Populations are held in memory, at roughly 7 KB per customer, so sizes
+are capped at MAX_SIZE (about 7 GB).
+
+Usage: python bench_suite.py [--sizes 1000,10000,100000,1000000] [--output bench.json]
+                             [--compare baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from synthetic import account_number, build_population, customer_id
+from validation import Validation, np
+
+ROUNDS = 5
+MAX_SIZE = 1_000_000  # Largest population built (in memory, ~7 KB per customer)
+MIN_ROUND_SECONDS = 0.02
+
+# (benchmark name, function called with one input, inputs cycled through)
+Case = Tuple[str, Callable, Sequence]
+
+
+def measure(fn: Callable, inputs: Sequence, rounds: int = ROUNDS) -> Dict:
+    """Best and median microseconds per fn(input) call"""
+    count = len(inputs)
+
+    def run(calls: int) -> float:
+        start = time.perf_counter()
+        for i in range(calls):
+            fn(inputs[i % count])
+        return time.perf_counter() - start
+
+    calls = 1
+    while run(calls) < MIN_ROUND_SECONDS and calls < 1 << 24:
+        calls *= 2
+    times = [run(calls) / calls * 1e6 for _ in range(rounds)]
+    return {
+        "iterations": calls * rounds,
+        "best_us": round(min(times), 4),
+        "median_us": round(statistics.median(times), 4),
+        "ops_per_sec": round(1e6 / min(times), 1),
+    }
+
+
+# ---------------- CASES ----------------
+def validation_cases() -> List[Case]:
+    """One case per Validation method; batch validators are timed per 1,000 rows"""
+    rows = 1_000
+    cases = [
+        ("validate_amount", Validation.validate_amount, ["125.50", "0.01", "999999.99", "abc"]),
+        ("validate_account_number", Validation.validate_account_number, ["ACC042", account_number(7), "acc12"]),
+        ("validate_customer_id", Validation.validate_customer_id, ["CUST042", customer_id(7), "CUSTX"]),
+        ("validate_name", Validation.validate_name, ["Jane Doe", "O'Brien-Smith", "R2D2"]),
+        ("validate_email", Validation.validate_email, ["jane@example.com", "bad@", "A.B@c.org"]),
+        ("validate_phone", Validation.validate_phone, ["(555) 123-4567", "555123", "+44 20 7946 0958"]),
+        ("validate_password", Validation.validate_password, ["Secret123", "short", "nouppercase1"]),
+        ("validate_date", Validation.validate_date, ["2024-02-29", "2023-02-29", "31/12/2024"]),
+        ("sanitize_input", Validation.sanitize_input, ["  hello   world ", "x'; DROP TABLE t;--"]),
+        ("validate_transaction_type", Validation.validate_transaction_type, ["deposit", "TRANSFER_IN", "bogus"]),
+        ("validate_amounts[1000]", Validation.validate_amounts,
+         [[f"{i % 5000}.{i % 100:02d}" for i in range(rows)]]),
+        ("validate_account_numbers[1000]", Validation.validate_account_numbers,
+         [[account_number(i) for i in range(rows)]]),
+        ("validate_customer_ids[1000]", Validation.validate_customer_ids,
+         [[customer_id(i) for i in range(rows)]]),
+        ("validate_emails[1000]", Validation.validate_emails,
+         [[f"user{i}@example.com" for i in range(rows)]]),
+        ("validate_names[1000]", Validation.validate_names, [["Customer Name"] * rows]),
+        ("validate_phones[1000]", Validation.validate_phones, [[f"555-{i:07d}" for i in range(rows)]]),
+    ]
+    covered = {name.split("[")[0] for name, _fn, _inputs in cases}
+    public = {name for name, _ in inspect.getmembers(Validation, inspect.isfunction) if not name.startswith("_")}
+    for name in sorted(public - covered):
+        print(f"warning: Validation.{name} has no benchmark", file=sys.stderr)
+    return [(f"validation.{name}", fn, inputs) for name, fn, inputs in cases]
+
+
+def population_cases(size: int, seed: int) -> Iterator[Case]:
+    """Account and customer cases over a population of size customers"""
+    manager, store = build_population(size, seed=seed)
+    rng = random.Random(seed)
+    sample = [rng.randrange(size) for _ in range(min(size, 1_000))]
+    accounts = [store.get_account(account_number(i)) for i in sample]
+    customers = [manager.get_customer(customer_id(i)) for i in sample]
+
+    # One long history, as long as the population is large (up to 100k rows)
+    busy = accounts[0]
+    busy.apply_batch([("deposit", 10.0, "Salary")] * min(size, 100_000))
+    history = len(busy.transactions)
+
+    yield "account.deposit", lambda a: a.deposit(10.0, "Benchmark"), accounts
+    yield "account.withdraw", lambda a: a.withdraw(1.0, "Benchmark"), accounts
+    yield "account.get_balance", lambda a: a.get_balance(), accounts
+    yield "account.get_transaction_history[last 50]", lambda a: a.get_transaction_history(50), [busy]
+    yield "account.get_transaction_history[page 100]", \
+        lambda o: busy.get_transaction_history(100, o), [rng.randrange(history) for _ in range(100)]
+    yield "account.get_transaction_history[all]", lambda a: a.get_transaction_history(), [busy]
+    yield "account.get_mini_statement", lambda a: a.get_mini_statement(), accounts
+    yield "account.get_account_info", lambda a: a.get_account_info(), accounts
+
+    ids = [c.customer_id for c in customers] + ["CUST0000000000"]
+    numbers = [a.account_number for a in accounts] + ["ACC0000000000"]
+    names = [c.name for c in customers]
+    yield "customers.get_customer", manager.get_customer, ids
+    yield "customers.find_customer_by_account", manager.find_customer_by_account, numbers
+    yield "customers.find_customer_by_email", manager.find_customer_by_email, [c.email for c in customers]
+    yield "customers.find_customers_by_name", manager.find_customers_by_name, names
+    yield "customers.search_customers", manager.search_customers, [n[:4] for n in names]
+    yield "customers.search_customers_fuzzy", manager.search_customers_fuzzy, \
+        [n[:-2] + n[-1] + n[-2] for n in names]
+    yield "customers.get_customer_info", lambda c: c.get_customer_info(), customers
+    yield "customers.generate_customer_report", lambda _: manager.generate_customer_report(), [None]
+    yield "customers.iter_customer_info", lambda _: sum(1 for _i in manager.iter_customer_info()), [None]
+
+
+# ---------------- RESULTS ----------------
+def environment() -> Dict:
+    """What the numbers were measured on"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "numpy": np is not None,
+        "commit": commit,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Benchmarks whose best time grew by more than threshold (0.25 = 25%)"""
+    before = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = before.get((result["name"], result["size"]))
+        if old is None or not old["best_us"]:
+            continue
+        ratio = result["best_us"] / old["best_us"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{result['name']} (size {result['size']:,}): "
+                               f"{old['best_us']:.2f} -> {result['best_us']:.2f} us ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite over synthetic data")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help=f"comma-separated customer counts, at most {MAX_SIZE:,} (~7 KB of RAM each)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench.json", help="JSON results file ('-' for stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown that counts as a regression")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    if any(size > MAX_SIZE for size in sizes):
+        parser.error(f"--sizes above {MAX_SIZE:,} would not fit in memory (~7 KB per customer)")
+    results = []
+
+    def record(name: str, size: int, timing: Dict) -> None:
+        results.append({"name": name, "size": size, **timing})
+        print(f"{name:<48} {size:>10,} {timing['best_us']:>12.2f} {timing['median_us']:>12.2f}",
+              file=sys.stderr)
+
+    print(f"{'Benchmark':<48} {'Size':>10} {'Best (us)':>12} {'Median (us)':>12}", file=sys.stderr)
+    print("-" * 85, file=sys.stderr)
+    for name, fn, inputs in validation_cases():
+        if args.filter in name:
+            record(name, 0, measure(fn, inputs))
+    for size in sizes:
+        start = time.perf_counter()
+        cases = population_cases(size, args.seed)
+        first = next(cases)  # Builds the population
+        elapsed = time.perf_counter() - start
+        record("synthetic.build_population", size, {
+            "iterations": 1, "best_us": round(elapsed * 1e6, 1), "median_us": round(elapsed * 1e6, 1),
+            "ops_per_sec": round(1 / elapsed, 3)})
+        for name, fn, inputs in [first, *cases]:
+            if args.filter in name:
+                record(name, size, measure(fn, inputs))
+
+    report = {"environment": environment(), "seed": args.seed, "sizes": sizes, "results": results}
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold:.0%}:\n  " + "\n  ".join(regressions),
+                  file=sys.stderr)
+            sys.exit(1)
+        print("\nNo regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Bulk Import Module
+Streaming CSV import of customers and their accounts
+
+Expected columns: name, email, phone, address, account_number, balance and
+optionally customer_id.  Rows flow through generator stages (read chunk ->
+validate -> build -> register) so memory stays bounded by the chunk size
+no matter how large the file is.
+
+Usage: python bulk_import.py customers.csv [--data bank_data] [--rejects rejects.csv] [--workers 4]
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from account import BankAccount
+from account_store import AccountStore
+from customer import Customer, CustomerManager
+from id_allocator import ACCOUNT_PREFIX, CUSTOMER_PREFIX, IdAllocator
+from journal import Journal
+from money import Money
+from validation import ERROR_MESSAGES, Validation
+from wal import SYNC_INTERVAL
+
+REQUIRED_COLUMNS = ("name", "email", "phone", "address", "account_number", "balance")
+
+
+# ---------------- STAGES ----------------
+def read_chunks(path: str, chunk_size: int, start_row: int = 0) -> Iterator[Tuple[int, List[Dict]]]:
+    """
+    Yield (first row number, rows) chunks from a CSV file
+
+    Row numbers count data rows from 0.  Rows before start_row are skipped,
+    which is how an interrupted import resumes.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+        rows = iter(reader)
+        for _ in islice(rows, start_row):
+            pass
+        row_number = start_row
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield row_number, chunk
+            row_number += len(chunk)
+
+
+def validate_chunk(chunk: Tuple[int, List[Dict]]) -> Tuple[int, List[Dict], List[Dict]]:
+    """
+    Validate one chunk with the batch validators
+
+    Module-level so it can run in a worker process.  Returns
+    (first row number, cleaned valid rows, rejected rows with an error).
+    """
+    first_row, rows = chunk
+    name_ok, names, name_codes = Validation.validate_names([r["name"] for r in rows])
+    email_ok, emails, email_codes = Validation.validate_emails([r["email"] for r in rows])
+    acc_ok, accounts, acc_codes = Validation.validate_account_numbers([r["account_number"] for r in rows])
+    amount_ok, cents, amount_codes = Validation.validate_amounts([r["balance"] for r in rows])
+    phone_ok, phones, phone_codes = Validation.validate_phones([r["phone"] for r in rows])
+
+    valid, rejects = [], []
+    for i, row in enumerate(rows):
+        error = None
+        if not name_ok[i]:
+            error = f"name: {ERROR_MESSAGES[int(name_codes[i])]}"
+        elif not email_ok[i]:
+            error = f"email: {ERROR_MESSAGES[int(email_codes[i])]}"
+        elif not acc_ok[i]:
+            error = f"account_number: {ERROR_MESSAGES[int(acc_codes[i])]}"
+        elif not amount_ok[i]:
+            error = f"balance: {ERROR_MESSAGES[int(amount_codes[i])]}"
+        elif row["phone"].strip() and not phone_ok[i]:
+            error = f"phone: {ERROR_MESSAGES[int(phone_codes[i])]}"  # Phone is optional
+        if error:
+            rejects.append(dict(row, row=first_row + i, error=error))
+            continue
+        valid.append({
+            "row": first_row + i,
+            "customer_id": (row.get("customer_id") or "").strip().upper(),
+            "name": names[i],
+            "email": emails[i],
+            "phone": phones[i] if phone_ok[i] else "",
+            "address": row["address"].strip(),
+            "account_number": accounts[i],
+            "balance": Money(int(cents[i])),
+        })
+    return first_row, valid, rejects
+
+
+def build_entities(rows: List[Dict], allocate_customer_id) -> Iterator[Tuple[Dict, Customer, BankAccount]]:
+    """
+    Yield (row, Customer, BankAccount) for each validated row
+
+    Args:
+        rows (list): Validated rows from validate_chunk
+        allocate_customer_id: Callable returning a fresh ID for rows without one
+    """
+    for row in rows:
+        customer_id = row["customer_id"] or allocate_customer_id()
+        customer = Customer(customer_id, row["name"], row["email"], row["phone"], row["address"])
+        customer.add_account(row["account_number"])
+        yield row, customer, BankAccount(row["name"], row["account_number"], row["balance"])
+
+
+# ---------------- PIPELINE ----------------
+class BulkImporter:
+    """Runs the import stages and keeps a resumable checkpoint"""
+
+    def __init__(self, customer_manager: CustomerManager, account_store: AccountStore,
+                 reject_path: Optional[str] = None, checkpoint_path: Optional[str] = None,
+                 chunk_size: int = 10_000, workers: int = 0):
+        """
+        Initialize the importer
+
+        Args:
+            customer_manager (CustomerManager): Where customers are registered
+            account_store (AccountStore): Where accounts are registered
+            reject_path (str): CSV file receiving rejected rows (optional)
+            checkpoint_path (str): JSON progress file used to resume (optional)
+            chunk_size (int): Rows per chunk; bounds memory use
+            workers (int): Validation processes; 0 validates in this process
+        """
+        self.customer_manager = customer_manager
+        self.account_store = account_store
+        if customer_manager.id_allocator is None:
+            customer_manager.attach_id_allocator(IdAllocator(CUSTOMER_PREFIX))
+        self.reject_path = reject_path
+        self.checkpoint_path = checkpoint_path
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    def _load_checkpoint(self, path: str) -> Dict:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("source") == os.path.abspath(path):
+                return checkpoint
+        return {"source": os.path.abspath(path), "rows_done": 0, "imported": 0, "rejected": 0}
+
+    def _save_checkpoint(self, checkpoint: Dict) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _validated(self, chunks) -> Iterator[Tuple[int, List[Dict], List[Dict]]]:
+        """Validate chunks in order, keeping at most 2 per worker in flight"""
+        if self.workers <= 0:
+            yield from map(validate_chunk, chunks)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(validate_chunk, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _register(self, valid: List[Dict], rejects: List[Dict]) -> int:
+        imported = 0
+        allocator = self.customer_manager.id_allocator
+        for row, customer, account in build_entities(valid, allocator.allocate):
+            if self.account_store.has_account(account.account_number):
+                rejects.append(dict(row, error="account_number: Account already exists"))
+            elif not self.customer_manager.add_customer(customer):
+                rejects.append(dict(row, error="customer_id: Customer already exists"))
+            else:
+                self.account_store.add_account(account)
+                imported += 1
+                continue
+            if not row["customer_id"]:
+                allocator.release(customer.customer_id)  # Issued for this row, never used
+        return imported
+
+    def run(self, path: str, progress=None) -> Dict:
+        """
+        Import a CSV file, resuming from the checkpoint if one matches it
+
+        Args:
+            path (str): CSV file to import
+            progress: Optional callable receiving the running stats after each chunk
+
+        Returns:
+            dict: rows_done, imported, rejected, seconds and rows_per_sec
+        """
+        checkpoint = self._load_checkpoint(path)
+        start_row = checkpoint["rows_done"]
+        started = time.perf_counter()
+        reject_file = reject_writer = None
+        try:
+            for first_row, valid, rejects in self._validated(read_chunks(path, self.chunk_size, start_row)):
+                chunk_rows = len(valid) + len(rejects)
+                checkpoint["imported"] += self._register(valid, rejects)
+                if rejects and self.reject_path:
+                    if reject_writer is None:
+                        resuming = start_row > 0 and os.path.exists(self.reject_path)
+                        reject_file = open(self.reject_path, "a" if resuming else "w",
+                                           newline="", encoding="utf-8")
+                        reject_writer = csv.DictWriter(reject_file, extrasaction="ignore", fieldnames=[
+                            "row", *REQUIRED_COLUMNS, "customer_id", "error"])
+                        if not resuming:
+                            reject_writer.writeheader()
+                    reject_writer.writerows(rejects)
+                    reject_file.flush()
+                checkpoint["rejected"] += len(rejects)
+                checkpoint["rows_done"] = first_row + chunk_rows
+                # Rows must be durable before the checkpoint says they are done
+                journal = self.account_store.journal
+                if journal is not None:
+                    journal.wal.sync()
+                self._save_checkpoint(checkpoint)
+                if progress is not None:
+                    progress(self._stats(checkpoint, start_row, started))
+        finally:
+            if reject_file is not None:
+                reject_file.close()
+        return self._stats(checkpoint, start_row, started)
+
+    @staticmethod
+    def _stats(checkpoint: Dict, start_row: int, started: float) -> Dict:
+        elapsed = time.perf_counter() - started
+        processed = checkpoint["rows_done"] - start_row
+        return {
+            "rows_done": checkpoint["rows_done"],
+            "imported": checkpoint["imported"],
+            "rejected": checkpoint["rejected"],
+            "seconds": elapsed,
+            "rows_per_sec": processed / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import customers and accounts from CSV")
+    parser.add_argument("csv_path")
+    parser.add_argument("--data", default="bank_data", help="journal directory imported into")
+    parser.add_argument("--rejects", default="rejects.csv", help="where rejected rows go")
+    parser.add_argument("--checkpoint", default=None, help="progress file for resuming")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=0, help="validation processes (0 = inline)")
+    args = parser.parse_args()
+
+    # Same journal and allocator files as main.py; the log is synced once per chunk
+    journal = Journal(args.data, SYNC_INTERVAL)
+    customer_ids = IdAllocator(CUSTOMER_PREFIX, os.path.join(args.data, "customer_ids.alloc"))
+    account_numbers = IdAllocator(ACCOUNT_PREFIX, os.path.join(args.data, "account_numbers.alloc"))
+    journal.customer_manager.attach_id_allocator(customer_ids)
+    journal.account_store.attach_id_allocator(account_numbers)
+    try:
+        importer = BulkImporter(journal.customer_manager, journal.account_store, args.rejects,
+                                args.checkpoint or args.csv_path + ".checkpoint",
+                                args.chunk_size, args.workers)
+        stats = importer.run(args.csv_path, progress=lambda s: print(
+            f"\r{s['rows_done']:,} rows  {s['rows_per_sec']:,.0f} rows/sec", end="", flush=True))
+    finally:
+        customer_ids.close()
+        account_numbers.close()
+        journal.close()
+    print(f"\nImported {stats['imported']:,}, rejected {stats['rejected']:,} "
+          f"in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
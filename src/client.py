@@ -0,0 +1,168 @@
+"""
+Client Module
+Async client and load generator for the account server
+
+Usage: python client.py [--clients 1000] [--pipeline 8] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+from server import ProtocolError, encode_frame, read_frame
+
+
+class BankClient:
+    """
+    Pipelining client for BankServer.
+
+    Every call sends its request immediately and waits only for its own
+    response, so many calls can be in flight on one connection at once.
+    """
+
+    def __init__(self):
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._receiver: Optional[asyncio.Task] = None
+
+    async def connect(self, host: str = "127.0.0.1", port: int = 8765) -> "BankClient":
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+        self._receiver = asyncio.create_task(self._receive())
+        return self
+
+    async def _receive(self) -> None:
+        error: Exception = ConnectionError("Connection closed")
+        try:
+            while True:
+                response = await read_frame(self._reader)
+                if response is None:
+                    break
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (ProtocolError, ConnectionError) as e:
+            error = e
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def request(self, op: str, **arguments) -> Dict:
+        """Send one request and wait for its response"""
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(encode_frame({"id": request_id, "op": op, **arguments}))
+        await self._writer.drain()
+        return await future
+
+    async def deposit(self, account: str, amount: float, description: str = "Cash deposit") -> Dict:
+        return await self.request("deposit", account=account, amount=amount, description=description)
+
+    async def withdraw(self, account: str, amount: float, description: str = "Cash withdrawal") -> Dict:
+        return await self.request("withdraw", account=account, amount=amount, description=description)
+
+    async def transfer(self, account: str, to: str, amount: float, description: str = "Funds transfer") -> Dict:
+        return await self.request("transfer", account=account, to=to, amount=amount, description=description)
+
+    async def balance(self, account: str) -> Dict:
+        return await self.request("balance", account=account)
+
+    async def history(self, account: str, limit: int = 10, offset: Optional[int] = None) -> Dict:
+        return await self.request("history", account=account, limit=limit, offset=offset)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._receiver is not None:
+            await self._receiver
+
+
+# ---------------- LOAD GENERATOR ----------------
+async def _client_loop(host: str, port: int, pipeline: int, accounts: List[str], deadline: float,
+                       latencies: List[float], seed: int) -> int:
+    client = await BankClient().connect(host, port)
+    rng = random.Random(seed)
+    errors = 0
+
+    async def lane():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            account = rng.choice(accounts)
+            roll = rng.random()
+            start = time.perf_counter()
+            if roll < 0.4:
+                response = await client.deposit(account, 10.0)
+            elif roll < 0.7:
+                response = await client.withdraw(account, 5.0)
+            elif roll < 0.8:
+                response = await client.transfer(account, rng.choice(accounts), 1.0)
+            elif roll < 0.95:
+                response = await client.balance(account)
+            else:
+                response = await client.history(account, 5)
+            latencies.append(time.perf_counter() - start)
+            errors += "not found" in response.get("message", "")
+
+    try:
+        await asyncio.gather(*(lane() for _ in range(pipeline)))
+    finally:
+        await client.close()
+    return errors
+
+
+async def run_load(host: str, port: int, clients: int, pipeline: int, duration: float,
+                   accounts: List[str]) -> Dict:
+    """Drive the server with many pipelining clients; returns throughput and latency figures"""
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(
+        _client_loop(host, port, pipeline, accounts, deadline, latencies, seed)
+        for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "unknown_account_errors": sum(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the account server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=1000, help="concurrent connections")
+    parser.add_argument("--pipeline", type=int, default=8, help="requests in flight per connection")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--accounts", type=int, default=1000, help="accounts the server was started with")
+    args = parser.parse_args()
+
+    accounts = [f"ACC{i:03d}" for i in range(1, args.accounts + 1)]
+    stats = asyncio.run(run_load(args.host, args.port, args.clients, args.pipeline, args.duration, accounts))
+    print(f"{stats['requests']:,} requests in {stats['seconds']:.1f}s "
+          f"from {args.clients:,} clients x {args.pipeline} pipelined")
+    print(f"Throughput: {stats['requests_per_sec']:,.0f} req/s")
+    print(f"Latency: p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, max {stats['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
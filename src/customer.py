@@ -3,8 +3,11 @@ Customer Module
 Handles customer information and account management
 """
 
+import itertools
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from name_index import NameIndex
 #it is a customar class 
 class Customer:
     """Represents a bank customer with personal information"""
@@ -26,52 +29,99 @@ class Customer:
         self.phone: str = phone
         self.address: str = address
         self.accounts: List[str] = []  # List of account numbers
+        self._account_set: Set[str] = set()  # Same numbers, for O(1) membership tests
+        self._manager: Optional["CustomerManager"] = None  # Manager indexing this customer
+        self._registered: int = 0  # Order in which the manager took this customer in
+        self._info: Optional[Dict] = None  # Cached info dict (see cached_info); None when dirty
         self.date_joined: str = datetime.now().strftime("%Y-%m-%d")
     
     def add_account(self, account_number: str) -> bool:
         """Add an account to customer"""
-        if account_number not in self.accounts:
+        if account_number not in self._account_set:
             self.accounts.append(account_number)
+            self._account_set.add(account_number)
+            self._info = None
+            if self._manager is not None:
+                self._manager._on_account_added(self, account_number)
             return True
         return False
     
     def remove_account(self, account_number: str) -> bool:
         """Remove an account from customer"""
-        if account_number in self.accounts:
+        if account_number in self._account_set:
             self.accounts.remove(account_number)
+            self._account_set.discard(account_number)
+            self._info = None
+            if self._manager is not None:
+                self._manager._on_account_removed(self, account_number)
             return True
         return False
     
+    def has_account(self, account_number: str) -> bool:
+        """Check whether customer owns an account"""
+        return account_number in self._account_set
+    
     def get_accounts(self) -> List[str]:
         """Get all account numbers for this customer"""
         return self.accounts.copy()
     
     def get_customer_info(self) -> Dict:
-        """Get customer information as dictionary"""
-        return {
-            'customer_id': self.customer_id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'address': self.address,
-            'total_accounts': len(self.accounts),
-            'accounts': self.accounts,
-            'date_joined': self.date_joined
-        }
+        """
+        Get customer information as dictionary
+        
+        Returns a copy of the cached info, so callers may modify it.
+        """
+        info = self.cached_info().copy()
+        info['accounts'] = info['accounts'].copy()
+        return info
+    
+    def cached_info(self) -> Dict:
+        """
+        Get customer information without copying it
+        
+        The dict is cached until update_info/add_account/remove_account
+        changes the customer, so callers must treat it (and its accounts
+        list) as read-only.
+        """
+        if self._info is None:
+            self._info = {
+                'customer_id': self.customer_id,
+                'name': self.name,
+                'email': self.email,
+                'phone': self.phone,
+                'address': self.address,
+                'total_accounts': len(self.accounts),
+                'accounts': self.accounts.copy(),
+                'date_joined': self.date_joined
+            }
+        return self._info
     
     def update_info(self, name: Optional[str] = None, email: Optional[str] = None,
                     phone: Optional[str] = None, address: Optional[str] = None) -> bool:
         """Update customer information"""
+        old_name, old_email = self.name, self.email
+        changes = {}
         if name:
-            self.name = name
+            self.name = changes['name'] = name
         if email:
-            self.email = email
+            self.email = changes['email'] = email
         if phone:
-            self.phone = phone
+            self.phone = changes['phone'] = phone
         if address:
-            self.address = address
+            self.address = changes['address'] = address
+        if changes:
+            self._info = None
+            if self._manager is not None:
+                self._manager._on_info_updated(self, old_name, old_email, changes)
         return True
     
+    def __getstate__(self):
+        # Don't drag the owning manager along when a customer is pickled
+        state = self.__dict__.copy()
+        state['_manager'] = None
+        state['_info'] = None
+        return state
+    
     def __str__(self) -> str:
         """String representation of customer"""
         return f"Customer: {self.name} (ID: {self.customer_id}) - {len(self.accounts)} accounts"
@@ -79,40 +129,200 @@ class Customer:
 class CustomerManager:
     """Manages collection of customers"""
     
-    def __init__(self):
+    def __init__(self, store=None):
+        """
+        Initialize the manager
+        
+        Args:
+            store: Optional persistent customer store (e.g. sqlite_store.SQLiteStore).
+                Changes are written through to it and lookups that miss in
+                memory fall back to its indexed queries.
+        """
         self.customers: Dict[str, Customer] = {}  # customer_id -> Customer object
+        self.store = store
+        self.journal = None  # Optional write-ahead log told about every mutation
+        self.id_allocator = None  # Optional id_allocator.IdAllocator told about IDs in use
+        # Secondary indexes, kept current by Customer.add_account/remove_account/update_info
+        self._account_index: Dict[str, Dict[str, Customer]] = {}  # account_number -> {customer_id: Customer}
+        self._email_index: Dict[str, Dict[str, Customer]] = {}  # email -> {customer_id: Customer}
+        self.name_index = NameIndex()
+        self._registrations = itertools.count()  # Source of Customer._registered
+        # Report aggregates, kept current by the same hooks
+        self._total_accounts = 0
     
     def add_customer(self, customer: Customer) -> bool:
         """Add a customer to manager"""
         if customer.customer_id not in self.customers:
-            self.customers[customer.customer_id] = customer
+            self._register(customer)
+            if self.store is not None:
+                self.store.save_customer(customer)
+            if self.journal is not None:
+                self.journal.log_customer_added(customer)
+            if self.id_allocator is not None:
+                self.id_allocator.observe(customer.customer_id)
             return True
         return False
     
+    def _register(self, customer: Customer) -> Customer:
+        """Hold a customer in memory and index it, without persisting anything"""
+        self.customers[customer.customer_id] = customer
+        customer._manager = self
+        customer._registered = next(self._registrations)
+        self._total_accounts += len(customer.accounts)
+        for account_number in customer.accounts:
+            self._index_account(account_number, customer)
+        self._index_email(customer.email, customer)
+        self.name_index.add(customer)
+        return customer
+    
+    def _cached(self, customer: Optional[Customer]) -> Optional[Customer]:
+        """Keep a customer loaded from the store, reusing any copy already in memory"""
+        if customer is None:
+            return None
+        existing = self.customers.get(customer.customer_id)
+        return existing if existing is not None else self._register(customer)
+    
     def get_customer(self, customer_id: str) -> Optional[Customer]:
         """Get customer by ID"""
-        return self.customers.get(customer_id)
+        customer = self.customers.get(customer_id)
+        if customer is None and self.store is not None:
+            customer = self._cached(self.store.load_customer(customer_id))
+        return customer
     
     def remove_customer(self, customer_id: str) -> bool:
         """Remove customer by ID"""
         if customer_id in self.customers:
-            del self.customers[customer_id]
+            customer = self.customers.pop(customer_id)
+            self._total_accounts -= len(customer.accounts)
+            for account_number in customer.accounts:
+                self._unindex_account(account_number, customer)
+            self._unindex_email(customer.email, customer)
+            self.name_index.remove(customer)
+            customer._manager = None
+            if self.store is not None:
+                self.store.delete_customer(customer_id)
+            if self.journal is not None:
+                self.journal.log_customer_removed(customer_id)
+            if self.id_allocator is not None:
+                self.id_allocator.release(customer_id)
             return True
         return False
     
     def find_customer_by_account(self, account_number: str) -> Optional[Customer]:
         """Find customer who owns an account"""
-        for customer in self.customers.values():
-            if account_number in customer.accounts:
-                return customer
-        return None
+        customer = self._first(self._account_index, account_number)
+        if customer is None and self.store is not None:
+            customer = self._cached(self.store.find_customer_by_account(account_number))
+        return customer
     
     def find_customer_by_email(self, email: str) -> Optional[Customer]:
         """Find customer by email"""
-        for customer in self.customers.values():
-            if customer.email == email:
-                return customer
-        return None
+        customer = self._first(self._email_index, email)
+        if customer is None and self.store is not None:
+            customer = self._cached(self.store.find_customer_by_email(email))
+        return customer
+    
+    def find_customers_by_name(self, name: str) -> List[Customer]:
+        """Find customers by name, ignoring case and extra spaces"""
+        return self.name_index.exact(name)
+    
+    def search_customers(self, prefix: str, limit: int = 20) -> List[Customer]:
+        """Customers whose name starts with prefix (case-insensitive), in name order"""
+        return self.name_index.prefix(prefix, limit)
+    
+    def search_customers_fuzzy(self, name: str, max_distance: int = 1,
+                               limit: int = 20) -> List[Tuple[int, Customer]]:
+        """
+        Customers whose name matches despite typos
+        
+        Name lookups cover customers held in memory; call load_from_store()
+        first when the manager is backed by a store.
+        
+        Returns:
+            list: (edit distance, Customer) pairs, closest first
+        """
+        return self.name_index.fuzzy(name, max_distance, limit)
+    
+    def attach_id_allocator(self, allocator) -> None:
+        """
+        Draw on allocator for new customer IDs, releasing them when customers are removed
+        
+        IDs of customers held in memory are marked as in use; call
+        load_from_store() first when the manager is backed by a store.
+        """
+        self.id_allocator = allocator
+        for customer_id in self.customers:
+            allocator.observe(customer_id)
+    
+    def load_from_store(self) -> int:
+        """Bring every stored customer into memory; returns the count loaded"""
+        loaded = 0
+        for customer in self.store.load_customers():
+            if customer.customer_id not in self.customers:
+                self._register(customer)
+                loaded += 1
+        return loaded
+    
+    # ---------------- CUSTOMER CHANGE HOOKS ----------------
+    def _on_account_added(self, customer: Customer, account_number: str) -> None:
+        self._total_accounts += 1
+        self._index_account(account_number, customer)
+        if self.store is not None:
+            self.store.save_customer(customer)
+        if self.journal is not None:
+            self.journal.log_account_linked(customer.customer_id, account_number)
+    
+    def _on_account_removed(self, customer: Customer, account_number: str) -> None:
+        self._total_accounts -= 1
+        self._unindex_account(account_number, customer)
+        if self.store is not None:
+            self.store.save_customer(customer)
+        if self.journal is not None:
+            self.journal.log_account_unlinked(customer.customer_id, account_number)
+    
+    def _on_info_updated(self, customer: Customer, old_name: str, old_email: str, changes: Dict) -> None:
+        if customer.name != old_name:
+            self.name_index.rename(customer, old_name)
+        if customer.email != old_email:
+            self._unindex_email(old_email, customer)
+            self._index_email(customer.email, customer)
+        if self.store is not None:
+            self.store.save_customer(customer)
+        if self.journal is not None:
+            self.journal.log_customer_updated(customer.customer_id, changes)
+    
+    # ---------------- INDEX MAINTENANCE ----------------
+    # Each key maps to every customer that has it.  Lookups return the
+    # earliest registered one, as the old linear scans over self.customers
+    # did, however the holders were added (e.g. after an email change).
+    @staticmethod
+    def _first(index: Dict[str, Dict[str, Customer]], key: str) -> Optional[Customer]:
+        holders = index.get(key)
+        if not holders:
+            return None
+        if len(holders) == 1:
+            return next(iter(holders.values()))
+        return min(holders.values(), key=lambda c: c._registered)
+    
+    @staticmethod
+    def _unindex(index: Dict[str, Dict[str, Customer]], key: str, customer: Customer) -> None:
+        holders = index.get(key)
+        if holders is not None and holders.get(customer.customer_id) is customer:
+            del holders[customer.customer_id]
+            if not holders:
+                del index[key]
+    
+    def _index_account(self, account_number: str, customer: Customer) -> None:
+        self._account_index.setdefault(account_number, {})[customer.customer_id] = customer
+    
+    def _unindex_account(self, account_number: str, customer: Customer) -> None:
+        self._unindex(self._account_index, account_number, customer)
+    
+    def _index_email(self, email: str, customer: Customer) -> None:
+        self._email_index.setdefault(email, {})[customer.customer_id] = customer
+    
+    def _unindex_email(self, email: str, customer: Customer) -> None:
+        self._unindex(self._email_index, email, customer)
     
     def get_all_customers(self) -> List[Customer]:
         """Get all customers"""
@@ -122,17 +332,25 @@ class CustomerManager:
         """Get total number of customers"""
         return len(self.customers)
     
+    def get_total_accounts(self) -> int:
+        """Get number of accounts linked to all customers"""
+        return self._total_accounts
+    
     def generate_customer_report(self) -> Dict:
-        """Generate summary report of all customers"""
-        report = {
+        """Generate summary report of all customers; its info dicts are read-only (see iter_customer_info)"""
+        return {
             'total_customers': self.get_customer_count(),
-            'customers': [],
-            'total_accounts': 0
+            'customers': list(self.iter_customer_info()),
+            'total_accounts': self._total_accounts
         }
-        
+    
+    def iter_customer_info(self) -> Iterator[Dict]:
+        """
+        Yield each customer's info dict without building a list first
+
+        The dicts are the customers' cached info (Customer.cached_info), so
+        nothing is allocated per customer and they must not be modified.
+        Customers must not be added or removed while the iterator is in use.
+        """
         for customer in self.customers.values():
-            customer_info = customer.get_customer_info()
-            report['customers'].append(customer_info)
-            report['total_accounts'] += len(customer.accounts)
-        
-        return report
+            yield customer.cached_info()
@@ -0,0 +1,213 @@
+"""
+History View Module
+Virtualized transaction history window backed by paginated reads
+"""
+
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Callable, List
+
+
+class PageCache:
+    """
+    Fetches rows a page at a time and keeps the most recent pages.
+
+    fetch_page(offset, limit) returns up to limit rows starting at offset,
+    e.g. BankAccount.get_transaction_history(limit, offset).
+    """
+
+    def __init__(self, fetch_page: Callable[[int, int], List], page_size: int = 100, max_pages: int = 8):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages: "OrderedDict[int, List]" = OrderedDict()
+
+    def page(self, number: int) -> List:
+        """One page, read through the cache"""
+        page = self._pages.get(number)
+        if page is None:
+            page = self.fetch(number)
+            self.put(number, page)
+        else:
+            self._pages.move_to_end(number)
+        return page
+
+    def has_page(self, number: int) -> bool:
+        return number in self._pages
+
+    def put(self, number: int, page: List) -> None:
+        """Store a page fetched elsewhere (e.g. on a worker thread)"""
+        self._pages[number] = page
+        if len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def fetch(self, number: int) -> List:
+        """Read one page without caching it; safe to call from a worker thread"""
+        return self.fetch_page(number * self.page_size, self.page_size)
+
+    def rows(self, first: int, count: int) -> List:
+        """Rows [first, first + count), touching only the pages they fall in"""
+        rows = []
+        position = first
+        while len(rows) < count:
+            page = self.page(position // self.page_size)
+            start = position % self.page_size
+            chunk = page[start:start + count - len(rows)]
+            if not chunk:
+                break
+            rows.extend(chunk)
+            position += len(chunk)
+        return rows
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+
+class HistoryView(ttk.Frame):
+    """
+    Transaction table that only ever holds the rows on screen.
+
+    The Treeview contains one item per visible row; the scrollbar is
+    driven by the total row count, and scrolling swaps in the rows for the
+    new position from a PageCache.  Opening the view reads one page no
+    matter how long the history is.
+
+    With an executor (task_executor.TaskExecutor) pages are read on a
+    worker thread: rows not loaded yet show as "Loading..." and fill in
+    when their page arrives, so a slow store never blocks scrolling.
+    """
+
+    COLUMNS = (
+        ("date", "Date", 140),
+        ("type", "Type", 110),
+        ("amount", "Amount", 90),
+        ("description", "Description", 230),
+        ("id", "ID", 130),
+    )
+
+    def __init__(self, master, fetch_page: Callable[[int, int], List], total_rows: int,
+                 visible_rows: int = 15, page_size: int = 100, executor=None):
+        """
+        Initialize the view
+
+        Args:
+            master: Parent widget
+            fetch_page: Callable (offset, limit) -> list of Transaction
+            total_rows (int): Number of rows available
+            visible_rows (int): Rows shown before the window is resized
+            page_size (int): Rows fetched per read
+            executor (TaskExecutor): Reads pages in the background when given
+        """
+        super().__init__(master)
+        self.cache = PageCache(fetch_page, page_size)
+        self.executor = executor
+        self._loading = {}  # page number -> TaskHandle
+        self.total_rows = total_rows
+        self.visible_rows = visible_rows
+        self.first = 0
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in self.COLUMNS], show="headings",
+                                 height=visible_rows, selectmode="browse")
+        for name, heading, width in self.COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, anchor="e" if name == "amount" else "w")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_by(-1 if e.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-1) or "break")  # X11 wheel
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(1) or "break")
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-self.visible_rows) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll_by(self.visible_rows) or "break")
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda e: self.scroll_to(self.total_rows) or "break")
+        self.tree.bind("<Configure>", self._on_resize)
+        self.bind("<Destroy>", self._on_destroy)
+        self._render()
+
+    # ---------------- SCROLLING ----------------
+    def scroll_to(self, first: int) -> None:
+        first = max(0, min(first, self.total_rows - self.visible_rows))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def scroll_by(self, rows: int) -> None:
+        self.scroll_to(self.first + rows)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(round(float(value) * self.total_rows))
+        elif action == tk.SCROLL:
+            step = self.visible_rows if unit == tk.PAGES else 1
+            self.scroll_by(int(value) * step)
+
+    def _on_resize(self, event) -> None:
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        # One row's worth of height goes to the headings
+        visible = max(1, event.height // int(row_height) - 1)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.tree.configure(height=visible)
+            self.first = max(0, min(self.first, self.total_rows - visible))
+            self._render()
+
+    # ---------------- RENDERING ----------------
+    def _visible(self) -> List:
+        """Rows on screen; None for rows whose page is still loading"""
+        count = max(0, min(self.visible_rows, self.total_rows - self.first))
+        if self.executor is None:
+            return self.cache.rows(self.first, count)
+        size = self.cache.page_size
+        rows = []
+        for number in range(self.first // size, (self.first + count - 1) // size + 1):
+            start = max(self.first, number * size)
+            stop = min(self.first + count, (number + 1) * size)
+            if self.cache.has_page(number):
+                page = self.cache.page(number)
+                rows.extend(page[start - number * size:stop - number * size])
+            else:
+                self._load(number)
+                rows.extend([None] * (stop - start))
+        return rows
+
+    def _load(self, number: int) -> None:
+        if number in self._loading:
+            return
+
+        def loaded(page):
+            del self._loading[number]
+            self.cache.put(number, page)
+            if self.winfo_exists():
+                self._render()
+
+        self._loading[number] = self.executor.submit(
+            self.cache.fetch, number, on_done=loaded, on_cancel=lambda: self._loading.pop(number, None))
+
+    def _on_destroy(self, event) -> None:
+        if event.widget is self:
+            for handle in list(self._loading.values()):
+                handle.cancel()
+
+    def _render(self) -> None:
+        self.tree.delete(*self.tree.get_children())
+        for t in self._visible():
+            if t is None:
+                self.tree.insert("", tk.END, values=("Loading...", "", "", "", ""))
+            else:
+                self.tree.insert("", tk.END, values=(t.date, t.transaction_type, f"${t.amount:.2f}",
+                                                     t.description, t.transaction_id))
+        if self.total_rows:
+            self.scrollbar.set(self.first / self.total_rows,
+                               min(1.0, (self.first + self.visible_rows) / self.total_rows))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def refresh(self, total_rows: int) -> None:
+        """Drop cached pages and redraw, e.g. after new postings"""
+        self.total_rows = total_rows
+        self.cache.clear()
+        self.first = max(0, min(self.first, total_rows - self.visible_rows))
+        self._render()
@@ -0,0 +1,76 @@
+"""
+Hooks Module
+Shared registry of wrappers installed on methods at runtime
+
+metrics and tracing both wrap methods of the same classes.  Each of them
+installs its wrappers here as a named layer, and the registry builds every
+method's wrapper chain from the one real original, so layers can be added
+and removed in any order without one taking another's wrapper for the
+original.  A method with no layers left gets its original back, so code
+that is not being measured or traced runs unwrapped.
+"""
+
+import threading
+from typing import Callable, Dict, List, Tuple
+
+# (owner, attribute) -> (original as found in the class dict, [(layer, wrap factory)])
+_chains: Dict[Tuple[object, str], Tuple[object, List[Tuple[str, Callable]]]] = {}
+_lock = threading.RLock()
+
+
+def _rebuild(owner, attribute: str) -> None:
+    """Install original wrapped by every layer in order (first added is innermost)"""
+    original, layers = _chains[(owner, attribute)]
+    if not layers:
+        del _chains[(owner, attribute)]
+        setattr(owner, attribute, original)
+        return
+    is_descriptor = isinstance(original, (staticmethod, classmethod))
+    fn = original.__func__ if is_descriptor else original
+    for _layer, wrap in layers:
+        fn = wrap(fn)
+    setattr(owner, attribute, type(original)(fn) if is_descriptor else fn)
+
+
+def install(layer: str, owner, attribute: str, wrap: Callable[[Callable], Callable]) -> bool:
+    """
+    Add a layer's wrapper to owner.attribute
+
+    Args:
+        layer (str): Name of the installing layer, e.g. "metrics"
+        owner: Class whose attribute is wrapped
+        attribute (str): Function, staticmethod or classmethod defined on owner
+        wrap: Callable taking the function below and returning its wrapper
+
+    Returns:
+        bool: False if the layer already wraps this attribute
+    """
+    key = (owner, attribute)
+    with _lock:
+        if key not in _chains:
+            _chains[key] = (owner.__dict__[attribute], [])
+        layers = _chains[key][1]
+        if any(name == layer for name, _wrap in layers):
+            return False
+        layers.append((layer, wrap))
+        _rebuild(owner, attribute)
+        return True
+
+
+def uninstall(layer: str) -> int:
+    """Remove every wrapper a layer installed; returns how many were removed"""
+    removed = 0
+    with _lock:
+        for (owner, attribute), (_original, layers) in list(_chains.items()):
+            kept = [(name, wrap) for name, wrap in layers if name != layer]
+            if len(kept) != len(layers):
+                removed += len(layers) - len(kept)
+                layers[:] = kept
+                _rebuild(owner, attribute)
+    return removed
+
+
+def installed(layer: str) -> bool:
+    """Whether a layer has any wrapper installed"""
+    with _lock:
+        return any(name == layer for _original, layers in _chains.values() for name, _wrap in layers)
@@ -0,0 +1,218 @@
+"""
+ID Allocator Module
+Issues account numbers and customer IDs in a widened, checksummed format
+
+A widened ID is the prefix, a 9-digit sequence number and a Luhn check
+digit (ACC0000010009, CUST0000010009), so a mistyped digit or swapped
+pair is caught before any lookup.  The old 3-digit IDs (ACC001-ACC999,
+CUST001-CUST999) stay valid; the allocator starts above them so the two
+ranges never meet.
+"""
+
+import os
+import struct
+import threading
+from collections import deque
+from typing import Optional, Set
+
+ACCOUNT_PREFIX = "ACC"
+CUSTOMER_PREFIX = "CUST"
+
+SEQUENCE_DIGITS = 9
+LEGACY_DIGITS = 3
+FIRST_SEQUENCE = 10 ** LEGACY_DIGITS  # Sequences below this are the legacy 3-digit IDs
+MAX_SEQUENCE = 10 ** SEQUENCE_DIGITS - 1
+
+# State file records: kind byte + sequence number
+_RECORD = struct.Struct("<cq")
+_RESERVED = b"H"  # Sequences below this value may have been issued
+_FREED = b"F"     # Sequence released for reuse
+_REUSED = b"U"    # Released sequence issued again
+
+
+def check_digit(digits: str) -> str:
+    """Luhn check digit for a string of decimal digits"""
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = ord(ch) - 48
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return str(-total % 10)
+
+
+def format_id(prefix: str, sequence: int) -> str:
+    """Widened ID for a sequence number, e.g. format_id("ACC", 1000) -> "ACC0000010009" """
+    digits = f"{sequence:0{SEQUENCE_DIGITS}d}"
+    return prefix + digits + check_digit(digits)
+
+
+def parse_id(prefix: str, value: str) -> Optional[int]:
+    """
+    Sequence number of a legacy or widened ID, or None if it is malformed
+
+    Legacy IDs map to their own number (ACC042 -> 42); widened IDs must carry
+    a correct check digit.
+    """
+    if not value.startswith(prefix):
+        return None
+    digits = value[len(prefix):]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    if len(digits) == LEGACY_DIGITS:
+        sequence = int(digits)
+        return sequence if sequence >= 1 else None
+    if len(digits) == SEQUENCE_DIGITS + 1 and check_digit(digits[:-1]) == digits[-1]:
+        sequence = int(digits[:-1])
+        return sequence if FIRST_SEQUENCE <= sequence else None
+    return None
+
+
+class IdAllocator:
+    """
+    O(1) ID allocation with a persisted high-water mark and free list.
+
+    IDs come from the free list first (oldest release first), then from
+    the next never-issued sequence number.  With a state file, allocations
+    are appended as small fixed-size records.  The high-water mark is
+    reserved RESERVE_BLOCK sequences ahead, so only one write in a block
+    is needed for fresh IDs.  After a crash the unused rest of the block is
+    skipped: IDs can have gaps but are never issued twice.
+    """
+
+    RESERVE_BLOCK = 1024
+
+    def __init__(self, prefix: str, path: Optional[str] = None, sync: bool = False):
+        """
+        Initialize the allocator
+
+        Args:
+            prefix (str): ACCOUNT_PREFIX or CUSTOMER_PREFIX
+            path (str): State file; created if missing, None keeps state in memory only
+            sync (bool): fsync the state file after every record
+        """
+        self.prefix = prefix
+        self.path = path
+        self.sync = sync
+        self._lock = threading.Lock()
+        self._next = FIRST_SEQUENCE  # Next never-issued sequence
+        self._reserved = FIRST_SEQUENCE  # Persisted high-water mark
+        self._free: deque = deque()
+        self._free_set: Set[int] = set()
+        self._file = None
+        if path is not None:
+            self._load()
+
+    # ---------------- PERSISTENCE ----------------
+    def _load(self) -> None:
+        """Replay the state file, then rewrite it compacted and open it for appends"""
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+            # A torn final record is ignored
+            for offset in range(0, len(data) - _RECORD.size + 1, _RECORD.size):
+                kind, sequence = _RECORD.unpack_from(data, offset)
+                if kind == _RESERVED:
+                    self._reserved = max(self._reserved, sequence)
+                elif kind == _FREED and sequence not in self._free_set:
+                    self._free.append(sequence)
+                    self._free_set.add(sequence)
+                elif kind == _REUSED and sequence in self._free_set:
+                    self._free.remove(sequence)
+                    self._free_set.discard(sequence)
+            # Anything up to the reserved mark may have been handed out
+            self._next = self._reserved
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_RECORD.pack(_RESERVED, self._reserved))
+            f.write(b"".join(_RECORD.pack(_FREED, s) for s in self._free))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "ab")
+
+    def _write(self, kind: bytes, sequence: int) -> None:
+        if self._file is not None:
+            self._file.write(_RECORD.pack(kind, sequence))
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+
+    def _advance(self, sequence: int) -> None:
+        """Mark every sequence below sequence as issued, reserving ahead as needed"""
+        self._next = sequence
+        if sequence > self._reserved:
+            self._reserved = min(sequence + self.RESERVE_BLOCK, MAX_SEQUENCE + 1)
+            self._write(_RESERVED, self._reserved)
+
+    # ---------------- ALLOCATION ----------------
+    def allocate(self) -> str:
+        """Issue an ID that is not in use"""
+        with self._lock:
+            if self._free:
+                sequence = self._free.popleft()
+                self._free_set.discard(sequence)
+                self._write(_REUSED, sequence)
+            else:
+                sequence = self._next
+                if sequence > MAX_SEQUENCE:
+                    raise RuntimeError(f"{self.prefix} ID space exhausted")
+                self._advance(sequence + 1)
+            return format_id(self.prefix, sequence)
+
+    def release(self, value: str) -> bool:
+        """
+        Return an ID to the free list so it can be issued again
+
+        Returns:
+            bool: False for legacy, malformed, never-issued or already free IDs
+        """
+        sequence = parse_id(self.prefix, value)
+        with self._lock:
+            if (sequence is None or sequence < FIRST_SEQUENCE or sequence >= self._next
+                    or sequence in self._free_set):
+                return False
+            self._free.append(sequence)
+            self._free_set.add(sequence)
+            self._write(_FREED, sequence)
+            return True
+
+    def observe(self, value: str) -> None:
+        """
+        Record that an ID is in use, e.g. one loaded from storage
+
+        Keeps the allocator from issuing it even if the state file was lost.
+        """
+        sequence = parse_id(self.prefix, value)
+        if sequence is None or sequence < FIRST_SEQUENCE:
+            return
+        with self._lock:
+            if sequence in self._free_set:
+                self._free.remove(sequence)
+                self._free_set.discard(sequence)
+                self._write(_REUSED, sequence)
+            elif sequence >= self._next:
+                self._advance(sequence + 1)
+
+    @property
+    def high_water(self) -> int:
+        """Next never-issued sequence number"""
+        return self._next
+
+    @property
+    def free_count(self) -> int:
+        return len(self._free)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
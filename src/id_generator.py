@@ -0,0 +1,131 @@
+"""
+ID Generator Module
+Compact, time-ordered 64-bit transaction IDs
+
+A transaction ID is an integer laid out snowflake-style:
+
+    41 bits  milliseconds since EPOCH_MS
+    10 bits  node (e.g. shard or process) that issued it
+    12 bits  sequence within the millisecond
+
+so IDs sort by time, never collide between nodes, and cost no entropy
+or string allocation to issue.  They are rendered as 16 lowercase hex
+digits only when shown to a person (format_id / parse_id).
+"""
+
+import threading
+import time
+from array import array
+from typing import Optional
+
+EPOCH_MS = 1_704_067_200_000  # 2024-01-01 00:00:00 UTC
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE = (1 << NODE_BITS) - 1
+_SEQUENCE_LIMIT = 1 << SEQUENCE_BITS
+_TIMESTAMP_SHIFT = NODE_BITS + SEQUENCE_BITS
+
+
+def format_id(transaction_id: int) -> str:
+    """Render an ID as the fixed-width string shown on receipts"""
+    return f"{transaction_id:016x}"
+
+
+def parse_id(text: str) -> Optional[int]:
+    """ID from its rendered form, or None if text is not one"""
+    if len(text) != 16:
+        return None
+    try:
+        return int(text, 16)
+    except ValueError:
+        return None
+
+
+class SnowflakeGenerator:
+    """Issues IDs for one node; thread-safe"""
+
+    def __init__(self, node_id: int = 0, epoch_ms: int = EPOCH_MS):
+        """
+        Initialize the generator
+
+        Args:
+            node_id (int): 0..MAX_NODE, unique per process or shard issuing IDs
+            epoch_ms (int): Start of the ID clock in Unix milliseconds
+        """
+        if not 0 <= node_id <= MAX_NODE:
+            raise ValueError(f"node_id must be between 0 and {MAX_NODE}")
+        self.node_id = node_id
+        self.epoch_ms = epoch_ms
+        self._node_bits = node_id << SEQUENCE_BITS
+        self._last_ms = 0
+        self._next_sequence = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, count: int):
+        """Yield (millisecond, first sequence, n) blocks covering count IDs"""
+        with self._lock:
+            now = time.time_ns() // 1_000_000 - self.epoch_ms
+            if now > self._last_ms:
+                self._last_ms, self._next_sequence = now, 0
+            blocks = []
+            while count:
+                if self._next_sequence == _SEQUENCE_LIMIT:
+                    # Sequence exhausted: borrow the next millisecond, the clock catches up
+                    self._last_ms, self._next_sequence = self._last_ms + 1, 0
+                n = min(count, _SEQUENCE_LIMIT - self._next_sequence)
+                blocks.append((self._last_ms, self._next_sequence, n))
+                self._next_sequence += n
+                count -= n
+            return blocks
+
+    def next_id(self) -> int:
+        ms, sequence, _n = self._reserve(1)[0]
+        return (ms << _TIMESTAMP_SHIFT) | self._node_bits | sequence
+
+    def next_ids(self, count: int) -> array:
+        """count consecutive IDs as an array('q'); one lock round trip for the lot"""
+        ids = array('q')
+        for ms, sequence, n in self._reserve(count):
+            base = (ms << _TIMESTAMP_SHIFT) | self._node_bits
+            ids.extend(range(base + sequence, base + sequence + n))
+        return ids
+
+
+class SequentialGenerator:
+    """Issues 1, 2, 3, ... - for reproducible runs such as generated test data"""
+
+    def __init__(self, start: int = 1):
+        self._next = start
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._next += 1
+            return self._next - 1
+
+    def next_ids(self, count: int) -> array:
+        with self._lock:
+            first, self._next = self._next, self._next + count
+        return array('q', range(first, first + count))
+
+
+# ---------------- PROCESS-WIDE GENERATOR ----------------
+_generator = SnowflakeGenerator()
+
+
+def set_generator(generator) -> None:
+    """Replace the generator used for new transactions (anything with next_id/next_ids)"""
+    global _generator
+    _generator = generator
+
+
+def get_generator():
+    return _generator
+
+
+def next_id() -> int:
+    return _generator.next_id()
+
+
+def next_ids(count: int) -> array:
+    return _generator.next_ids(count)
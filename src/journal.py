@@ -0,0 +1,308 @@
+"""
+Journal Module
+Records account and customer mutations in the write-ahead log and
+rebuilds state from the latest snapshot plus the log tail
+"""
+
+import glob
+import json
+import os
+import pickle
+import struct
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from account import BankAccount
+from account_store import AccountStore
+from customer import Customer, CustomerManager
+from money import Money
+from transaction import Transaction
+from wal import SYNC_ALWAYS, WriteAheadLog
+
+# Record types
+OP_OPEN_ACCOUNT = 1
+OP_POSTING = 2
+OP_CLOSE_ACCOUNT = 3
+OP_ADD_CUSTOMER = 4
+OP_REMOVE_CUSTOMER = 5
+OP_LINK_ACCOUNT = 6
+OP_UNLINK_ACCOUNT = 7
+OP_UPDATE_CUSTOMER = 8
+
+# Posting body: 64-bit transaction id, amount in cents, timestamp in microseconds,
+# then the lengths of the account number, type and description strings that follow
+_POSTING = struct.Struct("<qqqHHH")
+
+_SNAPSHOT_PATTERN = "snapshot-*.pkl"
+
+
+def encode_posting(transaction: Transaction) -> Tuple[int, bytes]:
+    """Pack a transaction into a (record type, binary POSTING body) pair"""
+    account = transaction.account_number.encode()
+    ttype = transaction.transaction_type.encode()
+    description = transaction.description.encode()
+    return OP_POSTING, (_POSTING.pack(transaction.id, transaction.amount.cents, transaction.timestamp,
+                                      len(account), len(ttype), len(description))
+                        + account + ttype + description)
+
+
+def decode_posting(payload: bytes) -> Transaction:
+    """Rebuild the transaction stored in a POSTING body"""
+    transaction_id, cents, timestamp, acc_len, type_len, desc_len = _POSTING.unpack_from(payload)
+    pos = _POSTING.size
+    account = payload[pos:pos + acc_len].decode()
+    pos += acc_len
+    ttype = payload[pos:pos + type_len].decode()
+    pos += type_len
+    description = payload[pos:pos + desc_len].decode()
+    return Transaction(ttype, Money(cents), account, description,
+                       transaction_id=transaction_id, timestamp=timestamp)
+
+
+def _encode_json(data: Dict) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+class Journal:
+    """
+    Durable home for an AccountStore and CustomerManager.
+
+    Opening a journal recovers the latest snapshot, replays the log records
+    written after it, and then attaches itself to the store and manager so
+    every later deposit, withdrawal, transfer and customer change is logged.
+    checkpoint() writes a new snapshot and drops the log segments it covers,
+    so recovery only ever replays the tail.
+
+    Checkpoints are fuzzy: the snapshot is taken while postings continue,
+    from an LSN read before it starts.  Each account is pickled under its
+    own lock, so it is internally consistent, and recovery skips any record
+    after the LSN whose effect the snapshot already holds (postings by
+    transaction ID, opens, closes, links by current state).  Automatic
+    checkpoints run on one background thread, which holds no other locks
+    while it takes each account's; call checkpoint() yourself only from a
+    thread that holds no account lock.
+    """
+
+    def __init__(self, directory: str, durability: str = SYNC_ALWAYS,
+                 interval_ms: int = 10, snapshot_every: int = 100_000):
+        """
+        Open or create a journal directory
+
+        Args:
+            directory (str): Directory for snapshots and log segments
+            durability (str): WAL durability level (see wal.DURABILITY_LEVELS)
+            interval_ms (int): fsync period when durability is SYNC_INTERVAL
+            snapshot_every (int): Take a snapshot after this many records (0 disables)
+        """
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+        self.wal = WriteAheadLog(os.path.join(directory, "wal"), durability, interval_ms)
+        self.account_store = AccountStore()
+        self.customer_manager = CustomerManager()
+        self._records_since_snapshot = 0
+        self._checkpoint_lock = threading.Lock()  # One checkpoint at a time
+        self.checkpoint_error = None  # Last exception raised by a background checkpoint
+
+        started = time.perf_counter()
+        snapshot_lsn = self._load_snapshot()
+        replayed = self._replay(snapshot_lsn)
+        self.recovery_stats = {
+            "snapshot_lsn": snapshot_lsn,
+            "records_replayed": replayed,
+            "seconds": time.perf_counter() - started,
+        }
+
+        self.account_store.attach_journal(self)
+        self.customer_manager.journal = self
+
+        self._checkpointer = None
+        if snapshot_every:
+            self._checkpoint_due = threading.Event()
+            self._stopping = False
+            self._checkpointer = threading.Thread(target=self._checkpoint_loop, name="journal-checkpoint",
+                                                  daemon=True)
+            self._checkpointer.start()
+
+    # ---------------- LOGGING HOOKS ----------------
+    def _append(self, op: int, payload: bytes) -> None:
+        self.wal.append(op, payload)
+        self._records_written(1)
+
+    def _records_written(self, count: int) -> None:
+        # The posting thread may hold account locks, so it only signals the checkpointer
+        self._records_since_snapshot += count
+        if self.snapshot_every and self._records_since_snapshot >= self.snapshot_every:
+            self._checkpoint_due.set()
+
+    def log_posting(self, account: BankAccount, transaction: Transaction) -> None:
+        self._append(*encode_posting(transaction))
+
+    def log_postings(self, account: BankAccount, transactions: List[Transaction]) -> None:
+        # One group write (and at most one fsync) for the whole batch
+        self.wal.append_many([encode_posting(t) for t in transactions])
+        self._records_written(len(transactions))
+
+    def log_open_account(self, account: BankAccount) -> None:
+        # One group, so a checkpoint can't fall between the open and its postings
+        records = [(OP_OPEN_ACCOUNT, _encode_json({
+            "holder": account.account_holder,
+            "account_number": account.account_number,
+        }))]
+        records.extend(encode_posting(t) for t in account.transactions)
+        self.wal.append_many(records)
+        self._records_written(len(records))
+
+    def log_close_account(self, account_number: str) -> None:
+        self._append(OP_CLOSE_ACCOUNT, account_number.encode())
+
+    def log_customer_added(self, customer: Customer) -> None:
+        self._append(OP_ADD_CUSTOMER, _encode_json({
+            "customer_id": customer.customer_id,
+            "name": customer.name,
+            "email": customer.email,
+            "phone": customer.phone,
+            "address": customer.address,
+            "accounts": customer.accounts,
+            "date_joined": customer.date_joined,
+        }))
+
+    def log_customer_removed(self, customer_id: str) -> None:
+        self._append(OP_REMOVE_CUSTOMER, customer_id.encode())
+
+    def log_account_linked(self, customer_id: str, account_number: str) -> None:
+        self._append(OP_LINK_ACCOUNT, _encode_json([customer_id, account_number]))
+
+    def log_account_unlinked(self, customer_id: str, account_number: str) -> None:
+        self._append(OP_UNLINK_ACCOUNT, _encode_json([customer_id, account_number]))
+
+    def log_customer_updated(self, customer_id: str, changes: Dict) -> None:
+        self._append(OP_UPDATE_CUSTOMER, _encode_json({"customer_id": customer_id, "changes": changes}))
+
+    # ---------------- SNAPSHOTS ----------------
+    def _checkpoint_loop(self) -> None:
+        while True:
+            self._checkpoint_due.wait()
+            self._checkpoint_due.clear()
+            if self._stopping:
+                return
+            try:
+                self.checkpoint()
+            except Exception as e:  # Keep logging; the next trigger retries
+                self.checkpoint_error = e
+
+    def checkpoint(self) -> int:
+        """Write a snapshot of the current state; returns the LSN it covers"""
+        with self._checkpoint_lock:
+            self._records_since_snapshot = 0
+            # Every record up to lsn was applied before it was logged, so the
+            # snapshot taken after this point includes all of them
+            lsn = self.wal.last_lsn
+            self.wal.rotate()
+            accounts = []
+            for account in self.account_store.get_all_accounts():
+                with account.lock:
+                    accounts.append(pickle.dumps(account, protocol=pickle.HIGHEST_PROTOCOL))
+            state = {
+                "lsn": lsn,
+                "accounts": accounts,
+                "customers": self.customer_manager.get_all_customers(),
+            }
+            path = os.path.join(self.directory, f"snapshot-{lsn:020d}.pkl")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+            for old in self._snapshot_paths()[:-1]:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass
+            self.wal.drop_segments_before(lsn + 1)
+            return lsn
+
+    def _snapshot_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, _SNAPSHOT_PATTERN)))
+
+    def _load_snapshot(self) -> int:
+        paths = self._snapshot_paths()
+        if not paths:
+            return 0
+        with open(paths[-1], "rb") as f:
+            state = pickle.load(f)
+        for account in state["accounts"]:
+            self.account_store.add_account(pickle.loads(account))
+        for customer in state["customers"]:
+            self.customer_manager.add_customer(customer)
+        return state["lsn"]
+
+    # ---------------- RECOVERY ----------------
+    def _replay(self, after_lsn: int) -> int:
+        """
+        Apply every log record after the snapshot; the journal is not attached yet
+
+        The snapshot may already hold some of these records (see the class
+        docstring), so each one is skipped when its effect is present.
+        """
+        store = self.account_store
+        manager = self.customer_manager
+        replayed = 0
+        for _lsn, op, payload in self.wal.records(after_lsn):
+            replayed += 1
+            if op == OP_POSTING:
+                transaction = decode_posting(payload)
+                account = store.get_account(transaction.account_number)
+                # No account: it was closed before the snapshot was taken
+                if account is not None and store.transaction_index.locate(transaction.id) is None:
+                    account._apply_posting(transaction)
+            elif op == OP_OPEN_ACCOUNT:
+                # The account's postings, opening balance included, follow this record
+                data = json.loads(payload)
+                if not store.has_account(data["account_number"]):
+                    store.add_account(BankAccount.from_postings(data["holder"], data["account_number"], []))
+            elif op == OP_CLOSE_ACCOUNT:
+                store.remove_account(payload.decode())
+            elif op == OP_ADD_CUSTOMER:
+                data = json.loads(payload)
+                customer = Customer(data["customer_id"], data["name"], data["email"],
+                                    data["phone"], data["address"])
+                for account_number in data["accounts"]:
+                    customer.add_account(account_number)
+                customer.date_joined = data["date_joined"]
+                manager.add_customer(customer)
+            elif op == OP_REMOVE_CUSTOMER:
+                manager.remove_customer(payload.decode())
+            elif op in (OP_LINK_ACCOUNT, OP_UNLINK_ACCOUNT):
+                customer_id, account_number = json.loads(payload)
+                customer = manager.get_customer(customer_id)
+                if customer is None:
+                    continue  # Removed before the snapshot was taken
+                if op == OP_LINK_ACCOUNT:
+                    customer.add_account(account_number)
+                else:
+                    customer.remove_account(account_number)
+            elif op == OP_UPDATE_CUSTOMER:
+                data = json.loads(payload)
+                customer = manager.get_customer(data["customer_id"])
+                if customer is not None:
+                    customer.update_info(**data["changes"])
+        return replayed
+
+    def close(self) -> None:
+        """Stop the checkpointer, flush the log and release its files"""
+        if self._checkpointer is not None:
+            self._stopping = True
+            self._checkpoint_due.set()
+            self._checkpointer.join()
+            self._checkpointer = None
+        self.wal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
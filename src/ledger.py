@@ -0,0 +1,199 @@
+"""
+Ledger Module
+Compact, column-oriented transaction storage for bank accounts
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from id_generator import next_ids
+from money import ZERO, Money
+from transaction import Transaction
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; totals() then sums in Python
+    np = None
+
+# Ranges shorter than this are summed in Python; NumPy's call overhead
+# outweighs its speed below a few hundred rows
+_NUMPY_MIN_ROWS = 256
+
+
+class TransactionLedger:
+    """
+    Append-only transaction history for a single account.
+
+    Each column lives in a typed array (amount in integer cents, type
+    code, timestamp, description code, 64-bit transaction id), so a posting
+    costs a few dozen bytes instead of a full Transaction object.  Transaction objects
+    are only built when a row is read.
+
+    Rows are appended in time order, so the timestamp column is sorted and
+    time ranges are found by binary search.
+    """
+
+    # Known transaction types get stable codes; anything else is appended
+    DEFAULT_TYPES = (
+        Transaction.ACCOUNT_CREATION,
+        Transaction.DEPOSIT,
+        Transaction.WITHDRAWAL,
+        Transaction.TRANSFER_IN,
+        Transaction.TRANSFER_OUT,
+    )
+
+    def __init__(self, account_number: str):
+        """
+        Initialize an empty ledger
+
+        Args:
+            account_number (str): Account that owns every row in this ledger
+        """
+        self.account_number: str = account_number
+        self._ids = array('q')
+        self._amounts = array('q')  # Integer cents
+        self._types = array('B')
+        self._timestamps = array('q')  # Integer microseconds
+        self._descriptions = array('I')
+        self._type_table: List[str] = list(self.DEFAULT_TYPES)
+        self._type_codes: Dict[str, int] = {t: i for i, t in enumerate(self._type_table)}
+        self._description_table: List[str] = []
+        self._description_codes: Dict[str, int] = {}
+
+    # ---------------- WRITING ----------------
+    def append(self, transaction: Transaction) -> int:
+        """Store a transaction and return its row position"""
+        self._ids.append(transaction.id)
+        self._amounts.append(transaction.amount.cents)
+        self._types.append(self._code_for_type(transaction.transaction_type))
+        self._timestamps.append(transaction.timestamp)
+        self._descriptions.append(self._code_for_description(transaction.description))
+        return len(self._amounts) - 1
+
+    def extend(self, transactions) -> None:
+        """Store several transactions in order"""
+        for transaction in transactions:
+            self.append(transaction)
+
+    def append_batch(self, rows: Sequence[Tuple[str, float, str]], timestamp: int) -> int:
+        """
+        Store many new postings without building Transaction objects
+
+        Args:
+            rows: (transaction_type, Money amount, description) tuples
+            timestamp (int): Posting time in microseconds shared by every row
+
+        Returns:
+            int: Row position of the first posting
+        """
+        first = len(self)
+        self._ids += next_ids(len(rows))
+        type_code = self._code_for_type
+        description_code = self._code_for_description
+        self._amounts.extend([row[1].cents for row in rows])
+        self._types.extend([type_code(row[0]) for row in rows])
+        self._timestamps.extend([timestamp] * len(rows))
+        self._descriptions.extend([description_code(row[2]) for row in rows])
+        return first
+
+    def _code_for_type(self, transaction_type: str) -> int:
+        code = self._type_codes.get(transaction_type)
+        if code is None:
+            code = len(self._type_table)
+            self._type_table.append(transaction_type)
+            self._type_codes[transaction_type] = code
+        return code
+
+    def _code_for_description(self, description: str) -> int:
+        code = self._description_codes.get(description)
+        if code is None:
+            code = len(self._description_table)
+            self._description_table.append(description)
+            self._description_codes[description] = code
+        return code
+
+    # ---------------- READING ----------------
+    def _row(self, index: int) -> Transaction:
+        """Materialize a Transaction view of one row"""
+        return Transaction(
+            transaction_type=self._type_table[self._types[index]],
+            amount=Money(self._amounts[index]),
+            account_number=self.account_number,
+            description=self._description_table[self._descriptions[index]],
+            transaction_id=self._ids[index],
+            timestamp=self._timestamps[index],
+        )
+
+    def keys(self, start: int = 0):
+        """Transaction id of each row from start on, in order"""
+        return self._ids[start:]
+
+    def find_id(self, transaction_id: int) -> Optional[int]:
+        """Row holding a transaction id, or None; ids are time-ordered like the rows"""
+        row = bisect_left(self._ids, transaction_id)
+        if row < len(self._ids) and self._ids[row] == transaction_id:
+            return row
+        return None
+
+    def position_of_time(self, timestamp: int) -> int:
+        """Position of the first row posted at or after timestamp (microseconds)"""
+        return bisect_left(self._timestamps, timestamp)
+
+    # ---------------- AGGREGATES ----------------
+    def totals(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, Money]:
+        """
+        Sum of the amounts posted under each transaction type
+
+        Args:
+            start, stop (int): Row range [start, stop), the whole ledger by default
+
+        Sums run over the integer-cents column, so they are exact; with
+        NumPy they are int64 reductions over a copy of the range.
+        """
+        start, stop, _step = slice(start, stop).indices(len(self))
+        if stop <= start:
+            return {}
+        if np is not None and stop - start >= _NUMPY_MIN_ROWS:
+            amounts = np.frombuffer(self._amounts[start:stop], dtype=np.int64)
+            types = np.frombuffer(self._types[start:stop], dtype=np.uint8)
+            sums = {int(code): int(amounts[types == code].sum()) for code in np.unique(types)}
+        else:
+            sums = {}
+            for code, cents in zip(self._types[start:stop], self._amounts[start:stop]):
+                sums[code] = sums.get(code, 0) + cents
+        return {self._type_table[code]: Money(cents) for code, cents in sums.items()}
+
+    def balance_at(self, position: int) -> Money:
+        """Balance after the first position rows, as BankAccount._apply_balance computes it"""
+        position = min(max(position, 0), len(self))
+        # The latest ACCOUNT_CREATION row before position sets the balance outright
+        creation = self._type_codes[Transaction.ACCOUNT_CREATION]
+        opened = self._types.tobytes().rfind(bytes((creation,)), 0, position)
+        balance = Money(self._amounts[opened]) if opened >= 0 else ZERO
+        totals = self.totals(opened + 1, position)
+        for transaction_type in (Transaction.DEPOSIT, Transaction.TRANSFER_IN):
+            balance += totals.get(transaction_type, ZERO)
+        for transaction_type in (Transaction.WITHDRAWAL, Transaction.TRANSFER_OUT):
+            balance -= totals.get(transaction_type, ZERO)
+        return balance
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ledger index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def copy(self) -> List[Transaction]:
+        """Return every transaction as a list, like list.copy() did before"""
+        return self[:]
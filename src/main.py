@@ -1,22 +1,112 @@
+import os
 import tkinter as tk
 from tkinter import messagebox, ttk
 from account import BankAccount
+from account_store import AccountStore
 from customer import Customer, CustomerManager
+from history_view import HistoryView
+from id_allocator import ACCOUNT_PREFIX, CUSTOMER_PREFIX, IdAllocator
+from journal import Journal
+from money import ZERO, Money
+import metrics
+import tracing
+from name_index import normalize
+from task_executor import TaskExecutor
 from validation import Validation
 import re
 
 class BankGUI:
-    def __init__(self, root):
+    BUSY_DELAY_MS = 300  # Only show a progress window for tasks slower than this
+
+    def __init__(self, root, journal=None):
         self.root = root
         self.root.title("Bank Account System")
         self.root.geometry("500x550")
         
-        self.customer_manager = CustomerManager()
+        # With a journal, customers and accounts survive restarts
+        if journal is not None:
+            self.customer_manager = journal.customer_manager
+            self.account_store = journal.account_store
+        else:
+            self.customer_manager = CustomerManager()
+            self.account_store = AccountStore()
+        # Customer IDs and blank account numbers are issued by allocators whose
+        # state is kept next to the journal
+        directory = journal.directory if journal is not None else None
+        self.customer_manager.attach_id_allocator(IdAllocator(
+            CUSTOMER_PREFIX, directory and os.path.join(directory, "customer_ids.alloc")))
+        self.account_store.attach_id_allocator(IdAllocator(
+            ACCOUNT_PREFIX, directory and os.path.join(directory, "account_numbers.alloc")))
         self.current_customer = None
         self.current_account = None
+        # Storage work runs off the Tk thread.  One worker keeps mutations in
+        # order and on a single thread, which the journal expects.
+        self.executor = TaskExecutor(root, max_workers=1)
         
         self.show_welcome_screen()
     
+    # ---------------- BACKGROUND TASKS ----------------
+    def run_task(self, work, on_done, message="Please wait...", parent=None, with_handle=False,
+                 cancellable=True):
+        """
+        Run work() on the executor and on_done(result) back on the Tk thread
+        
+        If the task is still running after BUSY_DELAY_MS a progress window
+        appears, with a Cancel button when cancellable.  Pass
+        cancellable=False for mutations: once started they run to the end,
+        and on_done must see the result.  Errors are shown in a message box.
+        """
+        parent = parent or self.root
+        busy = {"dialog": None, "bar": None, "finished": False}
+        
+        def close():
+            busy["finished"] = True
+            if busy["dialog"] is not None and busy["dialog"].winfo_exists():
+                busy["dialog"].destroy()
+        
+        def done(result):
+            close()
+            on_done(result)
+        
+        def failed(error):
+            close()
+            messagebox.showerror("Error", f"Operation failed: {error}")
+        
+        def progress(done_count, total, text):
+            bar = busy["bar"]
+            if bar is None or not bar.winfo_exists():
+                return
+            if total:
+                bar.stop()
+                bar.config(mode="determinate", maximum=total, value=done_count)
+            if text:
+                busy["label"].config(text=text)
+        
+        def show():
+            if busy["finished"] or not parent.winfo_exists():
+                return
+            dialog = tk.Toplevel(parent)
+            dialog.title("Working")
+            dialog.geometry("300x120")
+            dialog.transient(parent)
+            busy["label"] = tk.Label(dialog, text=message)
+            busy["label"].pack(pady=10)
+            bar = ttk.Progressbar(dialog, mode="indeterminate", length=250)
+            bar.pack(pady=5)
+            bar.start(15)
+            if cancellable:
+                tk.Button(dialog, text="Cancel", width=12,
+                          command=lambda: (handle.cancel(), close())).pack(pady=5)
+                dialog.protocol("WM_DELETE_WINDOW", lambda: (handle.cancel(), close()))
+            else:
+                dialog.protocol("WM_DELETE_WINDOW", lambda: None)  # Closes itself when done
+            busy["dialog"], busy["bar"] = dialog, bar
+        
+        handle = self.executor.submit(work, on_done=done, on_error=failed, on_cancel=close,
+                                      on_progress=progress, with_handle=with_handle)
+        parent.after(self.BUSY_DELAY_MS, show)
+        return handle
+    
     def show_welcome_screen(self):
         for widget in self.root.winfo_children():
             widget.destroy()
@@ -60,7 +150,7 @@ class BankGUI:
         self.address_entry.grid(row=4, column=1, pady=5)
         
         # Account Information
-        tk.Label(frame, text="Account Number (ACC001-ACC999):", anchor="w").grid(row=5, column=0, sticky="w", pady=5)
+        tk.Label(frame, text="Account Number (blank to assign):", anchor="w").grid(row=5, column=0, sticky="w", pady=5)
         self.acc_entry = tk.Entry(frame, width=30)
         self.acc_entry.grid(row=5, column=1, pady=5)
         
@@ -98,12 +188,15 @@ class BankGUI:
                 return
             email = cleaned_email
                 
-            valid_acc, acc_msg, cleaned_acc = Validation.validate_account_number(acc_num)
-            if not valid_acc:
-                messagebox.showerror("Error", acc_msg)
-                return
-            acc_num = cleaned_acc
-                
+            if acc_num.strip():
+                valid_acc, acc_msg, cleaned_acc = Validation.validate_account_number(acc_num)
+                if not valid_acc:
+                    messagebox.showerror("Error", acc_msg)
+                    return
+                acc_num = cleaned_acc
+            else:
+                acc_num = None
+            
             valid_balance, balance_msg, balance = Validation.validate_amount(balance_str)
             if not valid_balance:
                 messagebox.showerror("Error", balance_msg)
@@ -118,28 +211,43 @@ class BankGUI:
                     return
                 phone = cleaned_phone
             
-            # Create customer
-            customer_id = f"CUST{len(self.customer_manager.customers)+1:03d}"
-            customer = Customer(customer_id, name, email, phone, address)
-            
-            # Add account to customer
-            customer.add_account(acc_num)
-            
-            # Add to customer manager
-            self.customer_manager.add_customer(customer)
-            
-            # Create bank account AND SET AS CURRENT
-            self.current_account = BankAccount(name, acc_num, balance)
-            self.current_customer = customer
+            def create():
+                number = acc_num or self.account_store.id_allocator.allocate()
+                if self.account_store.has_account(number):
+                    return None
+                
+                # Create customer
+                customer_id = self.customer_manager.id_allocator.allocate()
+                customer = Customer(customer_id, name, email, phone, address)
+                
+                # Add account to customer
+                customer.add_account(number)
+                
+                # Add to customer manager
+                self.customer_manager.add_customer(customer)
+                
+                # Create bank account and register it
+                account = BankAccount(name, number, balance)
+                self.account_store.add_account(account)
+                return customer, account
             
-            messagebox.showinfo("Success", 
-                f"Account created successfully!\n\n"
-                f"Customer ID: {customer_id}\n"
-                f"Account: {acc_num}\n"
-                f"Balance: ${balance:.2f}")
+            def created(result):
+                if result is None:
+                    messagebox.showerror("Error", f"Account {acc_num} already exists")
+                    return
+                # Set the new account as current
+                self.current_customer, self.current_account = result
+                
+                messagebox.showinfo("Success", 
+                    f"Account created successfully!\n\n"
+                    f"Customer ID: {self.current_customer.customer_id}\n"
+                    f"Account: {self.current_account.account_number}\n"
+                    f"Balance: ${balance:.2f}")
+                
+                # THIS LINE WAS MISSING - Show main menu after creation
+                self.show_main_menu()
             
-            # THIS LINE WAS MISSING - Show main menu after creation
-            self.show_main_menu()
+            self.run_task(create, created, "Creating account...", cancellable=False)
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create account: {str(e)}")
@@ -184,19 +292,25 @@ class BankGUI:
         acc_num = cleaned_acc
         
         # Find customer by account
-        customer = self.customer_manager.find_customer_by_account(acc_num)
-        
-        if customer and customer.name.lower() == name.lower():
-            # Create account object for logged in customer
-            self.current_customer = customer
-            self.current_account = BankAccount(customer.name, acc_num, 1000.00)
-            messagebox.showinfo("Success", f"Welcome back, {customer.name}!")
-            self.show_main_menu()
-        else:
-            messagebox.showerror("Error", "Invalid account number or name\n\n"
-                                 "Note: For testing, create an account first, then use:\n"
-                                 f"Account: {acc_num if 'ACC' in acc_num else 'ACC001'}\n"
-                                 f"Name: {name}")
+        def find():
+            return (self.customer_manager.find_customer_by_account(acc_num),
+                    self.account_store.get_account(acc_num))
+        
+        def found(result):
+            customer, account = result
+            if customer and account and normalize(customer.name) == normalize(name):
+                # Resume the stored account for logged in customer
+                self.current_customer = customer
+                self.current_account = account
+                messagebox.showinfo("Success", f"Welcome back, {customer.name}!")
+                self.show_main_menu()
+            else:
+                messagebox.showerror("Error", "Invalid account number or name\n\n"
+                                     "Note: For testing, create an account first, then use:\n"
+                                     f"Account: {acc_num if 'ACC' in acc_num else 'ACC001'}\n"
+                                     f"Name: {name}")
+        
+        self.run_task(find, found, "Looking up account...")
     
     # ---------------- MAIN MENU ----------------
     def show_main_menu(self):
@@ -245,19 +359,31 @@ class BankGUI:
         
         def deposit_action():
             try:
-                amount = float(amount_entry.get())
+                amount = Money.parse(amount_entry.get())
                 
-                if amount <= 0:
+                if amount <= ZERO:
                     messagebox.showerror("Error", "Amount must be positive!")
                     return
                 
-                success, msg = self.current_account.deposit(amount)
-                if success:
-                    messagebox.showinfo("Success", msg)
-                    win.destroy()
-                    self.show_main_menu()  # Refresh balance display
-                else:
-                    messagebox.showerror("Error", msg)
+                account = self.current_account
+                
+                def post():
+                    success, msg = account.deposit(amount)
+                    if success:
+                        self.account_store.save_account(account)
+                    return success, msg
+                
+                def posted(result):
+                    success, msg = result
+                    if success:
+                        messagebox.showinfo("Success", msg)
+                        if win.winfo_exists():
+                            win.destroy()
+                        self.show_main_menu()  # Refresh balance display
+                    else:
+                        messagebox.showerror("Error", msg)
+                
+                self.run_task(post, posted, "Posting transaction...", parent=win, cancellable=False)
             except ValueError:
                 messagebox.showerror("Error", "Enter a valid number")
         
@@ -288,19 +414,31 @@ class BankGUI:
         
         def withdraw_action():
             try:
-                amount = float(amount_entry.get())
+                amount = Money.parse(amount_entry.get())
                 
-                if amount <= 0:
+                if amount <= ZERO:
                     messagebox.showerror("Error", "Amount must be positive!")
                     return
                 
-                success, msg = self.current_account.withdraw(amount)
-                if success:
-                    messagebox.showinfo("Success", msg)
-                    win.destroy()
-                    self.show_main_menu()  # Refresh balance display
-                else:
-                    messagebox.showerror("Error", msg)
+                account = self.current_account
+                
+                def post():
+                    success, msg = account.withdraw(amount)
+                    if success:
+                        self.account_store.save_account(account)
+                    return success, msg
+                
+                def posted(result):
+                    success, msg = result
+                    if success:
+                        messagebox.showinfo("Success", msg)
+                        if win.winfo_exists():
+                            win.destroy()
+                        self.show_main_menu()  # Refresh balance display
+                    else:
+                        messagebox.showerror("Error", msg)
+                
+                self.run_task(post, posted, "Posting transaction...", parent=win, cancellable=False)
             except ValueError:
                 messagebox.showerror("Error", "Enter a valid number")
         
@@ -321,53 +459,32 @@ class BankGUI:
     def show_transactions(self):
         win = tk.Toplevel(self.root)
         win.title("Transaction History")
-        win.geometry("600x400")
+        win.geometry("760x420")
         
         tk.Label(win, text=f"Transaction History - {self.current_account.account_number}", 
                  font=("Arial", 14, "bold")).pack(pady=10)
         
-        # Create a frame with scrollbar
-        frame = tk.Frame(win)
-        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Create scrollbar
-        scrollbar = tk.Scrollbar(frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Create text widget
-        text_box = tk.Text(frame, height=15, width=70, yscrollcommand=scrollbar.set,
-                          font=("Courier", 10))
-        text_box.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=text_box.yview)
-        
-        # Header
-        header = f"{'Date':<20} {'Type':<12} {'Amount':>10} {'Description':<30} {'ID':<10}\n"
-        text_box.insert(tk.END, header)
-        text_box.insert(tk.END, "-"*85 + "\n")
-        
-        # Transactions
-        transactions = self.current_account.get_transaction_history()
-        
-        if not transactions:
-            text_box.insert(tk.END, "No transactions found.\n")
-        else:
-            for t in transactions:
-                # Format transaction display
-                trans_line = f"{t.date:<20} {t.transaction_type:<12} ${t.amount:>9.2f} {t.description:<30} {t.transaction_id[:8]}...\n"
-                text_box.insert(tk.END, trans_line)
-        
-        text_box.config(state=tk.DISABLED)  # Make read-only
+        # Only the visible rows are read and drawn, so this opens instantly
+        # however long the history is
+        account = self.current_account
+        total = account.get_transaction_count()
+        view = HistoryView(win, lambda offset, limit: account.get_transaction_history(limit, offset), total,
+                           executor=self.executor)
+        view.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        if not total:
+            tk.Label(win, text="No transactions found.").pack()
         
         # Summary
         summary_frame = tk.Frame(win)
         summary_frame.pack(pady=10)
-        tk.Label(summary_frame, text=f"Total Transactions: {len(transactions)}", 
+        tk.Label(summary_frame, text=f"Total Transactions: {total}", 
                  font=("Arial", 10)).pack()
     
     # ---------------- ACCOUNT SUMMARY ----------------
     def account_summary(self):
         account_info = self.current_account.get_account_info()
         customer_info = self.current_customer.get_customer_info()
+        stats = account_info['stats']
         
         summary = (
             f"📋 ACCOUNT SUMMARY\n"
@@ -383,7 +500,11 @@ class BankGUI:
             f"  Current Balance: ${account_info['balance']:.2f}\n"
             f"  Total Accounts: {customer_info['total_accounts']}\n\n"
             f"Transaction Summary:\n"
-            f"  Total Transactions: {len(account_info['transactions'])}\n"
+            f"  Total Transactions: {account_info['total_transactions']}\n"
+            f"  Total Deposits: ${stats['total_deposits']:.2f}\n"
+            f"  Total Withdrawals: ${stats['total_withdrawals']:.2f}\n"
+            f"  Transfers In/Out: ${stats['total_transfers_in']:.2f} / ${stats['total_transfers_out']:.2f}\n"
+            f"  Lowest/Highest Balance: ${stats['min_balance']:.2f} / ${stats['max_balance']:.2f}\n"
             f"{'='*40}"
         )
         
@@ -392,6 +513,24 @@ class BankGUI:
 
 # ---------------- RUN APPLICATION ----------------
 if __name__ == "__main__":
+    # BANK_METRICS=<file> collects operation metrics and writes them there on exit
+    metrics_path = os.environ.get("BANK_METRICS")
+    if metrics_path:
+        metrics.enable()
     root = tk.Tk()
-    app = BankGUI(root)
-    root.mainloop()
\ No newline at end of file
+    journal = Journal("bank_data")
+    app = BankGUI(root, journal)
+    # BANK_TRACE=<file> records every operation there for tracing.py to replay
+    trace_path = os.environ.get("BANK_TRACE")
+    if trace_path:
+        tracing.start(trace_path, app.account_store, app.customer_manager)
+    try:
+        root.mainloop()
+    finally:
+        app.executor.shutdown(wait=True)
+        tracing.stop()
+        app.customer_manager.id_allocator.close()
+        app.account_store.id_allocator.close()
+        journal.close()
+        if metrics_path:
+            metrics.write_prometheus(metrics_path)
\ No newline at end of file
@@ -0,0 +1,337 @@
+"""
+Mapped Ledger Module
+Fixed-width on-disk transaction file read through mmap
+"""
+
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Iterator, List, Optional, Tuple, Union
+
+from account_stats import AccountStats
+from id_generator import next_ids
+from ledger import TransactionLedger
+from money import Money
+from transaction import Transaction
+
+# File header: magic, format version, record size, record count
+_HEADER = struct.Struct("<4sHHQ")
+# Summary after it, so reopening needs no scan: balance, deposit/withdrawal/
+# transfer-in/transfer-out totals, min and max balance and last activity
+# (meaningless while there are no rows), then a row count per type code
+_SUMMARY = struct.Struct("<8q5Q")
+_HEADER_SIZE = 128
+_MAGIC = b"BLDG"
+_VERSION = 1
+
+# Record: 64-bit transaction id, account number, amount in cents, timestamp
+# in microseconds, description code, type code (3 pad bytes keep it 8-aligned)
+RECORD = struct.Struct("<q16sqqIB3x")
+_TIMESTAMP = struct.Struct("<q")
+_ID = struct.Struct("<q")
+_TIMESTAMP_OFFSET = 32  # After id, account number and amount
+
+_INITIAL_CAPACITY = 1024
+
+
+class RowsView(Sequence):
+    """
+    Rows [start, stop) of a MappedLedger, read only when accessed
+
+    Slicing a ledger returns one of these, so a page of history builds
+    Transaction objects for the rows actually looked at rather than for the
+    whole range.  Like the ledger's records(), it reads the live file: use
+    list() on it to keep the rows past further appends or close().
+    """
+
+    __slots__ = ("_ledger", "_range")
+
+    def __init__(self, ledger: "MappedLedger", rows: range):
+        self._ledger = ledger
+        self._range = rows
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return RowsView(self._ledger, self._range[index])
+        return self._ledger._row(self._range[index])
+
+    def __iter__(self) -> Iterator[Transaction]:
+        row = self._ledger._row
+        for i in self._range:
+            yield row(i)
+
+    def __reduce__(self):
+        # Pickled (e.g. sent back from a shard) as the plain list it stands for
+        return list, (list(self),)
+
+    def __repr__(self) -> str:
+        return f"RowsView({self._ledger.path!r}, {self._range.start}:{self._range.stop})"
+
+
+class MappedLedger:
+    """
+    Transaction history stored as fixed-size records in a memory-mapped file.
+
+    Any row is found by arithmetic on its position, so reading the last N
+    transactions costs the same whether the file holds a hundred rows or far
+    more than fits in RAM.  records() hands out zero-copy memoryview slices
+    of the mapping; indexing builds Transaction views like TransactionLedger
+    does, and slicing returns a RowsView that builds them as it is read, so
+    BankAccount can use either interchangeably.
+
+    The header also holds the balance and AccountStats over every row,
+    updated by each append, so an account reopens without reading its rows
+    (see BankAccount.from_ledger).
+
+    Descriptions are interned into a small sidecar file (``<path>.desc``)
+    and referenced from each record by code.
+    """
+
+    TYPE_CODES = TransactionLedger.DEFAULT_TYPES
+    on_disk = True  # TransactionIndex searches the file instead of copying its ids
+
+    def __init__(self, path: str, account_number: str):
+        """
+        Open or create a ledger file
+
+        Args:
+            path (str): Location of the record file
+            account_number (str): Account that owns every row in the file
+        """
+        self.path = path
+        self.account_number = account_number
+        self._account_bytes = account_number.encode("ascii")
+        if len(self._account_bytes) > 16:
+            raise ValueError("Account number too long for mapped ledger (max 16 characters)")
+        self._type_codes = {t: i for i, t in enumerate(self.TYPE_CODES)}
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "r+b" if not new_file else "w+b")
+        if new_file:
+            self._file.truncate(_HEADER_SIZE + _INITIAL_CAPACITY * RECORD.size)
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD.size, 0))
+            self._file.write(_SUMMARY.pack(*[0] * 13))
+            self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, record_size, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {_VERSION} ledger file")
+        self._load_summary()
+
+        self._description_path = path + ".desc"
+        self._description_table: List[str] = []
+        if os.path.exists(self._description_path):
+            with open(self._description_path, encoding="utf-8") as f:
+                self._description_table = [json.loads(line) for line in f]
+        self._description_codes = {d: i for i, d in enumerate(self._description_table)}
+        self._description_file = open(self._description_path, "a", encoding="utf-8")
+
+    def __reduce__(self):
+        # Pickled as its path and reopened from the file, whose rows and
+        # summary may be newer than the pickle.  Unpickling in a process that
+        # still has the ledger open maps the file twice; only one may append.
+        return MappedLedger, (self.path, self.account_number)
+
+    # ---------------- SUMMARY ----------------
+    def _load_summary(self) -> None:
+        """Read the balance and stats written by the last append"""
+        fields = _SUMMARY.unpack_from(self._map, _HEADER.size)
+        self.balance = Money(fields[0])  # Balance after the last row
+        self.stats = stats = AccountStats()  # Aggregates over every row
+        (stats.total_deposits, stats.total_withdrawals,
+         stats.total_transfers_in, stats.total_transfers_out) = [Money(c) for c in fields[1:5]]
+        stats.counts = {t: n for t, n in zip(self.TYPE_CODES, fields[8:]) if n}
+        if self._count:
+            stats.min_balance, stats.max_balance = Money(fields[5]), Money(fields[6])
+            stats.last_activity = fields[7]
+
+    def _store_summary(self) -> None:
+        """Write the row count and summary; a reader never sees one without the other"""
+        stats = self.stats
+        _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION, RECORD.size, self._count)
+        _SUMMARY.pack_into(
+            self._map, _HEADER.size,
+            self.balance.cents,
+            stats.total_deposits.cents, stats.total_withdrawals.cents,
+            stats.total_transfers_in.cents, stats.total_transfers_out.cents,
+            stats.min_balance.cents if self._count else 0,
+            stats.max_balance.cents if self._count else 0,
+            stats.last_activity or 0,
+            *[stats.counts.get(t, 0) for t in self.TYPE_CODES],
+        )
+
+    # ---------------- WRITING ----------------
+    def _capacity(self) -> int:
+        return (len(self._map) - _HEADER_SIZE) // RECORD.size
+
+    def _grow(self) -> None:
+        # Any memoryview returned by records() must be released before this point
+        new_size = _HEADER_SIZE + self._capacity() * 2 * RECORD.size
+        self._map.close()
+        self._file.truncate(new_size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _code_for_description(self, description: str) -> int:
+        code = self._description_codes.get(description)
+        if code is None:
+            code = len(self._description_table)
+            self._description_table.append(description)
+            self._description_codes[description] = code
+            self._description_file.write(json.dumps(description) + "\n")
+            self._description_file.flush()
+        return code
+
+    def append(self, transaction: Transaction) -> int:
+        """Write a transaction as the next record and return its position"""
+        type_code = self._type_codes.get(transaction.transaction_type)
+        if type_code is None:
+            raise ValueError(f"Unsupported transaction type: {transaction.transaction_type}")
+        if self._count == self._capacity():
+            self._grow()
+        RECORD.pack_into(
+            self._map, _HEADER_SIZE + self._count * RECORD.size,
+            transaction.id,
+            self._account_bytes,
+            transaction.amount.cents,
+            transaction.timestamp,
+            self._code_for_description(transaction.description),
+            type_code,
+        )
+        self._count += 1
+        self.balance = self.stats.post(transaction.transaction_type, transaction.amount,
+                                       self.balance, transaction.timestamp)
+        self._store_summary()
+        return self._count - 1
+
+    def extend(self, transactions) -> None:
+        """Write several transactions in order"""
+        for transaction in transactions:
+            self.append(transaction)
+
+    def append_batch(self, rows, timestamp: int) -> int:
+        """Write many new (transaction_type, amount, description) postings; returns the first position"""
+        first = self._count
+        ids = next_ids(len(rows))
+        post, balance = self.stats.post, self.balance
+        for i, (transaction_type, amount, description) in enumerate(rows):
+            type_code = self._type_codes.get(transaction_type)
+            if type_code is None:
+                raise ValueError(f"Unsupported transaction type: {transaction_type}")
+            if self._count == self._capacity():
+                self._grow()
+            RECORD.pack_into(
+                self._map, _HEADER_SIZE + self._count * RECORD.size,
+                ids[i], self._account_bytes, amount.cents,
+                timestamp, self._code_for_description(description), type_code,
+            )
+            self._count += 1
+            balance = post(transaction_type, amount, balance, timestamp)
+        self.balance = balance
+        self._store_summary()
+        return first
+
+    def flush(self) -> None:
+        """Push written records to disk"""
+        self._map.flush()
+
+    # ---------------- ZERO-COPY READS ----------------
+    def records(self, start: int = 0, stop: Union[int, None] = None) -> memoryview:
+        """
+        Raw bytes of rows [start, stop) as a view into the mapping
+
+        Nothing is copied or parsed; unpack rows with RECORD.unpack_from or
+        RECORD.iter_unpack as needed.  Release the view before appending
+        more rows, since the file may have to be remapped to grow.
+        """
+        start, stop, _ = slice(start, stop).indices(self._count)
+        stop = max(start, stop)
+        base = _HEADER_SIZE
+        return memoryview(self._map)[base + start * RECORD.size:base + stop * RECORD.size]
+
+    def tail(self, limit: int) -> memoryview:
+        """Raw bytes of the newest limit rows"""
+        return self.records(max(self._count - limit, 0), self._count)
+
+    def iter_records(self, start: int = 0, stop: Union[int, None] = None) -> Iterator[Tuple]:
+        """Yield unpacked record tuples for rows [start, stop)"""
+        view = self.records(start, stop)
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    # ---------------- TRANSACTION VIEWS ----------------
+    def _row(self, index: int) -> Transaction:
+        transaction_id, _account, cents, micros, desc_code, type_code = RECORD.unpack_from(
+            self._map, _HEADER_SIZE + index * RECORD.size)
+        return Transaction(
+            transaction_type=self.TYPE_CODES[type_code],
+            amount=Money(cents),
+            account_number=self.account_number,
+            description=self._description_table[desc_code],
+            transaction_id=transaction_id,
+            timestamp=micros,
+        )
+
+    def _timestamp_at(self, index: int) -> int:
+        return _TIMESTAMP.unpack_from(self._map, _HEADER_SIZE + index * RECORD.size + _TIMESTAMP_OFFSET)[0]
+
+    def keys(self, start: int = 0) -> List[int]:
+        """Transaction id of each row from start on, in order"""
+        return [record[0] for record in self.iter_records(start)]
+
+    def _id_at(self, index: int) -> int:
+        return _ID.unpack_from(self._map, _HEADER_SIZE + index * RECORD.size)[0]
+
+    def find_id(self, transaction_id: int) -> Optional[int]:
+        """Row holding a transaction id, or None; ids are time-ordered like the rows"""
+        row = bisect_left(range(self._count), transaction_id, key=self._id_at)
+        if row < self._count and self._id_at(row) == transaction_id:
+            return row
+        return None
+
+    def position_of_time(self, timestamp: int) -> int:
+        """Position of the first row posted at or after timestamp (microseconds)"""
+        return bisect_left(range(self._count), timestamp, key=self._timestamp_at)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return RowsView(self, range(self._count)[index])
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("ledger index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for i in range(self._count):
+            yield self._row(i)
+
+    def copy(self) -> List[Transaction]:
+        """Return every transaction as a list"""
+        return list(self)
+
+    def close(self) -> None:
+        """Flush and unmap the file"""
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+        self._file.close()
+        if hasattr(self, "_description_file"):
+            self._description_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
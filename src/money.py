@@ -0,0 +1,208 @@
+"""
+Money Module
+Exact amounts of money held as integer cents
+"""
+
+from decimal import ROUND_HALF_EVEN, Decimal
+from numbers import Integral, Real
+
+
+class PrecisionError(ValueError):
+    """Amount text with more than 2 decimal places"""
+
+
+class Money:
+    """
+    An amount of money as a whole number of cents.
+
+    Money only does arithmetic and comparisons with Money, so a float can't
+    slip back into a balance: inputs are converted once with Money.of()
+    (strings are parsed digit by digit, never through float) and turned
+    back into text only for display, where f"{m:.2f}" and f"{m:,.2f}" are
+    rendered from the integer.  0 + Money is allowed so that sum() works.
+
+    Instances are immutable by convention; every operation returns a new one.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0):
+        """
+        Args:
+            cents (int): Amount in cents; use Money.of() for dollar amounts
+        """
+        if cents.__class__ is not int:
+            if not isinstance(cents, Integral) or isinstance(cents, bool):
+                raise TypeError(f"Money needs integer cents, not {type(cents).__name__}")
+            cents = int(cents)
+        self.cents = cents
+
+    # ---------------- CONVERSION ----------------
+    @classmethod
+    def of(cls, value) -> "Money":
+        """
+        Convert a dollar amount to Money
+
+        Args:
+            value: Money, a decimal string ("12.50", "$1,200"), an int, a
+                Decimal, or a float (rounded to the nearest cent)
+
+        Raises:
+            ValueError: Unparseable text, more than 2 decimal places in text
+                (PrecisionError), or a float that is not finite
+            TypeError: Anything else
+        """
+        kind = value.__class__
+        if kind is cls:
+            return value
+        # Exact built-in types first; the numbers ABC checks below are slow
+        if kind is float:
+            return cls(_float_cents(value))
+        if kind is int:
+            return cls(value * 100)
+        if isinstance(value, str):
+            return cls.parse(value)
+        if isinstance(value, bool):
+            raise TypeError("Money can't be made from a bool")
+        if isinstance(value, Integral):
+            return cls(int(value) * 100)
+        if isinstance(value, Decimal):
+            if not value.is_finite():
+                raise ValueError(f"Not a finite amount: {value}")
+            return cls(int(value.scaleb(2).to_integral_value(ROUND_HALF_EVEN)))
+        if isinstance(value, Real):
+            return cls(_float_cents(float(value)))
+        raise TypeError(f"Money can't be made from {type(value).__name__}")
+
+    @classmethod
+    def parse(cls, text: str) -> "Money":
+        """Parse a decimal string such as "-1,234.5" or "$10" without going through float"""
+        digits = text.strip().replace(",", "")
+        negative = digits.startswith("-")
+        if negative or digits.startswith("+"):
+            digits = digits[1:]
+        digits = digits.lstrip("$")
+        whole, _dot, frac = digits.partition(".")
+        if not (whole or frac) or (whole and not whole.isdecimal()) or (frac and not frac.isdecimal()):
+            raise ValueError(f"Not an amount: {text!r}")
+        if len(frac) > 2:
+            # Trailing zeros don't add precision ("1.500" is fine)
+            frac = frac.rstrip("0")
+            if len(frac) > 2:
+                raise PrecisionError(f"Amount has more than 2 decimal places: {text!r}")
+        cents = int(whole or "0") * 100 + (int(frac.ljust(2, "0")) if frac else 0)
+        return cls(-cents if negative else cents)
+
+    def __float__(self) -> float:
+        """Nearest float in dollars, for charts and JSON; don't do sums with it"""
+        return self.cents / 100
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    # ---------------- ARITHMETIC ----------------
+    def __add__(self, other):
+        if other.__class__ is Money:
+            return Money(self.cents + other.cents)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if other.__class__ is int and other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other):
+        if other.__class__ is Money:
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __mul__(self, other):
+        if other.__class__ is int:
+            return Money(self.cents * other)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self if self.cents >= 0 else Money(-self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    # ---------------- COMPARISON ----------------
+    def __eq__(self, other):
+        if other.__class__ is Money:
+            return self.cents == other.cents
+        return NotImplemented
+
+    def __lt__(self, other):
+        if other.__class__ is Money:
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __le__(self, other):
+        if other.__class__ is Money:
+            return self.cents <= other.cents
+        return NotImplemented
+
+    def __gt__(self, other):
+        if other.__class__ is Money:
+            return self.cents > other.cents
+        return NotImplemented
+
+    def __ge__(self, other):
+        if other.__class__ is Money:
+            return self.cents >= other.cents
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((Money, self.cents))
+
+    # ---------------- FORMATTING ----------------
+    def __str__(self) -> str:
+        return format_cents(self.cents)
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+    def __format__(self, spec: str) -> str:
+        # ".2f" and a plain width ("9.2f") cover almost every call, so they
+        # skip Decimal; any other float-style spec formats the exact Decimal
+        if spec == ".2f" or spec == "":
+            return self.__str__()
+        if spec[-3:] == ".2f" and spec[:-3].isdecimal() and spec[0] != "0":
+            return self.__str__().rjust(int(spec[:-3]))
+        return format(self.to_decimal(), spec)
+
+    def __reduce__(self):
+        return Money, (self.cents,)
+
+
+ZERO = Money(0)
+
+
+def format_cents(cents: int) -> str:
+    """Integer cents as a plain dollar string ("-12.50"), for loops that keep raw cents"""
+    if cents >= 0:
+        return "%d.%02d" % divmod(cents, 100)
+    return "-%d.%02d" % divmod(-cents, 100)
+
+
+def _float_cents(value: float) -> int:
+    """Nearest cent to a float, judged by the digits it prints as"""
+    scaled = value * 100
+    try:
+        cents = round(scaled)
+    except (OverflowError, ValueError):
+        raise ValueError(f"Not a finite amount: {value}") from None
+    if -1e-6 < scaled - cents < 1e-6:
+        return cents
+    # Sub-cent input: round half-even on the shortest repr (0.125 -> 0.12),
+    # not on the binary value that value * 100 produced
+    return int(Decimal(repr(value)).scaleb(2).to_integral_value(ROUND_HALF_EVEN))
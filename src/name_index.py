@@ -0,0 +1,240 @@
+"""
+Name Index Module
+Case-insensitive exact, prefix and typo-tolerant customer name lookups
+"""
+
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+
+def normalize(name: str) -> str:
+    """Case-folded name with runs of whitespace collapsed to one space"""
+    return " ".join(name.casefold().split())
+
+
+def _deletes(word: str) -> Set[str]:
+    """Every string made by removing one character from word"""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Edits (insert, delete, substitute, swap adjacent) turning a into b
+
+    Stops early once the distance must exceed limit and returns limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class _SortedKeys:
+    """
+    Sorted list of strings for prefix scans, cheap to grow one key at a time.
+
+    New keys wait in a pending list and are merged in by the next query:
+    a few are inserted in place, a large backlog (e.g. after loading every
+    customer) is merged with one sort.  Removed keys stay in the list until
+    enough have piled up to be worth a compaction; queries skip them via
+    the live() predicate.
+    """
+
+    INSERT_LIMIT = 32  # Pending keys merged by insort rather than a full sort
+
+    def __init__(self, live: Callable[[str], bool]):
+        self._live = live
+        self._keys: List[str] = []
+        self._pending: List[str] = []
+        self._listed: Set[str] = set()  # Keys in _keys or _pending, live or not
+        self._stale = 0
+
+    def add(self, key: str) -> None:
+        if key not in self._listed:
+            self._listed.add(key)
+            self._pending.append(key)
+
+    def discard(self, key: str) -> None:
+        """Note that a key is no longer live; it is dropped at the next compaction"""
+        if key in self._listed:
+            self._stale += 1
+
+    def _flush(self) -> None:
+        if self._stale > len(self._keys) // 4 + self.INSERT_LIMIT:
+            self._keys = [k for k in self._keys if self._live(k)]
+            self._pending = [k for k in self._pending if self._live(k)]
+            self._listed = set(self._keys)
+            self._listed.update(self._pending)
+            self._stale = 0
+        if len(self._pending) <= self.INSERT_LIMIT:
+            for key in self._pending:
+                insort(self._keys, key)
+        else:
+            self._keys.extend(self._pending)
+            self._keys.sort()
+        self._pending.clear()
+
+    def starting_with(self, prefix: str) -> Iterator[str]:
+        """Live keys beginning with prefix, in sorted order"""
+        if self._pending or self._stale > len(self._keys) // 4 + self.INSERT_LIMIT:
+            self._flush()
+        keys = self._keys
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                return
+            if self._live(key):
+                yield key
+
+
+class NameIndex:
+    """
+    Index of customers by name.
+
+    Names are normalized (case-folded, whitespace collapsed) and kept in
+    three structures, all updated per customer:
+      - normalized name -> customers, for exact matches
+      - a sorted key list, for prefix matches
+      - each name word plus its one-character deletions -> words, so a
+        query word within one edit of an indexed word is found with a few
+        dict lookups (the symmetric-delete scheme); longer distances fall
+        back to checking the candidate words found that way
+    """
+
+    def __init__(self):
+        self._names: Dict[str, Dict[str, object]] = {}  # normalized name -> {customer_id: Customer}
+        self._sorted = _SortedKeys(self._names.__contains__)
+        self._word_names: Dict[str, Set[str]] = {}  # word -> normalized names containing it
+        self._variants: Dict[str, Set[str]] = {}  # word or one-deletion variant -> words
+
+    def __len__(self) -> int:
+        return sum(len(customers) for customers in self._names.values())
+
+    # ---------------- MAINTENANCE ----------------
+    def add(self, customer) -> None:
+        """Index a customer under its current name"""
+        key = normalize(customer.name)
+        customers = self._names.get(key)
+        if customers is None:
+            customers = self._names[key] = {}
+            self._sorted.add(key)
+            for word in set(key.split()):
+                self._add_word(word, key)
+        customers[customer.customer_id] = customer
+
+    def remove(self, customer, name: str = None) -> None:
+        """
+        Unindex a customer
+
+        Args:
+            customer (Customer): Customer to drop
+            name (str): Name it was indexed under, if it has changed since
+        """
+        key = normalize(customer.name if name is None else name)
+        customers = self._names.get(key)
+        if customers is None or customers.get(customer.customer_id) is not customer:
+            return
+        del customers[customer.customer_id]
+        if not customers:
+            del self._names[key]
+            self._sorted.discard(key)
+            for word in set(key.split()):
+                self._remove_word(word, key)
+
+    def rename(self, customer, old_name: str) -> None:
+        """Move a customer from old_name to its current name"""
+        self.remove(customer, old_name)
+        self.add(customer)
+
+    def _add_word(self, word: str, key: str) -> None:
+        names = self._word_names.get(word)
+        if names is None:
+            names = self._word_names[word] = set()
+            for variant in _deletes(word) | {word}:
+                self._variants.setdefault(variant, set()).add(word)
+        names.add(key)
+
+    def _remove_word(self, word: str, key: str) -> None:
+        names = self._word_names[word]
+        names.discard(key)
+        if not names:
+            del self._word_names[word]
+            for variant in _deletes(word) | {word}:
+                words = self._variants[variant]
+                words.discard(word)
+                if not words:
+                    del self._variants[variant]
+
+    # ---------------- LOOKUPS ----------------
+    def exact(self, name: str) -> List:
+        """Customers whose name equals name, ignoring case and spacing"""
+        return list(self._names.get(normalize(name), {}).values())
+
+    def prefix(self, prefix: str, limit: int = 20) -> List:
+        """Up to limit customers whose name starts with prefix, in name order"""
+        found = []
+        for key in self._sorted.starting_with(normalize(prefix)):
+            for customer in self._names[key].values():
+                found.append(customer)
+                if len(found) >= limit:
+                    return found
+        return found
+
+    def _similar_words(self, word: str, max_distance: int) -> Dict[str, int]:
+        """Indexed words within max_distance edits of word -> their distance"""
+        candidates = set()
+        for variant in _deletes(word) | {word}:
+            candidates.update(self._variants.get(variant, ()))
+        matches = {}
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                matches[candidate] = distance
+        return matches
+
+    def fuzzy(self, name: str, max_distance: int = 1, limit: int = 20) -> List[Tuple[int, object]]:
+        """
+        Customers whose name has a word close to every word of name
+
+        Each query word may be up to max_distance edits from a word of the
+        customer's name (candidates come from the one-deletion variants, so
+        distances above 2 are rarely reachable).
+
+        Returns:
+            list: Up to limit (total distance, Customer) pairs, closest first
+        """
+        words = normalize(name).split()
+        if not words:
+            return []
+        similar = sorted((self._similar_words(word, max_distance) for word in words),
+                         key=lambda m: sum(len(self._word_names[w]) for w in m))
+        # Names containing a match for the rarest word, then filtered by the rest
+        scores: Dict[str, int] = {}
+        for word, distance in similar[0].items():
+            for key in self._word_names[word]:
+                if distance < scores.get(key, max_distance + 1):
+                    scores[key] = distance
+        for matches in similar[1:]:
+            kept = {}
+            for key, score in scores.items():
+                best = min((matches[w] for w in key.split() if w in matches), default=None)
+                if best is not None:
+                    kept[key] = score + best
+            scores = kept
+        ranked = sorted(scores.items(), key=lambda item: (item[1], abs(len(item[0].split()) - len(words)), item[0]))
+        found = []
+        for key, score in ranked:
+            for customer in self._names[key].values():
+                found.append((score, customer))
+                if len(found) >= limit:
+                    return found
+        return found
@@ -0,0 +1,246 @@
+"""
+Server Module
+Asyncio network front-end for account operations
+
+Frames are a 4-byte big-endian length followed by a UTF-8 JSON object.
+Requests carry an "id" echoed back in the response, an "op" and its
+arguments:
+
+    {"id": 1, "op": "deposit",  "account": "ACC001", "amount": 50.0}
+    {"id": 2, "op": "withdraw", "account": "ACC001", "amount": 20.0}
+    {"id": 3, "op": "transfer", "account": "ACC001", "to": "ACC002", "amount": 5.0}
+    {"id": 4, "op": "balance",  "account": "ACC001"}
+    {"id": 5, "op": "history",  "account": "ACC001", "limit": 10}
+    {"id": 6, "op": "history",  "account": "ACC001", "limit": 50, "offset": 100}
+
+A history "limit" must be between 1 and MAX_HISTORY_LIMIT.
+
+Responses look like {"id": 1, "ok": true, "message": "...", ...}.  Clients
+may pipeline: send many requests without waiting, responses come back in
+request order.
+
+Usage: python server.py [--port 8765] [--accounts 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import struct
+from typing import Dict, Optional
+
+import metrics
+import tracing
+from account_store import AccountStore
+from customer import CustomerManager
+from money import Money
+from transfer_engine import TransferEngine
+
+_LENGTH = struct.Struct(">I")
+MAX_FRAME_BYTES = 1 << 20
+MAX_HISTORY_LIMIT = 1000  # Most transactions one "history" request may return
+
+
+class ProtocolError(Exception):
+    """Raised for malformed or oversized frames"""
+
+
+def encode_frame(message: Dict) -> bytes:
+    """Serialize a message as a length-prefixed JSON frame"""
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return _LENGTH.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict]:
+    """Read one frame; returns None on a clean end of stream"""
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("Connection closed mid-frame")
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame of {length} bytes exceeds limit")
+    body = await reader.readexactly(length)
+    try:
+        message = json.loads(body)
+    except ValueError:
+        raise ProtocolError("Frame is not valid JSON")
+    if not isinstance(message, dict):
+        raise ProtocolError("Frame is not a JSON object")
+    return message
+
+
+class BankServer:
+    """
+    Serves BankAccount operations over TCP.
+
+    Each connection has a reader that parses frames into a bounded queue
+    and a worker that executes them in order and writes the responses.
+    When a client pipelines faster than it reads, the worker blocks in
+    drain(), the queue fills, and the reader stops pulling bytes off the
+    socket - so a slow client is throttled by TCP instead of growing
+    server memory.
+    """
+
+    def __init__(self, account_store: AccountStore, customer_manager: Optional[CustomerManager] = None,
+                 max_pipeline: int = 128):
+        """
+        Initialize the server
+
+        Args:
+            account_store (AccountStore): Accounts served
+            customer_manager (CustomerManager): Customers (optional, for "customer" lookups)
+            max_pipeline (int): Requests buffered per connection before reading pauses
+        """
+        self.account_store = account_store
+        self.customer_manager = customer_manager
+        self.transfer_engine = TransferEngine(account_store)
+        self.max_pipeline = max_pipeline
+        self.connections = 0
+        self.requests_served = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # ---------------- OPERATIONS ----------------
+    def handle_request(self, request: Dict) -> Dict:
+        """Execute one request and build its response"""
+        op = request.get("op")
+        response = {"id": request.get("id")}
+        try:
+            if op == "ping":
+                response.update(ok=True, message="pong")
+                return response
+            if op == "customer":
+                customer = self.customer_manager and self.customer_manager.find_customer_by_account(
+                    request["account"])
+                if customer is None:
+                    response.update(ok=False, message="Customer not found")
+                else:
+                    response.update(ok=True, message="OK", customer=customer.get_customer_info())
+                return response
+
+            account = self.account_store.get_account(request["account"])
+            if account is None:
+                response.update(ok=False, message=f"Account {request['account']} not found")
+            elif op == "deposit":
+                ok, message = account.deposit(Money.of(request["amount"]), request.get("description", "Cash deposit"))
+                response.update(ok=ok, message=message, balance=float(account.balance))
+            elif op == "withdraw":
+                ok, message = account.withdraw(Money.of(request["amount"]),
+                                               request.get("description", "Cash withdrawal"),
+                                               request.get("method", "Online"))
+                response.update(ok=ok, message=message, balance=float(account.balance))
+            elif op == "transfer":
+                ok, message = self.transfer_engine.transfer(account.account_number, request["to"],
+                                                            Money.of(request["amount"]),
+                                                            request.get("description", "Funds transfer"))
+                response.update(ok=ok, message=message, balance=float(account.balance))
+            elif op == "balance":
+                response.update(ok=True, message="OK", balance=float(account.get_balance()))
+            elif op == "history":
+                limit = int(request.get("limit", 10))
+                offset = request.get("offset")
+                offset = None if offset is None else int(offset)
+                if not 1 <= limit <= MAX_HISTORY_LIMIT:
+                    raise ValueError(f"limit must be between 1 and {MAX_HISTORY_LIMIT}")
+                if offset is not None and offset < 0:
+                    raise ValueError("offset must not be negative")
+                history = account.get_transaction_history(limit, offset)
+                response.update(ok=True, message="OK", transactions=[{
+                    "transaction_id": t.transaction_id,
+                    "type": t.transaction_type,
+                    "amount": float(t.amount),
+                    "description": t.description,
+                    "date": t.date,
+                } for t in history])
+            else:
+                response.update(ok=False, message=f"Unknown operation: {op}")
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            response.update(ok=False, message=f"Bad request: {e}")
+        return response
+
+    # ---------------- CONNECTIONS ----------------
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pipeline)
+        worker = asyncio.create_task(self._respond(queue, writer))
+        try:
+            while True:
+                request = await read_frame(reader)
+                if request is None:
+                    break
+                await queue.put(request)  # Blocks (and stops reading) when the pipeline is full
+        except (ProtocolError, ConnectionError):
+            pass
+        finally:
+            await queue.put(None)
+            try:
+                await worker
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+                self.connections -= 1
+
+    async def _respond(self, queue: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await queue.get()
+                if request is None:
+                    return
+                writer.write(encode_frame(self.handle_request(request)))
+                self.requests_served += 1
+                # Only wait for the socket when nothing else is queued, so a
+                # pipelined burst is answered with as few syscalls as possible
+                if queue.empty():
+                    await writer.drain()
+        except Exception:
+            # Drop the connection so the reader sees end of stream, and keep
+            # emptying the queue so it never blocks on a full pipeline
+            writer.close()
+            while await queue.get() is not None:
+                pass
+            raise
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """Start listening; returns the asyncio server"""
+        self._server = await asyncio.start_server(self._handle_connection, host, port, backlog=4096)
+        return self._server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        """Start listening and serve until cancelled"""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bank account network server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--accounts", type=int, default=1000, help="demo accounts to create (ACC001...)")
+    parser.add_argument("--metrics-port", type=int, help="collect metrics and serve them at /metrics on this port")
+    parser.add_argument("--trace", help="record every operation to this trace file (see tracing.py)")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        metrics.enable()
+        metrics.serve_prometheus(args.metrics_port, args.host)
+        print(f"Metrics on http://{args.host}:{args.metrics_port}/metrics")
+
+    store = AccountStore()
+    for i in range(1, args.accounts + 1):
+        store.open_account(f"Customer {i}", f"ACC{i:03d}", 1000.0)
+    if args.trace:
+        tracing.start(args.trace, store)
+    print(f"Serving {len(store):,} accounts on {args.host}:{args.port}")
+    try:
+        asyncio.run(BankServer(store).serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tracing.stop()
+
+
+if __name__ == "__main__":
+    main()
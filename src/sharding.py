@@ -0,0 +1,507 @@
+"""
+Sharding Module
+Accounts hash-partitioned across worker processes, one ledger set per shard
+
+Each shard is a separate process that owns an AccountStore and a
+CustomerManager, so postings on different shards run in parallel instead
+of sharing one GIL.  The ShardRouter sends single-account operations to
+the owning shard and coordinates anything that spans shards with a
+two-phase commit:
+
+    prepare  every involved shard checks the operation, locks the accounts
+             and votes yes or no; nothing is applied yet
+    commit   if every vote was yes each shard applies its part
+    abort    otherwise the shards that voted yes release their locks
+
+While an account is locked by a prepared transaction, ordinary operations
+on it wait inside the shard until the commit or abort arrives.  A prepare
+that finds an account already locked votes no straight away instead of
+waiting, so two transfers in opposite directions can never deadlock; the
+router simply retries.
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from account_store import AccountStore
+from batch import STATUS_ABORTED, STATUS_OK, STATUS_UNKNOWN_ACCOUNT, BatchEngine
+from customer import Customer, CustomerManager
+from id_generator import MAX_NODE, SnowflakeGenerator, set_generator
+from money import ZERO, Money
+from transaction import Transaction
+from transfer_engine import TransferEngine
+
+TRANSFER_RETRIES = 50
+
+
+def shard_for(key: str, shard_count: int) -> int:
+    """Stable shard index for an account number or customer id"""
+    return zlib.crc32(key.encode()) % shard_count
+
+
+# ---------------- SHARD PROCESS ----------------
+class ShardWorker:
+    """
+    The state and command handlers of one shard.
+
+    Runs inside the shard process and handles one message at a time, so the
+    only concurrency it has to manage is between prepared (locked)
+    transactions and the commands that arrive while they are pending.
+    """
+
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+        self.account_store = AccountStore()
+        self.customer_manager = CustomerManager()
+        self.batch_engine = BatchEngine(self.account_store)
+        self.transfer_engine = TransferEngine(self.account_store)
+        self._locks: Dict[str, str] = {}                 # account number -> prepared txid
+        self._prepared: Dict[str, Tuple[List[str], object]] = {}  # txid -> (accounts, commit action)
+        self._deferred: List[Tuple[int, str, tuple]] = []
+        self._deferred_accounts: Dict[str, int] = {}
+
+    def handle(self, request_id: int, command: str, args: tuple) -> List[Tuple[int, object]]:
+        """Run one command; returns the (request_id, result) replies now ready"""
+        touched = self._accounts_for(command, args)
+        if touched and self._blocked(touched):
+            self._defer(request_id, command, args, touched)
+            return []
+        try:
+            result = getattr(self, "_cmd_" + command)(*args)
+        except Exception as e:  # Report to the caller instead of killing the shard
+            result = e
+        replies = [(request_id, result)]
+        if command in ("commit", "abort"):
+            replies.extend(self._run_deferred())
+        return replies
+
+    # Commands that touch accounts, and where their account numbers are
+    @staticmethod
+    def _accounts_for(command: str, args: tuple) -> List[str]:
+        if command in ("deposit", "withdraw", "balance", "history", "open_account"):
+            return [args[1] if command == "open_account" else args[0]]
+        if command == "transfer":
+            return [args[0], args[1]]
+        if command == "apply_batch":
+            return list({op[0] for op in args[0]})
+        return []
+
+    def _blocked(self, accounts) -> bool:
+        return any(a in self._locks or a in self._deferred_accounts for a in accounts)
+
+    def _defer(self, request_id: int, command: str, args: tuple, accounts: List[str]) -> None:
+        self._deferred.append((request_id, command, args))
+        for account in accounts:
+            self._deferred_accounts[account] = self._deferred_accounts.get(account, 0) + 1
+
+    def _run_deferred(self) -> List[Tuple[int, object]]:
+        """Retry waiting commands in arrival order after locks were released"""
+        waiting, self._deferred, self._deferred_accounts = self._deferred, [], {}
+        replies = []
+        for request_id, command, args in waiting:
+            replies.extend(self.handle(request_id, command, args))
+        return replies
+
+    # ---------------- SINGLE-SHARD COMMANDS ----------------
+    def _cmd_open_account(self, account_holder: str, account_number: str, balance: float) -> bool:
+        if self.account_store.has_account(account_number):
+            return False
+        self.account_store.open_account(account_holder, account_number, balance)
+        return True
+
+    def _cmd_deposit(self, account_number: str, amount: float, description: str) -> Tuple[bool, str]:
+        account = self.account_store.get_account(account_number)
+        if account is None:
+            return False, f"Account {account_number} not found!"
+        return account.deposit(amount, description)
+
+    def _cmd_withdraw(self, account_number: str, amount: float, description: str,
+                      method: str) -> Tuple[bool, str]:
+        account = self.account_store.get_account(account_number)
+        if account is None:
+            return False, f"Account {account_number} not found!"
+        return account.withdraw(amount, description, method)
+
+    def _cmd_balance(self, account_number: str) -> Optional[Money]:
+        account = self.account_store.get_account(account_number)
+        return None if account is None else account.get_balance()
+
+    def _cmd_history(self, account_number: str, limit: Optional[int],
+                     offset: Optional[int]) -> Optional[List[Transaction]]:
+        account = self.account_store.get_account(account_number)
+        return None if account is None else account.get_transaction_history(limit, offset)
+
+    def _cmd_transfer(self, from_account: str, to_account: str, amount: float,
+                      description: str) -> Tuple[bool, str]:
+        return self.transfer_engine.transfer(from_account, to_account, amount, description)
+
+    def _cmd_apply_batch(self, operations: Sequence, atomic: bool) -> List[int]:
+        return self.batch_engine.apply(operations, atomic)
+
+    def _cmd_add_customer(self, customer: Customer) -> bool:
+        return self.customer_manager.add_customer(customer)
+
+    def _cmd_customer_report(self) -> Dict:
+        return self.customer_manager.generate_customer_report()
+
+    def _cmd_stats(self) -> Dict:
+        accounts = self.account_store.get_all_accounts()
+        return {
+            "shard": self.shard_id,
+            "accounts": len(accounts),
+            "customers": self.customer_manager.get_customer_count(),
+            "postings": sum(len(a.transactions) for a in accounts),
+            "total_balance": sum((a.balance for a in accounts), ZERO),
+        }
+
+    # ---------------- TWO-PHASE COMMIT ----------------
+    def _lock_for(self, txid: str, accounts: List[str], action) -> None:
+        for account in accounts:
+            self._locks[account] = txid
+        self._prepared[txid] = (accounts, action)
+
+    def _cmd_prepare_debit(self, txid: str, account_number: str, amount: Money, to_account: str,
+                           description: str) -> Tuple[bool, str]:
+        """Vote on the TRANSFER_OUT leg of a cross-shard transfer"""
+        if self._blocked([account_number]):
+            return False, "busy"
+        account = self.account_store.get_account(account_number)
+        if account is None:
+            return False, f"Account {account_number} not found!"
+        if amount > account.balance:
+            return False, f"Insufficient funds for transfer! Available: ${account.balance:.2f}"
+        leg = Transaction(Transaction.TRANSFER_OUT, amount, account_number,
+                          f"Transfer to {to_account}: {description}")
+        self._lock_for(txid, [account_number], lambda: account._apply_posting(leg) or leg.transaction_id)
+        return True, "prepared"
+
+    def _cmd_prepare_credit(self, txid: str, account_number: str, amount: Money, from_account: str,
+                            description: str) -> Tuple[bool, str]:
+        """Vote on the TRANSFER_IN leg of a cross-shard transfer"""
+        if self._blocked([account_number]):
+            return False, "busy"
+        account = self.account_store.get_account(account_number)
+        if account is None:
+            return False, f"Account {account_number} not found!"
+        leg = Transaction(Transaction.TRANSFER_IN, amount, account_number,
+                          f"Transfer from {from_account}: {description}")
+        self._lock_for(txid, [account_number], lambda: account._apply_posting(leg) or leg.transaction_id)
+        return True, "prepared"
+
+    def _cmd_prepare_batch(self, txid: str, operations: Sequence) -> Tuple[bool, List[int]]:
+        """Vote on this shard's share of an all-or-nothing cross-shard batch"""
+        groups: Dict[str, List[int]] = {}
+        for i, op in enumerate(operations):
+            groups.setdefault(op[0], []).append(i)
+        statuses = [STATUS_OK] * len(operations)
+        if self._blocked(groups):
+            return False, statuses
+        ok = True
+        plans = []
+        for account_number, positions in groups.items():
+            account = self.account_store.get_account(account_number)
+            if account is None:
+                for i in positions:
+                    statuses[i] = STATUS_UNKNOWN_ACCOUNT
+                ok = False
+                continue
+            plan = account._plan_batch([operations[i][1:] for i in positions])
+            for i, status in zip(positions, plan.statuses):
+                statuses[i] = status
+            ok = ok and not plan.failed
+            plans.append((account, plan))
+        if ok:
+            self._lock_for(txid, list(groups),
+                           lambda: [account._commit_batch(plan) for account, plan in plans])
+        return ok, statuses
+
+    def _cmd_commit(self, txid: str):
+        accounts, action = self._prepared.pop(txid)
+        for account in accounts:
+            del self._locks[account]
+        return action()
+
+    def _cmd_abort(self, txid: str) -> None:
+        prepared = self._prepared.pop(txid, None)
+        if prepared is not None:
+            for account in prepared[0]:
+                del self._locks[account]
+
+
+def _shard_main(shard_id: int, connection) -> None:
+    """Entry point of a shard process: serve commands until told to stop"""
+    # The shard id goes into the node bits, so IDs never collide across shards
+    set_generator(SnowflakeGenerator(node_id=shard_id % (MAX_NODE + 1)))
+    worker = ShardWorker(shard_id)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        replies = []
+        for request_id, command, args in message:
+            replies.extend(worker.handle(request_id, command, args))
+        if replies:
+            connection.send(replies)
+    connection.close()
+
+
+# ---------------- ROUTER ----------------
+class ShardRouter:
+    """
+    Client-side view of a sharded bank.
+
+    Methods mirror BankAccount / CustomerManager but take account numbers,
+    and are safe to call from many threads at once.  Every call is sent
+    to its shard immediately and waits only for its own reply, so calls
+    from different threads to different shards run in parallel.
+
+    If a shard process dies, its waiting calls and every later call to it
+    raise ConnectionError.
+    """
+
+    def __init__(self, shard_count: Optional[int] = None):
+        """
+        Start the shard processes
+
+        Args:
+            shard_count (int): Number of shards (default: one per CPU core)
+        """
+        self.shard_count = shard_count or os.cpu_count() or 1
+        self._ids = itertools.count(1)
+        self._pending: List[Dict[int, Future]] = []  # Per shard: request id -> future awaiting the reply
+        self._dead: List[bool] = []  # Per shard: its connection is gone, so nothing more is sent
+        self._connections = []
+        self._send_locks = []
+        self._processes = []
+        self._receivers = []
+        for shard_id in range(self.shard_count):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_main, args=(shard_id, child), daemon=True)
+            process.start()
+            child.close()
+            self._pending.append({})
+            self._dead.append(False)
+            self._connections.append(parent)
+            self._send_locks.append(threading.Lock())
+            receiver = threading.Thread(target=self._receive, args=(shard_id,), daemon=True)
+            receiver.start()
+            self._processes.append(process)
+            self._receivers.append(receiver)
+
+    def _receive(self, shard: int) -> None:
+        connection, pending = self._connections[shard], self._pending[shard]
+        while True:
+            try:
+                replies = connection.recv()
+            except (EOFError, OSError):
+                break
+            for request_id, result in replies:
+                future = pending.pop(request_id)
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        # No reply will come for anything still waiting; _send refuses new calls once _dead is set
+        with self._send_locks[shard]:
+            self._dead[shard] = True
+            orphans = list(pending.values())
+            pending.clear()
+        for future in orphans:
+            future.set_exception(ConnectionError(f"shard {shard} is gone"))
+
+    def _send(self, shard: int, command: str, *args) -> Future:
+        request_id = next(self._ids)
+        future = Future()
+        with self._send_locks[shard]:
+            if self._dead[shard]:
+                raise ConnectionError(f"shard {shard} is gone")
+            self._pending[shard][request_id] = future
+            try:
+                self._connections[shard].send([(request_id, command, args)])
+            except OSError as e:
+                del self._pending[shard][request_id]
+                self._dead[shard] = True
+                raise ConnectionError(f"shard {shard} is gone") from e
+        return future
+
+    def _abort(self, txid: str, shards) -> None:
+        """Release a prepared transaction on every shard still running"""
+        for shard in shards:
+            try:
+                self._call(shard, "abort", txid)
+            except ConnectionError:
+                pass
+
+    def _call(self, shard: int, command: str, *args):
+        return self._send(shard, command, *args).result()
+
+    def shard_for(self, account_number: str) -> int:
+        """Shard that owns an account number"""
+        return shard_for(account_number, self.shard_count)
+
+    # ---------------- ACCOUNTS ----------------
+    def open_account(self, account_holder: str, account_number: str, balance: float = 0.0) -> bool:
+        """Open an account on its shard; False if the number is taken"""
+        return self._call(self.shard_for(account_number), "open_account",
+                          account_holder, account_number, balance)
+
+    def deposit(self, account_number: str, amount: float, description: str = "Cash deposit") -> Tuple[bool, str]:
+        return self._call(self.shard_for(account_number), "deposit", account_number, amount, description)
+
+    def withdraw(self, account_number: str, amount: float, description: str = "Cash withdrawal",
+                 method: str = "ATM") -> Tuple[bool, str]:
+        return self._call(self.shard_for(account_number), "withdraw",
+                          account_number, amount, description, method)
+
+    def get_balance(self, account_number: str) -> Optional[Money]:
+        """Balance of an account, or None if it does not exist"""
+        return self._call(self.shard_for(account_number), "balance", account_number)
+
+    def get_transaction_history(self, account_number: str, limit: Optional[int] = None,
+                                offset: Optional[int] = None) -> Optional[List[Transaction]]:
+        """Transactions of an account (see BankAccount.get_transaction_history), or None if it does not exist"""
+        return self._call(self.shard_for(account_number), "history", account_number, limit, offset)
+
+    def transfer(self, from_account: str, to_account: str, amount,
+                 description: str = "Funds transfer") -> Tuple[bool, str]:
+        """
+        Transfer money between two accounts, on the same shard or not
+
+        Returns:
+            tuple: (success, message)
+        """
+        amount = Money.of(amount)
+        if amount <= ZERO:
+            return False, "Transfer amount must be positive!"
+        if from_account == to_account:
+            return False, "Cannot transfer to the same account!"
+        source_shard, destination_shard = self.shard_for(from_account), self.shard_for(to_account)
+        if source_shard == destination_shard:
+            return self._call(source_shard, "transfer", from_account, to_account, amount, description)
+
+        for attempt in range(TRANSFER_RETRIES):
+            txid = f"tx{next(self._ids)}"
+            try:
+                debit = self._send(source_shard, "prepare_debit", txid, from_account, amount, to_account,
+                                   description)
+                credit = self._send(destination_shard, "prepare_credit", txid, to_account, amount, from_account,
+                                    description)
+                (debit_ok, debit_message), (credit_ok, credit_message) = debit.result(), credit.result()
+            except ConnectionError:
+                # A shard died before voting; don't leave the other one holding its lock
+                self._abort(txid, (source_shard, destination_shard))
+                raise
+            if debit_ok and credit_ok:
+                transaction_id = self._send(source_shard, "commit", txid)
+                self._call(destination_shard, "commit", txid)
+                return True, (f"Transferred ${amount:.2f} from {from_account} to {to_account}. "
+                              f"Transaction ID: {transaction_id.result()}")
+            for shard, ok in ((source_shard, debit_ok), (destination_shard, credit_ok)):
+                if ok:
+                    self._call(shard, "abort", txid)
+            if debit_message != "busy" and credit_message != "busy":
+                return False, debit_message if not debit_ok else credit_message
+            time.sleep(0.0005 * (attempt + 1))
+        return False, "Accounts are busy, please try again"
+
+    def apply_batch(self, operations: Sequence, atomic: bool = True) -> List[int]:
+        """
+        Apply (account_number, operation, amount[, description]) postings across shards
+
+        Each shard's share is applied in parallel.  With atomic=True the batch
+        commits on every shard or on none.
+
+        Returns:
+            list: One batch.STATUS_* code per operation, in input order
+        """
+        groups: Dict[int, List[int]] = {}
+        for i, op in enumerate(operations):
+            groups.setdefault(self.shard_for(op[0]), []).append(i)
+        if not atomic or len(groups) == 1:
+            futures = {shard: self._send(shard, "apply_batch", [operations[i] for i in positions], atomic)
+                       for shard, positions in groups.items()}
+            return self._merge_statuses(len(operations), groups,
+                                        {shard: f.result() for shard, f in futures.items()})
+
+        for attempt in range(TRANSFER_RETRIES):
+            txid = f"tx{next(self._ids)}"
+            try:
+                futures = {shard: self._send(shard, "prepare_batch", txid, [operations[i] for i in positions])
+                           for shard, positions in groups.items()}
+                votes = {shard: f.result() for shard, f in futures.items()}
+            except ConnectionError:
+                self._abort(txid, groups)
+                raise
+            if all(ok for ok, _statuses in votes.values()):
+                commits = [self._send(shard, "commit", txid) for shard in groups]
+                for commit in commits:
+                    commit.result()
+                return [STATUS_OK] * len(operations)
+            for shard, (ok, _statuses) in votes.items():
+                if ok:
+                    self._call(shard, "abort", txid)
+            statuses = self._merge_statuses(len(operations), groups,
+                                            {shard: s for shard, (_ok, s) in votes.items()})
+            if any(s != STATUS_OK for s in statuses):
+                return [STATUS_ABORTED if s == STATUS_OK else s for s in statuses]
+            time.sleep(0.0005 * (attempt + 1))  # Every item was valid; a shard was only busy
+        return [STATUS_ABORTED] * len(operations)
+
+    @staticmethod
+    def _merge_statuses(count: int, groups: Dict[int, List[int]], results: Dict[int, List[int]]) -> List[int]:
+        statuses = [STATUS_OK] * count
+        for shard, positions in groups.items():
+            for i, status in zip(positions, results[shard]):
+                statuses[i] = status
+        return statuses
+
+    # ---------------- CUSTOMERS AND REPORTS ----------------
+    def add_customer(self, customer: Customer) -> bool:
+        """Register a customer on the shard chosen by its customer id"""
+        return self._call(shard_for(customer.customer_id, self.shard_count), "add_customer", customer)
+
+    def generate_customer_report(self) -> Dict:
+        """CustomerManager.generate_customer_report gathered across every shard"""
+        futures = [self._send(shard, "customer_report") for shard in range(self.shard_count)]
+        report = {'total_customers': 0, 'customers': [], 'total_accounts': 0}
+        for future in futures:
+            part = future.result()
+            report['total_customers'] += part['total_customers']
+            report['customers'].extend(part['customers'])
+            report['total_accounts'] += part['total_accounts']
+        report['customers'].sort(key=lambda c: c['customer_id'])
+        return report
+
+    def get_shard_stats(self) -> List[Dict]:
+        """Accounts, customers, postings and total balance held by each shard"""
+        futures = [self._send(shard, "stats") for shard in range(self.shard_count)]
+        return [future.result() for future in futures]
+
+    # ---------------- LIFECYCLE ----------------
+    def close(self) -> None:
+        """Stop every shard process"""
+        for shard, (lock, connection) in enumerate(zip(self._send_locks, self._connections)):
+            with lock:
+                if not self._dead[shard]:
+                    try:
+                        connection.send(None)
+                    except OSError:
+                        pass
+        for process in self._processes:
+            process.join()
+        for receiver in self._receivers:
+            receiver.join()
+        for connection in self._connections:
+            connection.close()
+
+    def __enter__(self) -> "ShardRouter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,296 @@
+"""
+SQLite Store Module
+Optional SQLite persistence for customers, accounts and transactions
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+
+from account import BankAccount
+from account_store import AccountBackend
+from customer import Customer
+from money import Money
+from transaction import Transaction, to_micros
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    email       TEXT NOT NULL,
+    phone       TEXT NOT NULL,
+    address     TEXT NOT NULL DEFAULT '',
+    date_joined TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customer_accounts (
+    customer_id    TEXT NOT NULL REFERENCES customers(customer_id) ON DELETE CASCADE,
+    account_number TEXT NOT NULL,
+    position       INTEGER NOT NULL,
+    PRIMARY KEY (customer_id, account_number)
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    account_number TEXT PRIMARY KEY,
+    holder         TEXT NOT NULL,
+    balance_cents  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    seq              INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id   TEXT NOT NULL UNIQUE,
+    account_number   TEXT NOT NULL,
+    transaction_type TEXT NOT NULL,
+    amount_cents     INTEGER NOT NULL,
+    description      TEXT NOT NULL,
+    timestamp        INTEGER NOT NULL,
+    date             TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_customer_accounts_account ON customer_accounts(account_number);
+CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_time ON transactions(account_number, timestamp);
+"""
+
+# Statements are kept as module constants so sqlite3's statement cache
+# reuses the same prepared statement on every call
+_INSERT_TRANSACTION = (
+    "INSERT OR IGNORE INTO transactions "
+    "(transaction_id, account_number, transaction_type, amount_cents, description, timestamp, date) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_UPSERT_ACCOUNT = (
+    "INSERT INTO accounts (account_number, holder, balance_cents) VALUES (?, ?, ?) "
+    "ON CONFLICT(account_number) DO UPDATE SET holder = excluded.holder, balance_cents = excluded.balance_cents"
+)
+_UPSERT_CUSTOMER = (
+    "INSERT INTO customers (customer_id, name, email, phone, address, date_joined) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(customer_id) DO UPDATE SET name = excluded.name, email = excluded.email, "
+    "phone = excluded.phone, address = excluded.address"
+)
+_SELECT_HISTORY = (
+    "SELECT transaction_type, amount_cents, account_number, description, transaction_id, timestamp "
+    "FROM transactions WHERE account_number = ? ORDER BY timestamp, seq"
+)
+_SELECT_RECENT = (
+    "SELECT transaction_type, amount_cents, account_number, description, transaction_id, timestamp "
+    "FROM (SELECT * FROM transactions WHERE account_number = ? "
+    "ORDER BY timestamp DESC, seq DESC LIMIT ?) ORDER BY timestamp, seq"
+)
+_SELECT_PAGE = (
+    "SELECT transaction_type, amount_cents, account_number, description, transaction_id, timestamp "
+    "FROM transactions WHERE account_number = ? ORDER BY timestamp, seq LIMIT ? OFFSET ?"
+)
+_SELECT_BETWEEN = (
+    "SELECT transaction_type, amount_cents, account_number, description, transaction_id, timestamp "
+    "FROM transactions WHERE account_number = ? AND timestamp >= ? AND timestamp < ? "
+    "ORDER BY timestamp, seq"
+)
+
+
+class ConnectionPool:
+    """Small thread-safe pool of SQLite connections to one database file"""
+
+    def __init__(self, path: str, size: int = 4):
+        """
+        Open the pool
+
+        Args:
+            path (str): Database file
+            size (int): Number of connections to keep open
+        """
+        self.path = path
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success and rolls back on error"""
+        conn = self._pool.get()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SQLiteStore(AccountBackend):
+    """
+    SQLite persistence for Customer, BankAccount and Transaction.
+
+    Also usable as the backend of an AccountStore.  Saving an account only
+    inserts transactions that have not been written yet, in one
+    executemany batch.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        """
+        Open or create the database
+
+        Args:
+            path (str): Database file
+            pool_size (int): Number of pooled connections
+        """
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        self._saved_counts = {}  # account_number -> transactions already written
+        self._saved_lock = threading.Lock()
+
+    # ---------------- TRANSACTIONS ----------------
+    @staticmethod
+    def _transaction_row(transaction: Transaction):
+        # Amounts are stored as integer cents, so SQL sums stay exact
+        return (transaction.transaction_id, transaction.account_number, transaction.transaction_type,
+                transaction.amount.cents, transaction.description, transaction.timestamp, transaction.date)
+
+    def insert_transactions(self, transactions: Iterable[Transaction]) -> None:
+        """Bulk insert transactions in a single executemany call"""
+        with self.pool.connection() as conn:
+            conn.executemany(_INSERT_TRANSACTION, (self._transaction_row(t) for t in transactions))
+
+    def get_transaction_history(self, account_number: str, limit: Optional[int] = None,
+                                offset: Optional[int] = None) -> List[Transaction]:
+        """Get an account's transactions oldest first, optionally only the recent N or one page"""
+        with self.pool.connection() as conn:
+            if offset is not None:
+                rows = conn.execute(_SELECT_PAGE, (account_number, limit or -1, offset)).fetchall()
+            elif limit and limit > 0:
+                rows = conn.execute(_SELECT_RECENT, (account_number, limit)).fetchall()
+            else:
+                rows = conn.execute(_SELECT_HISTORY, (account_number,)).fetchall()
+        return self._transactions(rows)
+
+    def get_transactions_between(self, account_number: str, start, end) -> List[Transaction]:
+        """Get an account's transactions posted in [start, end), answered from the time index"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(_SELECT_BETWEEN, (account_number, to_micros(start), to_micros(end))).fetchall()
+        return self._transactions(rows)
+
+    @staticmethod
+    def _transactions(rows) -> List[Transaction]:
+        return [Transaction(t, Money(cents), acc, desc, transaction_id=tid, timestamp=ts)
+                for t, cents, acc, desc, tid, ts in rows]
+
+    # ---------------- ACCOUNTS (AccountBackend) ----------------
+    def save(self, account: BankAccount) -> None:
+        """Write balance and any transactions not yet stored"""
+        with self._saved_lock:
+            saved = self._saved_counts.get(account.account_number, 0)
+        pending = account.transactions[saved:]
+        with self.pool.connection() as conn:
+            conn.execute(_UPSERT_ACCOUNT, (account.account_number, account.account_holder, account.balance.cents))
+            conn.executemany(_INSERT_TRANSACTION, (self._transaction_row(t) for t in pending))
+        with self._saved_lock:
+            self._saved_counts[account.account_number] = saved + len(pending)
+
+    def load(self, account_number: str) -> Optional[BankAccount]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT holder FROM accounts WHERE account_number = ?",
+                               (account_number,)).fetchone()
+        if row is None:
+            return None
+        history = self.get_transaction_history(account_number)
+        account = BankAccount.from_postings(row[0], account_number, history)
+        with self._saved_lock:
+            self._saved_counts[account_number] = len(history)
+        return account
+
+    def delete(self, account_number: str) -> None:
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM transactions WHERE account_number = ?", (account_number,))
+            conn.execute("DELETE FROM accounts WHERE account_number = ?", (account_number,))
+        with self._saved_lock:
+            self._saved_counts.pop(account_number, None)
+
+    def account_numbers(self) -> Iterable[str]:
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT account_number FROM accounts").fetchall()
+        return [r[0] for r in rows]
+
+    # ---------------- CUSTOMERS ----------------
+    def save_customer(self, customer: Customer) -> None:
+        """Insert or update a customer and its account links"""
+        with self.pool.connection() as conn:
+            conn.execute(_UPSERT_CUSTOMER, (customer.customer_id, customer.name, customer.email,
+                                            customer.phone, customer.address, customer.date_joined))
+            conn.execute("DELETE FROM customer_accounts WHERE customer_id = ?", (customer.customer_id,))
+            conn.executemany(
+                "INSERT INTO customer_accounts (customer_id, account_number, position) VALUES (?, ?, ?)",
+                [(customer.customer_id, acc, i) for i, acc in enumerate(customer.accounts)])
+
+    def save_customers(self, customers: Iterable[Customer]) -> None:
+        """Bulk insert or update customers in one transaction"""
+        customers = list(customers)
+        with self.pool.connection() as conn:
+            conn.executemany(_UPSERT_CUSTOMER, [
+                (c.customer_id, c.name, c.email, c.phone, c.address, c.date_joined) for c in customers])
+            conn.executemany("DELETE FROM customer_accounts WHERE customer_id = ?",
+                             [(c.customer_id,) for c in customers])
+            conn.executemany(
+                "INSERT INTO customer_accounts (customer_id, account_number, position) VALUES (?, ?, ?)",
+                [(c.customer_id, acc, i) for c in customers for i, acc in enumerate(c.accounts)])
+
+    def delete_customer(self, customer_id: str) -> None:
+        """Remove a customer and its account links"""
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM customers WHERE customer_id = ?", (customer_id,))
+
+    def _customer_from_row(self, conn, row) -> Customer:
+        customer_id, name, email, phone, address, date_joined = row
+        customer = Customer(customer_id, name, email, phone, address)
+        customer.date_joined = date_joined
+        for (account_number,) in conn.execute(
+                "SELECT account_number FROM customer_accounts WHERE customer_id = ? ORDER BY position",
+                (customer_id,)):
+            customer.add_account(account_number)
+        return customer
+
+    def load_customer(self, customer_id: str) -> Optional[Customer]:
+        """Load a customer by ID"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM customers WHERE customer_id = ?", (customer_id,)).fetchone()
+            return self._customer_from_row(conn, row) if row else None
+
+    def find_customer_by_account(self, account_number: str) -> Optional[Customer]:
+        """Find customer who owns an account (uses idx_customer_accounts_account)"""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT c.* FROM customer_accounts ca JOIN customers c USING (customer_id) "
+                "WHERE ca.account_number = ? ORDER BY c.rowid LIMIT 1", (account_number,)).fetchone()
+            return self._customer_from_row(conn, row) if row else None
+
+    def find_customer_by_email(self, email: str) -> Optional[Customer]:
+        """Find customer by email (uses idx_customers_email)"""
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM customers WHERE email = ? ORDER BY rowid LIMIT 1",
+                               (email,)).fetchone()
+            return self._customer_from_row(conn, row) if row else None
+
+    def load_customers(self) -> List[Customer]:
+        """Load every customer"""
+        with self.pool.connection() as conn:
+            rows = conn.execute("SELECT * FROM customers ORDER BY rowid").fetchall()
+            return [self._customer_from_row(conn, row) for row in rows]
+
+    def close(self) -> None:
+        """Close the connection pool"""
+        self.pool.close()
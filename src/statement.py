@@ -0,0 +1,213 @@
+"""
+Statement Module
+Streaming account statements as CSV, fixed-width text or JSON Lines
+
+Statements are produced by generators that read the ledger a chunk of
+rows at a time and yield formatted text, so memory stays bounded by the
+chunk size however long the history is.  write_statement() sends the
+chunks to a file or socket as they are produced.
+"""
+
+import csv
+import io
+from json import dumps
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, Tuple
+
+from account import BankAccount
+from money import format_cents
+from transaction import Transaction, to_micros
+
+CSV = "csv"
+TEXT = "text"
+JSONL = "jsonl"
+FORMATS = (CSV, TEXT, JSONL)
+EXTENSIONS = {CSV: "csv", TEXT: "txt", JSONL: "jsonl"}
+
+CSV_HEADER = ("date", "transaction_id", "type", "description", "amount", "balance")
+_TEXT_ROW = "{:<19} {:<16} {:<16} {:<32.32} {:>12} {:>12}\n"
+_TEXT_RULE = "=" * 112 + "\n"
+_JSON_ROW = ('{{"date": "{}", "transaction_id": "{}", "type": "{}", "description": {}, '
+             '"amount": {}, "balance": {}}}\n')
+
+
+def _step(balance: int, transaction: Transaction) -> int:
+    """Balance in cents after a posting, as BankAccount._apply_balance computes it"""
+    if transaction.transaction_type in BankAccount.CREDIT_TYPES:
+        return balance + transaction.amount.cents
+    if transaction.transaction_type in BankAccount.DEBIT_TYPES:
+        return balance - transaction.amount.cents
+    if transaction.transaction_type == Transaction.ACCOUNT_CREATION:
+        return transaction.amount.cents
+    return balance
+
+
+# ---------------- GENERATORS ----------------
+def iter_statement(account: BankAccount, fmt: str = CSV, start=None, end=None,
+                   chunk_rows: int = 2_000) -> Iterator[str]:
+    """
+    Yield a statement as text chunks of up to chunk_rows lines
+
+    Args:
+        account (BankAccount): Account to report on
+        fmt (str): One of FORMATS
+        start, end: Optional period [start, end) as datetime, float seconds or int
+            microseconds; rows before start still count toward the opening balance
+        chunk_rows (int): Rows formatted per yielded chunk
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS)}")
+    ledger = account.transactions
+    # Fix the end position up front so rows posted meanwhile don't leak in
+    stop = len(ledger) if end is None else ledger.position_of_time(to_micros(end))
+    first = 0 if start is None else min(ledger.position_of_time(to_micros(start)), stop)
+
+    # Balances are carried as integer cents and rendered with format_cents
+    if hasattr(ledger, "balance_at"):
+        balance = ledger.balance_at(first).cents
+    else:
+        balance = 0
+        for offset in range(0, first, chunk_rows):
+            for t in ledger[offset:min(offset + chunk_rows, first)]:
+                balance = _step(balance, t)
+
+    if fmt == CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(CSV_HEADER)
+        yield buffer.getvalue()
+    elif fmt == TEXT:
+        yield (f"Statement for {account.account_number} - {account.account_holder}\n{_TEXT_RULE}"
+               f"{'Date':<19} {'ID':<16} {'Type':<16} {'Description':<32} {'Amount':>12} {'Balance':>12}\n"
+               f"{_TEXT_RULE}Opening Balance: ${format_cents(balance)}\n")
+
+    for offset in range(first, stop, chunk_rows):
+        rows = ledger[offset:min(offset + chunk_rows, stop)]
+        balances = []
+        for t in rows:
+            balance = _step(balance, t)
+            balances.append(format_cents(balance))
+        if fmt == CSV:
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator="\n").writerows(
+                (t.date, t.transaction_id, t.transaction_type, t.description, str(t.amount), b)
+                for t, b in zip(rows, balances))
+            yield buffer.getvalue()
+        elif fmt == TEXT:
+            yield "".join(_TEXT_ROW.format(t.date, t.transaction_id, t.transaction_type, t.description,
+                                           str(t.amount), b) for t, b in zip(rows, balances))
+        else:
+            # Only the description can need escaping; the other fields are plain ASCII
+            yield "".join(_JSON_ROW.format(t.date, t.transaction_id, t.transaction_type, dumps(t.description),
+                                           str(t.amount), b) for t, b in zip(rows, balances))
+
+    if fmt == TEXT:
+        yield f"{_TEXT_RULE}Closing Balance: ${format_cents(balance)}\n"
+
+
+# ---------------- WRITERS ----------------
+def _sink(out) -> Callable[[str], None]:
+    """Function that writes a text chunk to a socket, text file or binary file"""
+    if hasattr(out, "sendall"):
+        return lambda chunk: out.sendall(chunk.encode())
+    if isinstance(out, io.TextIOBase):
+        return out.write
+    return lambda chunk: out.write(chunk.encode())
+
+
+def write_statement(account: BankAccount, out, fmt: str = CSV, start=None, end=None,
+                    chunk_rows: int = 2_000) -> int:
+    """
+    Stream a statement to a file object or socket
+
+    Args:
+        account (BankAccount): Account to report on
+        out: Text or binary file object, or a connected socket
+        fmt (str): One of FORMATS
+        start, end: Optional statement period (see iter_statement)
+        chunk_rows (int): Rows per write
+
+    Returns:
+        int: Number of characters written
+    """
+    write = _sink(out)
+    written = 0
+    for chunk in iter_statement(account, fmt, start, end, chunk_rows):
+        write(chunk)
+        written += len(chunk)
+    return written
+
+
+def export_statement(task: Tuple[BankAccount, str, str]) -> Tuple[str, int]:
+    """
+    Write one account's statement to a file; returns (path, rows)
+
+    Module-level so it can run in a worker process.
+    """
+    account, path, fmt = task
+    with open(path, "w", encoding="utf-8", newline="", buffering=1 << 20) as f:
+        write_statement(account, f, fmt)
+    return path, len(account.transactions)
+
+
+# ---------------- BULK EXPORT ----------------
+def export_all(customer_manager, account_store, directory: str, fmt: str = CSV,
+               workers: int = 0, progress=None) -> Dict:
+    """
+    Write a statement file for every account of every customer
+
+    Files are named <customer_id>_<account_number>.<ext>.  With workers > 0
+    statements are formatted in that many processes, keeping at most two
+    per worker in flight so memory stays bounded.
+
+    Args:
+        customer_manager (CustomerManager): Whose accounts to export
+        account_store (AccountStore): Where the accounts live
+        directory (str): Output directory (created if missing)
+        fmt (str): One of FORMATS
+        workers (int): Export processes; 0 exports in this process
+        progress: Optional callable receiving the running stats after each statement
+
+    Returns:
+        dict: statements, rows, seconds and rows_per_sec
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+
+    def tasks() -> Iterator[Tuple[BankAccount, str, str]]:
+        for customer in customer_manager.get_all_customers():
+            for account_number in customer.get_accounts():
+                account = account_store.get_account(account_number)
+                if account is not None:
+                    name = f"{customer.customer_id}_{account_number}.{EXTENSIONS[fmt]}"
+                    yield account, os.path.join(directory, name), fmt
+
+    stats = {"statements": 0, "rows": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+    started = time.perf_counter()
+
+    def record(result: Tuple[str, int]) -> None:
+        stats["statements"] += 1
+        stats["rows"] += result[1]
+        stats["seconds"] = time.perf_counter() - started
+        stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        if progress is not None:
+            progress(dict(stats))
+
+    if workers <= 0:
+        for task in tasks():
+            record(export_statement(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for task in tasks():
+                pending.append(pool.submit(export_statement, task))
+                if len(pending) >= workers * 2:
+                    record(pending.popleft().result())
+            while pending:
+                record(pending.popleft().result())
+    stats["seconds"] = time.perf_counter() - started
+    return stats
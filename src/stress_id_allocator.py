@@ -0,0 +1,89 @@
+"""
+ID Allocator Stress Test
+Allocates millions of IDs through a persisted IdAllocator, with releases
+and simulated crashes, and checks that no live ID is ever issued twice
+
+Exits with status 1 on a duplicate, an ID that fails validation, or a
+crash that loses track of issued IDs.
+
+Usage: python stress_id_allocator.py [--ids 2000000] [--release-every 7] [--crashes 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from id_allocator import ACCOUNT_PREFIX, IdAllocator, parse_id
+from validation import Validation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ID allocator collision test")
+    parser.add_argument("--ids", type=int, default=2_000_000, help="allocations to perform")
+    parser.add_argument("--release-every", type=int, default=7, help="release a random live ID every N allocations")
+    parser.add_argument("--crashes", type=int, default=3, help="times to drop the allocator without closing it")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = []
+    live = bytearray()  # live[sequence] == 1 while the ID is issued and not released
+    live_ids = []  # Issued IDs, for picking ones to release (released entries go stale)
+    crash_points = set(rng.sample(range(1, args.ids), min(args.crashes, args.ids - 1)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "account_numbers.alloc")
+        allocator = IdAllocator(ACCOUNT_PREFIX, path)
+        start = time.perf_counter()
+        for i in range(args.ids):
+            if i in crash_points:
+                # Abandon the allocator as a crash would; records are already flushed
+                allocator = IdAllocator(ACCOUNT_PREFIX, path)
+            value = allocator.allocate()
+            sequence = parse_id(ACCOUNT_PREFIX, value)
+            if sequence is None:
+                failures.append(f"{value} does not parse")
+                break
+            if sequence >= len(live):
+                live.extend(bytes(max(sequence + 1 - len(live), len(live))))
+            if live[sequence]:
+                failures.append(f"{value} issued twice")
+                break
+            live[sequence] = 1
+            live_ids.append(value)
+            if i % args.release_every == 0:
+                victim = live_ids[rng.randrange(len(live_ids))]
+                victim_sequence = parse_id(ACCOUNT_PREFIX, victim)
+                if live[victim_sequence] and allocator.release(victim):
+                    live[victim_sequence] = 0
+        elapsed = time.perf_counter() - start
+        state_size = os.path.getsize(path)
+        allocator.close()
+
+    issued = sum(live)
+    print(f"{args.ids:,} allocations in {elapsed:.2f}s ({args.ids / elapsed:,.0f} IDs/sec), "
+          f"{len(crash_points)} simulated crashes")
+    print(f"{issued:,} IDs live, high-water mark {allocator.high_water:,}, "
+          f"{allocator.free_count:,} free, state file {state_size:,} bytes")
+
+    sample = rng.sample(live_ids, min(100_000, len(live_ids)))
+    mask, _cleaned, _codes = Validation.validate_account_numbers(sample)
+    rejected = len(sample) - sum(bool(ok) for ok in mask)
+    if rejected:
+        failures.append(f"{rejected} issued IDs rejected by Validation.validate_account_numbers")
+    mistyped = [value[:-1] + str((int(value[-1]) + 1) % 10) for value in sample[:1000]]
+    accepted = sum(bool(ok) for ok in Validation.validate_account_numbers(mistyped)[0])
+    if accepted:
+        failures.append(f"{accepted} IDs with a wrong check digit were accepted")
+
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("OK: no ID issued twice and every issued ID validates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Transfer Stress Test
+Hammers TransferEngine from many threads and checks money is conserved
+
+Exits with status 1 if the total balance changes or any account's balance
+disagrees with its own ledger.
+
+Usage: python stress_transfer.py [--accounts 50] [--threads 16] [--transfers 20000]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from account import BankAccount
+from account_store import AccountStore
+from money import ZERO, Money
+from transfer_engine import TransferEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent transfer stress test")
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--transfers", type=int, default=20_000, help="transfers per thread")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    store = AccountStore()
+    numbers = [f"ACC{i + 1:03d}" for i in range(args.accounts)]
+    for number in numbers:
+        store.open_account(f"Holder {number}", number, 1000.0)
+    engine = TransferEngine(store)
+    expected_total = sum(store.get_account(n).balance for n in numbers)
+    succeeded = [0] * args.threads
+
+    def worker(index):
+        # Money sums are exact, so conservation is checked with ==
+        rng = random.Random(args.seed + index)
+        for _ in range(args.transfers):
+            src, dst = rng.sample(numbers, 2)
+            ok, _msg = engine.transfer(src, dst, Money(rng.randint(1, 20_000)))
+            succeeded[index] += ok
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    attempted = args.threads * args.transfers
+    total = sum(store.get_account(n).balance for n in numbers)
+    print(f"{attempted:,} transfers attempted, {sum(succeeded):,} succeeded "
+          f"in {elapsed:.2f}s ({attempted / elapsed:,.0f} transfers/sec)")
+    print(f"Total balance: expected {expected_total:,.2f}, got {total:,.2f}")
+
+    failures = []
+    if total != expected_total:
+        failures.append("total balance changed")
+    for number in numbers:
+        account = store.get_account(number)
+        replayed = BankAccount.from_postings(account.account_holder, number, account.transactions)
+        if replayed.balance != account.balance:
+            failures.append(f"{number}: balance {account.balance} != ledger {replayed.balance}")
+        if account.balance < ZERO:
+            failures.append(f"{number}: negative balance {account.balance}")
+    transfer_legs = sum(len(store.get_account(n).transactions) - 1 for n in numbers)
+    if transfer_legs != 2 * sum(succeeded):
+        failures.append(f"{transfer_legs} ledger legs for {sum(succeeded)} transfers")
+
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("OK: money conserved and every ledger matches its balance")
+
+
+if __name__ == "__main__":
+    main()
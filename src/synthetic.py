@@ -0,0 +1,126 @@
+"""
+Synthetic Data Module
+Deterministic customer, account and transaction populations for benchmarks
+
+Everything but posting times is derived from the seed.  Names, emails,
+amounts, customer IDs, account numbers and transaction IDs are the same
+on every run, so benchmark results from two versions describe the same
+data.
+
+Usage: python synthetic.py --customers 100000 [--postings 10] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+from typing import Iterator, List, Tuple
+
+from account import BankAccount
+from account_store import AccountStore
+from batch import DEPOSIT, WITHDRAW
+from customer import Customer, CustomerManager
+from id_allocator import ACCOUNT_PREFIX, CUSTOMER_PREFIX, FIRST_SEQUENCE, format_id
+from id_generator import SequentialGenerator, get_generator, set_generator
+
+SYLLABLES = ["an", "ar", "be", "ca", "da", "el", "fi", "ga", "ho", "is", "jo", "ka", "li",
+             "ma", "ne", "or", "pa", "ri", "sa", "te", "ul", "va", "wi", "ya", "zo"]
+DESCRIPTIONS = {
+    DEPOSIT: ["Salary", "Cash deposit", "Refund", "Interest"],
+    WITHDRAW: ["Groceries", "Rent", "ATM withdrawal", "Utilities", "Fuel"],
+}
+
+
+def make_names(count: int, seed: int = 7) -> List[str]:
+    """Synthetic first/last names with a realistic spread of common and rare words"""
+    rng = random.Random(seed)
+    words = lambda n, parts: sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.choice(parts)))
+                                     for _ in range(n)})
+    first, last = words(3_000, (2, 3)), words(60_000, (2, 3, 4))
+    return [f"{rng.choice(first).title()} {rng.choice(last).title()}" for _ in range(count)]
+
+
+def customer_id(index: int) -> str:
+    """Customer ID of the index-th generated customer (0-based)"""
+    return format_id(CUSTOMER_PREFIX, FIRST_SEQUENCE + index)
+
+
+def account_number(index: int) -> str:
+    """Account number of the index-th generated account (0-based)"""
+    return format_id(ACCOUNT_PREFIX, FIRST_SEQUENCE + index)
+
+
+def postings(count: int, rng: random.Random, balance: float) -> Iterator[Tuple[str, float, str]]:
+    """
+    (operation, amount, description) tuples for BankAccount.apply_batch
+
+    Whole-dollar amounts; withdrawals never exceed the running balance, so
+    every generated batch applies in full.
+    """
+    for _ in range(count):
+        if balance >= 20 and rng.random() < 0.4:
+            operation, amount = WITHDRAW, float(rng.randint(1, int(min(balance, 500))))
+            balance -= amount
+        else:
+            operation, amount = DEPOSIT, float(rng.randint(1, 2_000))
+            balance += amount
+        yield operation, amount, rng.choice(DESCRIPTIONS[operation])
+
+
+def build_population(customers: int, accounts_per_customer: int = 1, postings_per_account: int = 10,
+                     seed: int = 0) -> Tuple[CustomerManager, AccountStore]:
+    """
+    Build customers, their accounts and each account's history in memory
+
+    With the defaults this takes roughly 7 KB per customer, so a million
+    customers need about 7 GB of RAM.
+
+    Args:
+        customers (int): Customers to create
+        accounts_per_customer (int): Accounts linked to each customer
+        postings_per_account (int): Deposits/withdrawals after the opening posting
+        seed (int): Same seed, same population
+
+    Returns:
+        tuple: (CustomerManager, AccountStore)
+    """
+    rng = random.Random(seed)
+    names = make_names(customers, seed)
+    manager = CustomerManager()
+    store = AccountStore()
+    previous = get_generator()
+    set_generator(SequentialGenerator())
+    try:
+        for i, name in enumerate(names):
+            customer = Customer(customer_id(i), name, f"customer{i}@example.com",
+                                f"555{rng.randrange(10 ** 7):07d}")
+            for j in range(accounts_per_customer):
+                number = account_number(i * accounts_per_customer + j)
+                opening = float(rng.randint(0, 5_000))
+                account = BankAccount(name, number, opening)
+                account.apply_batch(list(postings(postings_per_account, rng, opening)))
+                store.add_account(account)
+                customer.add_account(number)
+            manager.add_customer(customer)
+    finally:
+        set_generator(previous)
+    return manager, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a synthetic population and report its size")
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=1, help="accounts per customer")
+    parser.add_argument("--postings", type=int, default=10, help="postings per account")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manager, store = build_population(args.customers, args.accounts, args.postings, args.seed)
+    elapsed = time.perf_counter() - start
+    rows = sum(len(a.transactions) for a in store.get_all_accounts())
+    print(f"{manager.get_customer_count():,} customers, {len(store):,} accounts, "
+          f"{rows:,} postings built in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Task Executor Module
+Runs slow work on background threads and hands results back to the Tk thread
+"""
+
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+# Event kinds put on the result queue by worker threads
+_DONE = "done"
+_ERROR = "error"
+_CANCELLED = "cancelled"
+_PROGRESS = "progress"
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task by TaskHandle.check_cancelled() once cancel() was called"""
+
+
+class TaskHandle:
+    """
+    One submitted task.
+
+    The GUI keeps the handle to cancel the task; the task itself receives it
+    (when submitted with with_handle=True) to report progress and to stop
+    early by calling check_cancelled() between steps.
+    """
+
+    def __init__(self, task_id: int, executor: "TaskExecutor", on_done, on_error, on_progress, on_cancel):
+        self.task_id = task_id
+        self._executor = executor
+        self._cancel_event = threading.Event()
+        self._future = None
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """Ask the task to stop; no completion callback runs after this"""
+        self._cancel_event.set()
+        if self._future is not None and self._future.cancel():
+            # Never started, so no worker will report it
+            self._executor._results.put((self, _CANCELLED, None))
+
+    def check_cancelled(self) -> None:
+        """Called by the task between steps; raises TaskCancelled once cancel() was called"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, done: int, total: Optional[int] = None, message: str = "") -> None:
+        """Called by the task; on_progress(done, total, message) runs on the Tk thread"""
+        self._executor._results.put((self, _PROGRESS, (done, total, message)))
+
+
+class TaskExecutor:
+    """
+    Thread pool whose completions are delivered on the Tk main loop.
+
+    Workers never touch widgets: they put results on a queue, and a
+    root.after() poll drains it on the Tk thread and runs the callbacks,
+    so the main loop never blocks on an operation however slow it is.
+    """
+
+    def __init__(self, root, max_workers: int = 4, poll_ms: int = 25):
+        """
+        Initialize the executor
+
+        Args:
+            root: Tk root (or any widget) whose after() schedules the polling
+            max_workers (int): Worker threads
+            poll_ms (int): How often finished tasks are collected while any are running
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-task")
+        self._results: "queue.Queue" = queue.Queue()
+        self._running: Dict[int, TaskHandle] = {}
+        self._ids = itertools.count(1)
+        self._polling = False
+
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, on_progress: Optional[Callable] = None,
+               on_cancel: Optional[Callable] = None, with_handle: bool = False, **kwargs) -> TaskHandle:
+        """
+        Run fn(*args, **kwargs) on a worker thread
+
+        Args:
+            fn: The work; must not touch Tk widgets
+            on_done: Called on the Tk thread with fn's return value
+            on_error: Called on the Tk thread with the exception fn raised
+            on_progress: Called on the Tk thread with (done, total, message)
+            on_cancel: Called on the Tk thread once a cancelled task has stopped
+            with_handle (bool): Pass the TaskHandle to fn as the task= keyword
+
+        Returns:
+            TaskHandle: Used to cancel the task
+        """
+        handle = TaskHandle(next(self._ids), self, on_done, on_error, on_progress, on_cancel)
+        if with_handle:
+            kwargs["task"] = handle
+        self._running[handle.task_id] = handle
+        handle._future = self._pool.submit(self._run, handle, fn, args, kwargs)
+        self._schedule_poll()
+        return handle
+
+    def _run(self, handle: TaskHandle, fn: Callable, args, kwargs) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except TaskCancelled:
+            self._results.put((handle, _CANCELLED, None))
+        except Exception as e:
+            self._results.put((handle, _ERROR, e))
+        else:
+            self._results.put((handle, _DONE, result))
+
+    # ---------------- TK THREAD ----------------
+    def _schedule_poll(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        self._polling = False
+        self.drain()
+        if self._running:
+            self._schedule_poll()
+
+    def drain(self) -> None:
+        """Deliver every queued completion and progress report; runs on the Tk thread"""
+        while True:
+            try:
+                handle, kind, value = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if kind == _PROGRESS:
+                if handle.on_progress is not None and not handle.cancelled:
+                    handle.on_progress(*value)
+                continue
+            if self._running.pop(handle.task_id, None) is None:
+                continue  # Already finished (e.g. cancelled before it started)
+            if handle.cancelled or kind == _CANCELLED:
+                if handle.on_cancel is not None:
+                    handle.on_cancel()
+            elif kind == _DONE:
+                if handle.on_done is not None:
+                    handle.on_done(value)
+            elif handle.on_error is not None:
+                handle.on_error(value)
+            else:
+                # Nobody asked for it: report like any failed Tk callback
+                self.root.report_callback_exception(type(value), value, value.__traceback__)
+
+    @property
+    def pending(self) -> int:
+        """Tasks submitted but not yet delivered"""
+        return len(self._running)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Cancel everything still queued and stop the worker threads
+
+        Args:
+            wait (bool): Block until a task already running has returned
+        """
+        for handle in list(self._running.values()):
+            handle.cancel()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,523 @@
+"""
+Tracing Module
+Records every account and customer operation to a compact trace file and
+replays it headless at the original speed, a multiple of it, or flat out
+
+Recording installs wrappers on the traced methods (as the "tracing" layer
+of the hooks registry, shared with metrics) while a recorder is running;
+nothing is wrapped otherwise.  Each call becomes one record: op
+code, outcome, start offset and duration in nanoseconds, and its arguments
+as compact JSON.  Accounts and customers that existed before recording
+started are written as state records the first time they are touched, and
+stop() appends every traced account's final balance, so a replay can
+check that it ended where the recording did.
+
+Usage: python tracing.py info trace.btr
+       python tracing.py replay trace.btr [--speed max|original|10] [--backend memory|journal|sqlite]
+       python tracing.py demo trace.btr [--customers 1000] [--ops 100000]
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import hooks
+from money import Money
+
+MAGIC = b"BANKTRACE1\n"
+_RECORD = struct.Struct("<BBqqI")  # op, status, start ns, duration ns, payload length
+
+# Outcome of a call, as far as it can be told from its return value
+STATUS_NONE = 0    # Returned something other than a success flag
+STATUS_OK = 1      # Returned True or (True, ...)
+STATUS_FAILED = 2  # Returned False or (False, ...)
+STATUS_ERROR = 3   # Raised
+
+# Traced calls: op code -> (module, class, attribute).  Codes are stored in
+# trace files, so new points get new codes and old ones are never reused.
+POINTS: Dict[int, Tuple[str, str, str]] = {
+    1: ("account", "BankAccount", "__init__"),
+    2: ("account", "BankAccount", "deposit"),
+    3: ("account", "BankAccount", "withdraw"),
+    4: ("account", "BankAccount", "transfer"),
+    5: ("account", "BankAccount", "apply_batch"),
+    6: ("account", "BankAccount", "get_balance"),
+    7: ("account", "BankAccount", "get_transaction_history"),
+    8: ("account", "BankAccount", "get_mini_statement"),
+    9: ("account", "BankAccount", "get_account_info"),
+    20: ("transfer_engine", "TransferEngine", "transfer"),
+    21: ("batch", "BatchEngine", "apply"),
+    30: ("customer", "CustomerManager", "add_customer"),
+    31: ("customer", "CustomerManager", "remove_customer"),
+    32: ("customer", "CustomerManager", "get_customer"),
+    33: ("customer", "CustomerManager", "find_customer_by_account"),
+    34: ("customer", "CustomerManager", "find_customer_by_email"),
+    35: ("customer", "CustomerManager", "find_customers_by_name"),
+    36: ("customer", "CustomerManager", "search_customers"),
+    37: ("customer", "CustomerManager", "generate_customer_report"),
+    40: ("customer", "Customer", "add_account"),
+    41: ("customer", "Customer", "remove_account"),
+    42: ("customer", "Customer", "update_info"),
+}
+
+# Records that carry state rather than a call
+OP_ACCOUNT_STATE = 250   # [account_number, holder, balance] before the account's first traced call
+OP_CUSTOMER_STATE = 251  # Customer fields before the customer's first traced call
+OP_BALANCES = 252        # {account_number: balance} when recording stopped
+
+
+def op_name(op: int) -> str:
+    if op in POINTS:
+        _module, cls, attribute = POINTS[op]
+        return f"{cls}.{attribute}"
+    return {OP_ACCOUNT_STATE: "account state", OP_CUSTOMER_STATE: "customer state",
+            OP_BALANCES: "final balances"}.get(op, f"op {op}")
+
+
+def _status(result) -> int:
+    if result is True or result is False:
+        return STATUS_OK if result else STATUS_FAILED
+    if result.__class__ is tuple and result and isinstance(result[0], bool):
+        return STATUS_OK if result[0] else STATUS_FAILED
+    return STATUS_NONE
+
+
+def _customer_fields(customer) -> Dict:
+    return {"customer_id": customer.customer_id, "name": customer.name, "email": customer.email,
+            "phone": customer.phone, "address": customer.address, "accounts": list(customer.accounts),
+            "date_joined": customer.date_joined}
+
+
+def _encode(value):
+    """JSON-ready form of an argument; accounts and customers are stored by identity"""
+    if value is None or value.__class__ in (str, int, float, bool):
+        return value
+    if value.__class__ is Money:
+        return str(value)  # Money.of parses it back exactly
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if hasattr(value, "account_number") and hasattr(value, "balance"):
+        return {"$account": value.account_number}
+    if hasattr(value, "customer_id"):
+        return {"$customer": _customer_fields(value)}
+    return str(value)
+
+
+# ---------------- RECORDING ----------------
+class TraceRecorder:
+    """Writes trace records; one is active at a time, via start() and stop()"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "wb", buffering=1 << 20)
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter_ns()
+        self._accounts: Dict[str, object] = {}  # account_number -> BankAccount seen so far
+        self._customers = set()  # customer_ids whose state is in the trace
+        self.records = 0
+
+    def _write(self, op: int, status: int, start: int, duration: int, payload) -> None:
+        body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+        with self._lock:
+            self._file.write(_RECORD.pack(op, status, start - self._t0, duration, len(body)))
+            self._file.write(body)
+            self.records += 1
+
+    def note_account(self, account) -> None:
+        """Write an account's current state the first time it is seen"""
+        if account is not None and account.account_number not in self._accounts:
+            self._accounts[account.account_number] = account
+            self._write(OP_ACCOUNT_STATE, STATUS_NONE, time.perf_counter_ns(), 0,
+                        [account.account_number, account.account_holder, str(account.balance)])
+
+    def note_customer(self, customer) -> None:
+        if customer is not None and customer.customer_id not in self._customers:
+            self._customers.add(customer.customer_id)
+            self._write(OP_CUSTOMER_STATE, STATUS_NONE, time.perf_counter_ns(), 0, _customer_fields(customer))
+
+    def before(self, op: int, target, arguments: List) -> None:
+        """Capture state of everything the call is about to touch"""
+        module, cls, attribute = POINTS[op]
+        if cls == "BankAccount":
+            if attribute != "__init__":
+                self.note_account(target)
+                for value in arguments:
+                    if hasattr(value, "account_number") and hasattr(value, "balance"):
+                        self.note_account(value)
+        elif cls == "TransferEngine":
+            for number in arguments[:2]:
+                self.note_account(target.account_store.get_account(number))
+        elif cls == "BatchEngine":
+            for number in {op[0] for op in arguments[0]}:
+                self.note_account(target.account_store.get_account(number))
+        elif cls == "Customer":
+            self.note_customer(target)
+
+    def after(self, op: int, status: int, start: int, duration: int, target, arguments: List) -> None:
+        cls, attribute = POINTS[op][1:]
+        if cls == "BankAccount":
+            key = target.account_number
+            if attribute == "__init__":
+                self._accounts.setdefault(key, target)
+        elif cls == "Customer":
+            key = target.customer_id
+        else:
+            key = None
+            if attribute == "add_customer" and status == STATUS_OK:
+                self._customers.add(arguments[0].customer_id)
+        self._write(op, status, start, duration, [key, _encode(arguments)])
+
+    def snapshot(self, account_store=None, customer_manager=None) -> None:
+        """Write the state of every account and customer held in memory"""
+        if account_store is not None:
+            for account in account_store.get_all_accounts():
+                self.note_account(account)
+        if customer_manager is not None:
+            for customer in customer_manager.get_all_customers():
+                self.note_customer(customer)
+
+    def close(self) -> None:
+        balances = {number: str(account.balance) for number, account in self._accounts.items()}
+        self._write(OP_BALANCES, STATUS_NONE, time.perf_counter_ns(), 0, balances)
+        with self._lock:
+            self._file.close()
+
+
+_recorder: Optional[TraceRecorder] = None
+_LAYER = "tracing"  # Name of this module's wrappers in the hooks registry
+_local = threading.local()
+
+
+def _wrap(fn, op: int):
+    signature = inspect.signature(fn)
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, **kwargs):
+        recorder = _recorder
+        # Only the outermost traced call is recorded; replaying it redoes the inner ones
+        if recorder is None or getattr(_local, "active", False):
+            return fn(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        target, *arguments = bound.arguments.values()
+        if POINTS[op][1] == "Customer" and target._manager is None:
+            return fn(*args, **kwargs)  # Not managed yet; add_customer will carry its accounts
+        _local.active = True
+        try:
+            recorder.before(op, target, arguments)
+            start = clock()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                recorder.after(op, STATUS_ERROR, start, clock() - start, target, arguments)
+                raise
+            recorder.after(op, _status(result), start, clock() - start, target, arguments)
+            return result
+        finally:
+            _local.active = False
+
+    wrapper.__name__, wrapper.__doc__, wrapper.__wrapped__ = fn.__name__, fn.__doc__, fn
+    return wrapper
+
+
+def start(path: str, account_store=None, customer_manager=None) -> TraceRecorder:
+    """
+    Start recording every traced call to path
+
+    Args:
+        path (str): Trace file to create
+        account_store (AccountStore): Optional; its accounts are written up front
+        customer_manager (CustomerManager): Optional; its customers are written up front
+    """
+    global _recorder
+    if _recorder is not None:
+        raise RuntimeError("A trace is already being recorded")
+    recorder = TraceRecorder(path)
+    recorder.snapshot(account_store, customer_manager)
+    for op, (module, cls, attribute) in POINTS.items():
+        owner = getattr(importlib.import_module(module), cls)
+        hooks.install(_LAYER, owner, attribute, lambda fn, op=op: _wrap(fn, op))
+    _recorder = recorder
+    return recorder
+
+
+def stop() -> Optional[TraceRecorder]:
+    """Stop recording, restore the traced methods and finish the file"""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    hooks.uninstall(_LAYER)
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+
+# ---------------- READING ----------------
+def read_trace(path: str) -> Iterator[Tuple[int, int, int, int, object]]:
+    """Yield (op, status, start ns, duration ns, payload) for every record"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return  # End of file, or a record torn by a crash
+            op, status, start, duration, length = _RECORD.unpack(header)
+            body = f.read(length)
+            if len(body) < length:
+                return
+            yield op, status, start, duration, json.loads(body)
+
+
+# ---------------- REPLAY ----------------
+class Replayer:
+    """Re-executes trace records against an AccountStore and CustomerManager"""
+
+    def __init__(self, account_store, customer_manager):
+        from batch import BatchEngine
+        from transfer_engine import TransferEngine
+        self.account_store = account_store
+        self.customer_manager = customer_manager
+        self.transfer_engine = TransferEngine(account_store)
+        self.batch_engine = BatchEngine(account_store)
+        self.expected_balances: Optional[Dict[str, str]] = None
+        self.calls = 0
+        self.divergences: List[str] = []  # Calls whose outcome differs from the recording
+        self.skipped = 0  # Calls on accounts or customers the replay does not have
+
+    def _customer(self, fields: Dict):
+        from customer import Customer
+        customer = Customer(fields["customer_id"], fields["name"], fields["email"],
+                            fields["phone"], fields["address"])
+        for number in fields["accounts"]:
+            customer.add_account(number)
+        customer.date_joined = fields["date_joined"]
+        return customer
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(v) for v in value]
+        if isinstance(value, dict):
+            if "$account" in value:
+                return self.account_store.get_account(value["$account"])
+            if "$customer" in value:
+                return self._customer(value["$customer"])
+            return {k: self._decode(v) for k, v in value.items()}
+        return value
+
+    def apply(self, op: int, status: int, payload) -> None:
+        store, manager = self.account_store, self.customer_manager
+        if op == OP_ACCOUNT_STATE:
+            number, holder, balance = payload
+            if not store.has_account(number):
+                store.open_account(holder, number, balance)
+            return
+        if op == OP_CUSTOMER_STATE:
+            if manager.get_customer(payload["customer_id"]) is None:
+                manager.add_customer(self._customer(payload))
+            return
+        if op == OP_BALANCES:
+            self.expected_balances = payload
+            return
+        if op not in POINTS:
+            raise ValueError(f"Unknown trace op {op}; the trace is newer than this replayer")
+
+        _module, cls, attribute = POINTS[op]
+        key, arguments = payload
+        arguments = self._decode(arguments)
+        self.calls += 1
+        if cls == "BankAccount" and attribute == "__init__":
+            if store.open_account(*arguments[:3]) is None:
+                self.divergences.append(f"{op_name(op)}({arguments[1]}): account already exists")
+            return
+        if cls == "BankAccount":
+            target = store.get_account(key)
+        elif cls == "Customer":
+            target = manager.get_customer(key)
+        elif cls == "TransferEngine":
+            target = self.transfer_engine
+        elif cls == "BatchEngine":
+            target = self.batch_engine
+        else:
+            target = manager
+        if target is None:
+            self.skipped += 1
+            return
+        try:
+            outcome = _status(getattr(target, attribute)(*arguments))
+        except Exception:
+            outcome = STATUS_ERROR
+        if outcome != status:
+            self.divergences.append(f"{op_name(op)}({key or ''}): recorded status {status}, replayed {outcome}")
+
+    def balance_mismatches(self) -> List[str]:
+        """Accounts whose replayed balance differs from the recorded final balance"""
+        mismatches = []
+        for number, expected in (self.expected_balances or {}).items():
+            account = self.account_store.get_account(number)
+            actual = None if account is None else account.balance
+            if actual != Money.of(expected):
+                mismatches.append(f"{number}: recorded {expected}, replayed {actual}")
+        return mismatches
+
+
+def replay(path: str, account_store, customer_manager, speed: Optional[float] = None) -> Dict:
+    """
+    Replay a trace
+
+    Args:
+        path (str): Trace file
+        account_store, customer_manager: System to replay into
+        speed (float): 1.0 keeps the recorded pacing, 10.0 runs ten times
+            faster, None runs as fast as possible
+
+    Returns:
+        dict: calls, seconds, calls_per_sec, divergences, skipped, balance_mismatches
+    """
+    replayer = Replayer(account_store, customer_manager)
+    started = time.perf_counter()
+    for op, status, offset, _duration, payload in read_trace(path):
+        if speed is not None:
+            delay = offset / 1e9 / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+        replayer.apply(op, status, payload)
+    elapsed = time.perf_counter() - started
+    return {
+        "calls": replayer.calls,
+        "seconds": elapsed,
+        "calls_per_sec": replayer.calls / elapsed if elapsed > 0 else 0.0,
+        "divergences": replayer.divergences,
+        "skipped": replayer.skipped,
+        "balances_checked": len(replayer.expected_balances or {}),
+        "balance_mismatches": replayer.balance_mismatches(),
+    }
+
+
+# ---------------- COMMAND LINE ----------------
+def _info(path: str) -> None:
+    counts: Dict[int, int] = {}
+    busy: Dict[int, int] = {}
+    last = 0
+    for op, _status, offset, duration, _payload in read_trace(path):
+        counts[op] = counts.get(op, 0) + 1
+        busy[op] = busy.get(op, 0) + duration
+        last = max(last, offset)
+    print(f"{path}: {sum(counts.values()):,} records over {last / 1e9:.2f}s, {os.path.getsize(path):,} bytes")
+    print(f"\n{'Operation':<40} {'Records':>10} {'Mean (us)':>10}")
+    print("-" * 62)
+    for op in sorted(counts):
+        print(f"{op_name(op):<40} {counts[op]:>10,} {busy[op] / counts[op] / 1000:>10.2f}")
+
+
+def _demo(path: str, customers: int, ops: int, seed: int) -> None:
+    """Record a random workload over a synthetic population"""
+    from synthetic import build_population
+    from transfer_engine import TransferEngine
+    manager, store = build_population(customers, seed=seed)
+    engine = TransferEngine(store)
+    accounts = store.get_all_accounts()
+    all_customers = manager.get_all_customers()
+    rng = random.Random(seed)
+    start(path, store, manager)
+    try:
+        for _ in range(ops):
+            roll = rng.random()
+            account = rng.choice(accounts)
+            if roll < 0.35:
+                account.deposit(float(rng.randint(1, 500)), "Demo deposit")
+            elif roll < 0.6:
+                account.withdraw(float(rng.randint(1, 800)), "Demo withdrawal")
+            elif roll < 0.75:
+                engine.transfer(account.account_number, rng.choice(accounts).account_number,
+                                float(rng.randint(1, 300)), "Demo transfer")
+            elif roll < 0.85:
+                account.get_transaction_history(20)
+            elif roll < 0.95:
+                manager.find_customer_by_account(account.account_number)
+            else:
+                rng.choice(all_customers).update_info(phone=f"555{rng.randrange(10 ** 7):07d}")
+    finally:
+        recorder = stop()
+    print(f"Recorded {recorder.records:,} records to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Operation trace tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="summarize a trace")
+    info.add_argument("trace")
+    run = commands.add_parser("replay", help="re-execute a trace and check final balances")
+    run.add_argument("trace")
+    run.add_argument("--speed", default="max", help="max, original, or a speed-up factor such as 10")
+    run.add_argument("--backend", choices=("memory", "journal", "sqlite"), default="memory")
+    run.add_argument("--data", help="directory for the journal or sqlite backend (default: a temp dir)")
+    run.add_argument("--json", action="store_true", help="print the result as JSON")
+    demo = commands.add_parser("demo", help="record a random workload over synthetic data")
+    demo.add_argument("trace")
+    demo.add_argument("--customers", type=int, default=1_000)
+    demo.add_argument("--ops", type=int, default=100_000)
+    demo.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "info":
+        _info(args.trace)
+        return
+    if args.command == "demo":
+        _demo(args.trace, args.customers, args.ops, args.seed)
+        return
+
+    speed = None if args.speed == "max" else 1.0 if args.speed == "original" else float(args.speed)
+    with tempfile.TemporaryDirectory() as scratch:
+        data = args.data or scratch
+        closers = []
+        if args.backend == "journal":
+            from journal import Journal
+            journal = Journal(os.path.join(data, "journal"))
+            store, manager = journal.account_store, journal.customer_manager
+            closers.append(journal.close)
+        else:
+            from account_store import AccountStore
+            from customer import CustomerManager
+            if args.backend == "sqlite":
+                from sqlite_store import SQLiteStore
+                backend = SQLiteStore(os.path.join(data, "bank.db"))
+                store, manager = AccountStore(backend), CustomerManager(backend)
+                closers.append(backend.pool.close)
+            else:
+                store, manager = AccountStore(), CustomerManager()
+        try:
+            result = replay(args.trace, store, manager, speed)
+        finally:
+            for close in closers:
+                close()
+
+    if args.json:
+        print(json.dumps({"backend": args.backend, "speed": args.speed, **result}, indent=2))
+    else:
+        print(f"Replayed {result['calls']:,} calls in {result['seconds']:.2f}s "
+              f"({result['calls_per_sec']:,.0f} calls/sec, {args.backend} backend, speed {args.speed})")
+        print(f"{len(result['divergences']):,} outcome divergences, {result['skipped']:,} calls skipped")
+        for line in result["divergences"][:10]:
+            print(f"  {line}")
+        print(f"{result['balances_checked']:,} final balances checked, "
+              f"{len(result['balance_mismatches']):,} mismatches")
+        for line in result["balance_mismatches"][:10]:
+            print(f"  {line}")
+    if result["balance_mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,38 @@
 # transaction.py
-import uuid
+import threading
+import time
 from datetime import datetime
+from functools import lru_cache
+
+from id_generator import format_id, next_id, parse_id
+from money import Money
+
+_clock_lock = threading.Lock()
+_last_micros = 0
+
+
+def now_micros():
+    """Current time in integer microseconds since the epoch, never running backwards"""
+    global _last_micros
+    with _clock_lock:
+        _last_micros = max(time.time_ns() // 1000, _last_micros)
+        return _last_micros
+
+
+def to_micros(value):
+    """Convert a datetime, float seconds or int microseconds to int microseconds"""
+    if isinstance(value, datetime):
+        return round(value.timestamp() * 1_000_000)
+    if isinstance(value, int):
+        return value
+    return round(value * 1_000_000)
+
+
+@lru_cache(maxsize=4096)
+def _format_second(seconds):
+    # Postings cluster in time, so many share the same formatted second
+    return datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
 
 class Transaction:
     DEPOSIT = "DEPOSIT"
@@ -8,16 +40,42 @@ class Transaction:
     TRANSFER_IN = "TRANSFER_IN"
     TRANSFER_OUT = "TRANSFER_OUT"
     ACCOUNT_CREATION = "ACCOUNT_CREATION"
-    
-    def __init__(self, transaction_type, amount, account_number, description=""):
-        self.transaction_id = str(uuid.uuid4())
+
+    def __init__(self, transaction_type, amount, account_number, description="",
+                 transaction_id=None, timestamp=None):
+        # transaction_id/timestamp are only passed when rebuilding a stored posting.
+        # id is the 64-bit integer ID; the string form is rendered on demand.
+        if transaction_id is None:
+            self.id, self._transaction_id = next_id(), None
+        elif isinstance(transaction_id, int):
+            self.id, self._transaction_id = transaction_id, None
+        else:
+            self.id, self._transaction_id = parse_id(transaction_id), transaction_id
+            if self.id is None:
+                raise ValueError(f"Not a transaction ID: {transaction_id!r}")
         self.transaction_type = transaction_type
-        self.amount = float(amount)
+        self.amount = amount if amount.__class__ is Money else Money.of(amount)
         self.account_number = account_number
         self.description = description
-        self.date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Integer microseconds
+        self.timestamp = now_micros() if timestamp is None else to_micros(timestamp)
+        self._date = None
+
+    @property
+    def transaction_id(self):
+        """ID as shown on receipts"""
+        if self._transaction_id is None:
+            self._transaction_id = format_id(self.id)
+        return self._transaction_id
+
+    @property
+    def date(self):
+        """Timestamp as "%Y-%m-%d %H:%M:%S", formatted on first use"""
+        if self._date is None:
+            self._date = _format_second(self.timestamp // 1_000_000)
+        return self._date
 
     def __str__(self):
-        return (f"[{self.transaction_id[:8]}] {self.date} - "
+        return (f"[{self.transaction_id[-8:]}] {self.date} - "
                 f"{self.transaction_type:12} ${self.amount:9.2f} "
-                f"| {self.description}")
\ No newline at end of file
+                f"| {self.description}")
@@ -0,0 +1,74 @@
+"""
+Transfer Engine Module
+Atomic two-sided transfers between accounts, safe under concurrency
+"""
+
+from typing import Tuple
+
+from money import ZERO, Money
+from transaction import Transaction
+
+
+class TransferEngine:
+    """
+    Moves funds between two accounts atomically.
+
+    Both account locks are held while the source is checked, debited
+    (TRANSFER_OUT) and the destination credited (TRANSFER_IN), so no other
+    operation can observe or interleave with a half-done transfer.  Locks
+    are always taken in account_number order, which rules out deadlock
+    between two transfers running in opposite directions.
+    """
+
+    def __init__(self, account_store):
+        """
+        Initialize the engine
+
+        Args:
+            account_store (AccountStore): Where account numbers are resolved
+        """
+        self.account_store = account_store
+
+    def transfer(self, from_account: str, to_account: str, amount,
+                 description: str = "Funds transfer") -> Tuple[bool, str]:
+        """
+        Transfer money between two accounts
+
+        Args:
+            from_account (str): Account number to debit
+            to_account (str): Account number to credit
+            amount: Amount to move (Money, or anything Money.of accepts)
+            description (str): Shown on both legs
+
+        Returns:
+            tuple: (success, message)
+        """
+        amount = Money.of(amount)
+        if amount <= ZERO:
+            return False, "Transfer amount must be positive!"
+        if from_account == to_account:
+            return False, "Cannot transfer to the same account!"
+        source = self.account_store.get_account(from_account)
+        if source is None:
+            return False, f"Account {from_account} not found!"
+        destination = self.account_store.get_account(to_account)
+        if destination is None:
+            return False, f"Account {to_account} not found!"
+
+        first, second = sorted((source, destination), key=lambda a: a.account_number)
+        with first.lock, second.lock:
+            if amount > source.balance:
+                return False, f"Insufficient funds for transfer! Available: ${source.balance:.2f}"
+            out_leg = Transaction(Transaction.TRANSFER_OUT, amount, from_account,
+                                  f"Transfer to {to_account}: {description}")
+            in_leg = Transaction(Transaction.TRANSFER_IN, amount, to_account,
+                                 f"Transfer from {from_account}: {description}")
+            source._apply_posting(out_leg, log=False)
+            destination._apply_posting(in_leg, log=False)
+            # Both legs go to the log as one group so recovery sees the whole transfer
+            journal = source.journal or destination.journal
+            if journal is not None:
+                journal.log_postings(source, [out_leg, in_leg])
+
+        return True, (f"Transferred ${amount:.2f} from {from_account} to {to_account}. "
+                      f"Transaction ID: {out_leg.transaction_id}")
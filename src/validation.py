@@ -3,9 +3,90 @@ Validation Module
 Handles input validation and sanitization for banking system
 """
 
+import math
 import re
 from datetime import datetime
 
+from id_allocator import ACCOUNT_PREFIX, CUSTOMER_PREFIX, FIRST_SEQUENCE, check_digit
+from money import Money, PrecisionError
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch validators then return plain lists
+    np = None
+
+# Patterns are compiled once at import instead of on every call
+# Legacy 3-digit IDs, or a 9-digit sequence plus check digit (see id_allocator)
+ACCOUNT_NUMBER_PATTERN = re.compile(r'^ACC(?:\d{3}|\d{10})$')
+CUSTOMER_ID_PATTERN = re.compile(r'^CUST(?:\d{3}|\d{10})$')
+NAME_PATTERN = re.compile(r'^[A-Za-z\s\-\'\.]+$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+UPPERCASE_PATTERN = re.compile(r'[A-Z]')
+LOWERCASE_PATTERN = re.compile(r'[a-z]')
+DIGIT_PATTERN = re.compile(r'\d')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+UNSAFE_CHARS_PATTERN = re.compile(r'[;\'\"\\]')
+
+MAX_AMOUNT_CENTS = 100_000_000  # $1,000,000
+
+# Per-row error codes returned by the batch validators
+ERR_OK = 0
+ERR_FORMAT = 1         # Not parseable / wrong pattern
+ERR_NON_POSITIVE = 2   # Amount <= 0
+ERR_TOO_LARGE = 3      # Amount over $1,000,000
+ERR_PRECISION = 4      # More than 2 decimal places
+ERR_RANGE = 5          # Numeric part outside the allowed range
+ERR_LENGTH = 6         # Too short / too long
+ERR_CHECKSUM = 7       # ID check digit does not match
+
+ERROR_MESSAGES = {
+    ERR_OK: "Valid",
+    ERR_FORMAT: "Invalid format",
+    ERR_NON_POSITIVE: "Amount must be greater than zero",
+    ERR_TOO_LARGE: "Amount exceeds maximum limit ($1,000,000)",
+    ERR_PRECISION: "Amount can have maximum 2 decimal places",
+    ERR_RANGE: "Value outside the allowed range",
+    ERR_LENGTH: "Value has the wrong length",
+    ERR_CHECKSUM: "Check digit does not match",
+}
+
+
+def _parse_cents(text):
+    """Parse amount text with Money.parse, as postings do, into (error code, cents)"""
+    try:
+        cents = Money.parse(text).cents
+    except PrecisionError:
+        return ERR_PRECISION, 0
+    except ValueError:
+        return ERR_FORMAT, 0
+    if cents <= 0:
+        return ERR_NON_POSITIVE, 0
+    if cents > MAX_AMOUNT_CENTS:
+        return ERR_TOO_LARGE, 0
+    return ERR_OK, cents
+
+
+def _batch_result(codes, values, value_dtype):
+    """Package per-row codes and cleaned values as (mask, values, codes)"""
+    if np is not None:
+        codes = np.asarray(codes, dtype=np.uint8)
+        return codes == ERR_OK, np.asarray(values, dtype=value_dtype), codes
+    return [c == ERR_OK for c in codes], list(values), list(codes)
+
+
+def _id_code(digits):
+    """ERR_* code for the digits after an ID prefix (already matched by its pattern)"""
+    if len(digits) == 3:
+        return ERR_OK if digits != '000' else ERR_RANGE
+    if check_digit(digits[:-1]) != digits[-1]:
+        return ERR_CHECKSUM
+    return ERR_OK if int(digits[:-1]) >= FIRST_SEQUENCE else ERR_RANGE
+
+
+def _as_list(values):
+    return values.tolist() if np is not None and isinstance(values, np.ndarray) else values
+
 class Validation:
     """Collection of validation methods for banking system"""
     
@@ -15,29 +96,19 @@ class Validation:
         Validate amount input
         
         Args:
-            amount_str (str): Amount as string
+            amount_str (str): Amount as string (a number or Money is formatted first)
             
         Returns:
-            tuple: (success, message, amount)
+            tuple: (success, message, Money amount)
         """
-        try:
-            amount = float(amount_str)
-            
-            if amount <= 0:
-                return False, "Amount must be greater than zero", None
-            
-            if amount > 1000000:  # Limit to 1 million
-                return False, "Amount exceeds maximum limit ($1,000,000)", None
-            
-            # Check for decimal places
-            if '.' in str(amount):
-                if len(str(amount).split('.')[-1]) > 2:
-                    return False, "Amount can have maximum 2 decimal places", None
-            
-            return True, "Amount is valid", round(amount, 2)
-            
-        except ValueError:
+        if not isinstance(amount_str, str):
+            amount_str = str(amount_str)
+        code, cents = _parse_cents(amount_str)
+        if code == ERR_FORMAT:
             return False, "Invalid amount format. Please enter a number", None
+        if code != ERR_OK:
+            return False, ERROR_MESSAGES[code], None
+        return True, "Amount is valid", Money(cents)
     
     @staticmethod
     def validate_account_number(account_number):
@@ -46,46 +117,36 @@ class Validation:
         
         Rules: 
         - Must start with ACC
-        - Followed by 3 digits
-        - Example: ACC001
+        - Followed by 3 digits (ACC001-ACC999), or by a 9-digit number
+          and its check digit as issued by id_allocator (ACC0000010009)
         """
         # Clean the input - remove spaces, convert to uppercase
         account_number = str(account_number).strip().upper()
         
-        pattern = r'^ACC\d{3}$'
-        
-        if not re.match(pattern, account_number):
-            return False, "Account number must be in format ACC001 (ACC followed by 3 digits)", None
+        if not ACCOUNT_NUMBER_PATTERN.match(account_number):
+            return False, "Account number must be in format ACC001 or ACC0000010009", None
         
-        # Extract the number part and validate it's between 001-999
-        num_part = account_number[3:]
-        try:
-            num_value = int(num_part)
-            if num_value < 1 or num_value > 999:
-                return False, "Account number must be between ACC001 and ACC999", None
-        except ValueError:
-            return False, "Account number must be in format ACC001 (ACC followed by 3 digits)", None
+        code = _id_code(account_number[len(ACCOUNT_PREFIX):])
+        if code == ERR_CHECKSUM:
+            return False, "Account number is mistyped (check digit does not match)", None
+        if code == ERR_RANGE:
+            return False, "Account number is outside the allowed range", None
         
         return True, "Account number is valid", account_number
     
     @staticmethod
     def validate_customer_id(customer_id):
-        """Validate customer ID format (CUST001)"""
+        """Validate customer ID format (CUST001 or CUST0000010009)"""
         customer_id = str(customer_id).strip().upper()
         
-        pattern = r'^CUST\d{3}$'
+        if not CUSTOMER_ID_PATTERN.match(customer_id):
+            return False, "Customer ID must be in format CUST001 or CUST0000010009", None
         
-        if not re.match(pattern, customer_id):
-            return False, "Customer ID must be in format CUST001 (CUST followed by 3 digits)", None
-        
-        # Validate the number part
-        num_part = customer_id[4:]
-        try:
-            num_value = int(num_part)
-            if num_value < 1 or num_value > 999:
-                return False, "Customer ID must be between CUST001 and CUST999", None
-        except ValueError:
-            return False, "Customer ID must be in format CUST001 (CUST followed by 3 digits)", None
+        code = _id_code(customer_id[len(CUSTOMER_PREFIX):])
+        if code == ERR_CHECKSUM:
+            return False, "Customer ID is mistyped (check digit does not match)", None
+        if code == ERR_RANGE:
+            return False, "Customer ID is outside the allowed range", None
         
         return True, "Customer ID is valid", customer_id
     
@@ -101,7 +162,7 @@ class Validation:
             return False, "Name is too long (max 100 characters)", None
         
         # Allow letters, spaces, hyphens, apostrophes, and periods
-        if not re.match(r'^[A-Za-z\s\-\'\.]+$', name):
+        if not NAME_PATTERN.match(name):
             return False, "Name can only contain letters, spaces, hyphens, and apostrophes", None
         
         return True, "Name is valid", name.title()
@@ -111,9 +172,7 @@ class Validation:
         """Validate email address"""
         email = str(email).strip().lower()
         
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        
-        if not re.match(pattern, email):
+        if not EMAIL_PATTERN.match(email):
             return False, "Invalid email format", None
         
         return True, "Email is valid", email
@@ -124,7 +183,7 @@ class Validation:
         phone = str(phone).strip()
         
         # Remove all non-digit characters
-        digits = re.sub(r'\D', '', phone)
+        digits = NON_DIGIT_PATTERN.sub('', phone)
         
         if len(digits) < 10 or len(digits) > 15:
             return False, "Phone number must be 10-15 digits", None
@@ -147,13 +206,13 @@ class Validation:
         if len(password) < 8:
             return False, "Password must be at least 8 characters", None
         
-        if not re.search(r'[A-Z]', password):
+        if not UPPERCASE_PATTERN.search(password):
             return False, "Password must contain at least one uppercase letter", None
         
-        if not re.search(r'[a-z]', password):
+        if not LOWERCASE_PATTERN.search(password):
             return False, "Password must contain at least one lowercase letter", None
         
-        if not re.search(r'\d', password):
+        if not DIGIT_PATTERN.search(password):
             return False, "Password must contain at least one digit", None
         
         return True, "Password is strong", password
@@ -179,10 +238,10 @@ class Validation:
         sanitized = input_str.strip()
         
         # Replace multiple spaces with single space
-        sanitized = re.sub(r'\s+', ' ', sanitized)
+        sanitized = WHITESPACE_PATTERN.sub(' ', sanitized)
         
         # Remove potentially dangerous characters for SQL injection
-        sanitized = re.sub(r'[;\'\"\\]', '', sanitized)
+        sanitized = UNSAFE_CHARS_PATTERN.sub('', sanitized)
         
         return sanitized
     
@@ -197,6 +256,149 @@ class Validation:
             return False, f"Transaction type must be one of: {', '.join(valid_types)}", None
         
         return True, "Transaction type is valid", trans_type
+    
+    # ---------------- BATCH VALIDATION ----------------
+    # Batch validators take a sequence or NumPy array and return
+    # (mask, cleaned, codes): a boolean validity mask, the cleaned values
+    # (0 / "" where invalid) and one ERR_* code per row.  With NumPy
+    # installed these are arrays, otherwise lists.
+    
+    @staticmethod
+    def validate_amounts(amounts):
+        """
+        Validate many amounts at once
+        
+        Args:
+            amounts: Strings or numbers, as a sequence or NumPy array
+            
+        Returns:
+            tuple: (mask, amounts in integer cents, error codes)
+        """
+        if np is not None and isinstance(amounts, np.ndarray) and amounts.dtype.kind in 'iuf':
+            # Numeric arrays are checked fully vectorized
+            scaled = amounts.astype(np.float64) * 100
+            cents = np.rint(scaled)
+            codes = np.full(len(amounts), ERR_OK, dtype=np.uint8)
+            codes[np.abs(scaled - cents) > 1e-6] = ERR_PRECISION
+            codes[cents > MAX_AMOUNT_CENTS] = ERR_TOO_LARGE
+            codes[cents <= 0] = ERR_NON_POSITIVE
+            codes[~np.isfinite(scaled)] = ERR_FORMAT
+            mask = codes == ERR_OK
+            return mask, np.where(mask, cents, 0).astype(np.int64), codes
+        
+        codes = []
+        cents_out = []
+        for value in _as_list(amounts):
+            if value.__class__ is str:
+                # Fast path for plain "123" / "123.4" / "123.45"; everything else
+                # (signs, spaces, extra zeros, garbage) goes through _parse_cents
+                whole, dot, frac = value.partition('.')
+                if whole.isdecimal() and (not dot or (frac.isdecimal() and len(frac) <= 2)):
+                    cents = int(whole) * 100
+                    if frac:
+                        cents += int(frac) * (10 if len(frac) == 1 else 1)
+                    if cents == 0:
+                        code = ERR_NON_POSITIVE
+                    elif cents > MAX_AMOUNT_CENTS:
+                        code = ERR_TOO_LARGE
+                    else:
+                        code = ERR_OK
+                else:
+                    code, cents = _parse_cents(value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                # Numbers are already binary floats, so check them on the cents grid
+                scaled = value * 100
+                cents = round(scaled)
+                if abs(scaled - cents) > 1e-6:
+                    code = ERR_PRECISION
+                elif cents <= 0:
+                    code = ERR_NON_POSITIVE
+                elif cents > MAX_AMOUNT_CENTS:
+                    code = ERR_TOO_LARGE
+                else:
+                    code = ERR_OK
+            else:
+                code, cents = ERR_FORMAT, 0
+            codes.append(code)
+            cents_out.append(cents if code == ERR_OK else 0)
+        return _batch_result(codes, cents_out, np.int64 if np is not None else None)
+    
+    @staticmethod
+    def _validate_prefixed_ids(values, pattern, prefix_len):
+        codes = []
+        cleaned = []
+        match = pattern.match
+        for value in _as_list(values):
+            value = str(value).strip().upper()
+            if not match(value):
+                codes.append(ERR_FORMAT)
+                cleaned.append("")
+            else:
+                code = _id_code(value[prefix_len:])
+                codes.append(code)
+                cleaned.append(value if code == ERR_OK else "")
+        return _batch_result(codes, cleaned, object)
+    
+    @staticmethod
+    def validate_account_numbers(account_numbers):
+        """Validate many account numbers; returns (mask, cleaned, codes)"""
+        return Validation._validate_prefixed_ids(account_numbers, ACCOUNT_NUMBER_PATTERN, len(ACCOUNT_PREFIX))
+    
+    @staticmethod
+    def validate_customer_ids(customer_ids):
+        """Validate many customer IDs; returns (mask, cleaned, codes)"""
+        return Validation._validate_prefixed_ids(customer_ids, CUSTOMER_ID_PATTERN, len(CUSTOMER_PREFIX))
+    
+    @staticmethod
+    def validate_emails(emails):
+        """Validate many email addresses; returns (mask, cleaned, codes)"""
+        codes = []
+        cleaned = []
+        match = EMAIL_PATTERN.match
+        for email in _as_list(emails):
+            email = str(email).strip().lower()
+            if match(email):
+                codes.append(ERR_OK)
+                cleaned.append(email)
+            else:
+                codes.append(ERR_FORMAT)
+                cleaned.append("")
+        return _batch_result(codes, cleaned, object)
+    
+    @staticmethod
+    def validate_names(names):
+        """Validate many customer names; returns (mask, cleaned, codes)"""
+        codes = []
+        cleaned = []
+        match = NAME_PATTERN.match
+        for name in _as_list(names):
+            name = str(name).strip()
+            if not name or len(name) > 100:
+                codes.append(ERR_LENGTH)
+                cleaned.append("")
+            elif not match(name):
+                codes.append(ERR_FORMAT)
+                cleaned.append("")
+            else:
+                codes.append(ERR_OK)
+                cleaned.append(name.title())
+        return _batch_result(codes, cleaned, object)
+    
+    @staticmethod
+    def validate_phones(phones):
+        """Validate many phone numbers; returns (mask, digits only, codes)"""
+        codes = []
+        cleaned = []
+        strip = NON_DIGIT_PATTERN.sub
+        for phone in _as_list(phones):
+            digits = strip('', str(phone))
+            if 10 <= len(digits) <= 15:
+                codes.append(ERR_OK)
+                cleaned.append(digits)
+            else:
+                codes.append(ERR_LENGTH)
+                cleaned.append("")
+        return _batch_result(codes, cleaned, object)
 
 class ValidationError(Exception):
     """Custom exception for validation errors"""
@@ -0,0 +1,273 @@
+"""
+Write-Ahead Log Module
+Binary append-only log with group commit and segment rotation
+"""
+
+import os
+import struct
+import threading
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+# Durability levels
+SYNC_ALWAYS = "always"      # fsync before append() returns (grouped across threads)
+SYNC_INTERVAL = "interval"  # background fsync every interval_ms
+SYNC_NONE = "none"          # leave flushing to the OS
+
+DURABILITY_LEVELS = (SYNC_ALWAYS, SYNC_INTERVAL, SYNC_NONE)
+
+# Record frame: payload length, crc32 of (lsn, op, payload), lsn, op code
+_FRAME = struct.Struct("<IIQB")
+_CRC_PART = struct.Struct("<QB")
+
+_SEGMENT_PREFIX = "wal-"
+_SEGMENT_SUFFIX = ".log"
+_WRITE_BEHIND_BYTES = 1 << 20  # SYNC_NONE hands data to the OS past this size
+
+
+class WALError(Exception):
+    """Raised when the log is used incorrectly or cannot be written"""
+
+
+class WriteAheadLog:
+    """
+    Append-only log of (lsn, op, payload) records split into segment files.
+
+    Records are buffered in memory and written out by whichever caller
+    syncs first, so under SYNC_ALWAYS concurrent appenders share a single
+    write + fsync (group commit).  Every segment is named after the first
+    LSN it holds, which lets old segments be dropped once a snapshot covers
+    them.
+    """
+
+    def __init__(self, directory: str, durability: str = SYNC_ALWAYS, interval_ms: int = 10):
+        """
+        Open (or create) a log directory
+
+        Args:
+            directory (str): Directory holding the segment files
+            durability (str): One of SYNC_ALWAYS, SYNC_INTERVAL, SYNC_NONE
+            interval_ms (int): fsync period for SYNC_INTERVAL
+        """
+        if durability not in DURABILITY_LEVELS:
+            raise WALError(f"Durability must be one of: {', '.join(DURABILITY_LEVELS)}")
+        self.directory = directory
+        self.durability = durability
+        self.interval_ms = interval_ms
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()         # guards buffer and LSN counter
+        self._sync_lock = threading.Lock()    # serializes file writes/fsyncs
+        self._buffer = bytearray()
+        self._buffered_lsn = 0                # highest LSN placed in the buffer
+        self._durable_lsn = 0                 # highest LSN written and fsynced
+        self.sync_count = 0                   # number of fsyncs issued, for benchmarks
+
+        segments = self._segment_starts()
+        if not segments:
+            self._create_segment(1)
+            segments = [1]
+        # An empty newest segment (fresh log or just rotated) starts at its own LSN
+        last_lsn = self._recover_tail(segments[-1])
+        self._next_lsn = last_lsn + 1 if last_lsn else segments[-1]
+        self._buffered_lsn = self._durable_lsn = self._next_lsn - 1
+        self._file = open(self._segment_path(segments[-1]), "ab")
+
+        self._closed = False
+        self._flusher = None
+        if durability == SYNC_INTERVAL:
+            self._stop = threading.Event()
+            self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+            self._flusher.start()
+
+    # ---------------- SEGMENTS ----------------
+    def _segment_path(self, start_lsn: int) -> str:
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{start_lsn:020d}{_SEGMENT_SUFFIX}")
+
+    def _segment_starts(self) -> List[int]:
+        starts = []
+        for name in os.listdir(self.directory):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                starts.append(int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]))
+        return sorted(starts)
+
+    def _create_segment(self, start_lsn: int) -> None:
+        open(self._segment_path(start_lsn), "ab").close()
+        self._fsync_directory()
+
+    def _fsync_directory(self) -> None:
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return  # Not supported on this platform
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _recover_tail(self, start_lsn: int) -> int:
+        """Find the last valid record of the newest segment and cut off any torn write"""
+        path = self._segment_path(start_lsn)
+        last_lsn, valid_end = 0, 0
+        with open(path, "rb") as f:
+            for lsn, _op, _payload, end in self._read_frames(f):
+                last_lsn, valid_end = lsn, end
+        if os.path.getsize(path) != valid_end:
+            with open(path, "r+b") as f:
+                f.truncate(valid_end)
+                os.fsync(f.fileno())
+        return last_lsn
+
+    @staticmethod
+    def _read_frames(f) -> Iterator[Tuple[int, int, bytes, int]]:
+        """Yield (lsn, op, payload, end_offset) until the first incomplete or corrupt frame"""
+        offset = 0
+        while True:
+            header = f.read(_FRAME.size)
+            if len(header) < _FRAME.size:
+                return
+            length, crc, lsn, op = _FRAME.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            if zlib.crc32(payload, zlib.crc32(_CRC_PART.pack(lsn, op))) != crc:
+                return
+            offset += _FRAME.size + length
+            yield lsn, op, payload, offset
+
+    # ---------------- WRITING ----------------
+    def append(self, op: int, payload: bytes) -> int:
+        """
+        Add a record to the log
+
+        Args:
+            op (int): Record type code (0-255)
+            payload (bytes): Encoded record body
+
+        Returns:
+            int: The record's log sequence number
+        """
+        return self.append_many(((op, payload),))
+
+    def append_many(self, records) -> int:
+        """
+        Add several (op, payload) records as one group
+
+        Returns:
+            int: Log sequence number of the last record
+        """
+        with self._lock:
+            if self._closed:
+                raise WALError("Log is closed")
+            lsn = self._next_lsn - 1
+            for op, payload in records:
+                lsn += 1
+                crc = zlib.crc32(payload, zlib.crc32(_CRC_PART.pack(lsn, op)))
+                self._buffer += _FRAME.pack(len(payload), crc, lsn, op)
+                self._buffer += payload
+            self._next_lsn = lsn + 1
+            self._buffered_lsn = lsn
+            buffered = len(self._buffer)
+
+        if self.durability == SYNC_ALWAYS:
+            self.sync(lsn)
+        elif self.durability == SYNC_NONE and buffered >= _WRITE_BEHIND_BYTES:
+            self._write_out(fsync=False)
+        return lsn
+
+    def sync(self, lsn: Optional[int] = None) -> None:
+        """Make every record up to lsn (default: all appended so far) durable"""
+        if lsn is None:
+            lsn = self._buffered_lsn
+        if self._durable_lsn >= lsn:
+            return
+        with self._sync_lock:
+            # Another thread may have synced our record while we waited
+            if self._durable_lsn >= lsn:
+                return
+            self._write_locked(fsync=True)
+
+    def _write_out(self, fsync: bool) -> None:
+        with self._sync_lock:
+            self._write_locked(fsync)
+
+    def _write_locked(self, fsync: bool) -> None:
+        # Caller holds _sync_lock; take everything buffered so far as one group
+        with self._lock:
+            data = self._buffer
+            upto = self._buffered_lsn
+            self._buffer = bytearray()
+        if data:
+            self._file.write(data)
+            self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+            self.sync_count += 1
+            self._durable_lsn = upto
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.interval_ms / 1000.0):
+            self.sync()
+
+    def rotate(self) -> int:
+        """Sync and start a new segment; returns the first LSN of the new segment"""
+        with self._sync_lock:
+            self._write_locked(fsync=True)
+            with self._lock:
+                start = self._next_lsn
+            self._file.close()
+            self._create_segment(start)
+            self._file = open(self._segment_path(start), "ab")
+        return start
+
+    def drop_segments_before(self, lsn: int) -> int:
+        """Delete segments whose records all precede lsn; returns how many were removed"""
+        starts = self._segment_starts()
+        removed = 0
+        # A segment ends where the next one starts, so it is covered if the next start <= lsn
+        for start, next_start in zip(starts, starts[1:]):
+            if next_start <= lsn:
+                try:
+                    os.remove(self._segment_path(start))
+                except FileNotFoundError:
+                    continue  # Already dropped
+                removed += 1
+        if removed:
+            self._fsync_directory()
+        return removed
+
+    @property
+    def last_lsn(self) -> int:
+        """LSN of the most recently appended record"""
+        return self._next_lsn - 1
+
+    # ---------------- READING ----------------
+    def records(self, after_lsn: int = 0) -> Iterator[Tuple[int, int, bytes]]:
+        """Yield (lsn, op, payload) for every record on disk with lsn > after_lsn"""
+        starts = self._segment_starts()
+        for i, start in enumerate(starts):
+            if i + 1 < len(starts) and starts[i + 1] <= after_lsn + 1:
+                continue  # Whole segment is at or before after_lsn
+            with open(self._segment_path(start), "rb") as f:
+                for lsn, op, payload, _end in self._read_frames(f):
+                    if lsn > after_lsn:
+                        yield lsn, op, payload
+
+    def close(self) -> None:
+        """Flush everything and close the current segment"""
+        if self._closed:
+            return
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+        with self._sync_lock:
+            self._write_locked(fsync=self.durability != SYNC_NONE)
+            with self._lock:
+                self._closed = True
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()